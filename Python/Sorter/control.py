@@ -0,0 +1,154 @@
+import os
+import hmac
+import json
+import socket
+import secrets
+import logging
+import threading
+import socketserver
+
+# Address of the sorter's control endpoint, only reachable from this machine
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 47821
+
+# Seconds a client waits for the daemon to answer
+CONTROL_TIMEOUT = 2.0
+
+# Per-install secret every request must carry, readable only by the user.
+# Other local users and web pages (which can POST to localhost) cannot know it.
+CONTROL_TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".autosorter", "control.token")
+
+# Longest request line read before the connection is dropped
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+def load_token(path=CONTROL_TOKEN_FILE, create=False):
+    """Return the control token, with create=True making one on first use.
+
+    A new token file is created with owner-only permissions, exclusively, so
+    an existing file is never replaced. Raises OSError if it cannot be read.
+    """
+    if create and not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w", encoding="ascii") as f:
+                f.write(secrets.token_hex(32))
+    with open(path, "r", encoding="ascii") as f:
+        return f.read().strip()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+
+class ControlServer:
+    """Serve commands to the running sorter over a localhost socket.
+
+    Each request is one JSON line such as
+    {"cmd": "start", "drive": "E:\\\\", "token": "..."} and gets one JSON line
+    back. commands maps a name to func(request) that returns a dict; the
+    reply is that dict with "ok": true, or "ok": false and an "error" if the
+    command is unknown or raised. A line that is not a JSON request or lacks
+    the token from token_file gets an error and the connection is closed,
+    so nothing after e.g. the headers of an HTTP request is ever run.
+    """
+
+    def __init__(self, commands, host=CONTROL_HOST, port=CONTROL_PORT, token_file=CONTROL_TOKEN_FILE):
+        self.commands = commands
+        self.host = host
+        self.port = port
+        self.token_file = token_file
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        commands = self.commands
+        token = load_token(self.token_file, create=True)
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    line = self.rfile.readline(MAX_REQUEST_BYTES)
+                    if not line:
+                        return
+                    try:
+                        request = parse_request(line, token)
+                    except ValueError as e:
+                        self.reply({"ok": False, "error": str(e)})
+                        return
+                    self.reply(dispatch(commands, request))
+
+            def reply(self, reply):
+                self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+        self._server = _Server((self.host, self.port), RequestHandler)
+        # Port 0 picks a free port
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ControlServer", daemon=True)
+        self._thread.start()
+        logging.info(f"Control endpoint listening on {self.host}:{self.port}")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def parse_request(line, token):
+    """Return the request dict of one line, raise ValueError if it is malformed or unauthorized."""
+    try:
+        request = json.loads(line)
+    except ValueError:
+        request = None
+    if not isinstance(request, dict) or not isinstance(request.get("cmd"), str):
+        raise ValueError(f"Malformed request: {line[:200]!r}")
+    given = request.get("token")
+    if not isinstance(given, str) or not hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8")):
+        raise ValueError("Missing or wrong control token")
+    return request
+
+
+def dispatch(commands, request):
+    """Run the command named by a parsed request and return the reply dict."""
+    cmd = request["cmd"]
+    func = commands.get(cmd)
+    if func is None:
+        return {"ok": False, "error": f"Unknown command '{cmd}'"}
+    try:
+        return dict(func(request) or {}, ok=True)
+    except Exception as e:
+        logging.error(f"Control command {cmd} failed: {e}")
+        return {"ok": False, "error": str(e)}
+
+
+def send_command(cmd, host=CONTROL_HOST, port=CONTROL_PORT, timeout=CONTROL_TIMEOUT, token_file=CONTROL_TOKEN_FILE, **args):
+    """Send one command to the daemon and return its reply.
+
+    Raises OSError if no daemon is listening or its token cannot be read.
+    """
+    token = load_token(token_file)
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(json.dumps(dict(args, cmd=cmd, token=token)).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError("The sorter closed the connection without answering")
+    return json.loads(line)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Command line client: python control.py status | stats | start E:\ | stop | pause | resume | quit
+    if len(sys.argv) < 2:
+        sys.exit("usage: control.py COMMAND [DRIVE]")
+    extra = {"drive": sys.argv[2]} if len(sys.argv) > 2 else {}
+    try:
+        print(json.dumps(send_command(sys.argv[1], **extra), indent=2))
+    except OSError as e:
+        sys.exit(f"AutoSorter is not running: {e}")
@@ -0,0 +1,125 @@
+import os
+import sys
+import string
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Seconds between full re-probes of the drives
+DRIVE_REFRESH_INTERVAL = 30.0
+
+# Seconds a single drive may take to answer before it counts as unavailable
+DRIVE_PROBE_TIMEOUT = 1.0
+
+# Seconds between checks of the mounted-drive bitmask, which costs no I/O
+DRIVE_MOUNT_CHECK_INTERVAL = 1.0
+
+
+def logical_drive_mask():
+    """Return the GetLogicalDrives bitmask (bit 0 is A:), or None off Windows."""
+    if sys.platform != "win32":
+        return None
+    import ctypes
+    return ctypes.windll.kernel32.GetLogicalDrives()
+
+
+def probe_drive(drive):
+    """Return True if the drive answers, may block for a long time on dead network drives."""
+    return os.path.exists(drive)
+
+
+class DriveInventory:
+    """Cached list of usable drive letters.
+
+    Drives are probed in parallel and a refresh waits at most timeout
+    seconds for all of them together, so disconnected network or optical
+    drives cannot stall it. A drive whose probe has not answered in time
+    keeps its last known state. A
+    background thread re-probes every refresh_interval seconds, and sooner
+    when the mounted-drive bitmask changes (a drive was plugged or removed).
+    on_change(drives) is called from that thread when the list changes.
+    """
+
+    def __init__(self, refresh_interval=DRIVE_REFRESH_INTERVAL, timeout=DRIVE_PROBE_TIMEOUT, on_change=None):
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.on_change = on_change
+        self._drives = None
+        self._probes = {}
+        self._executor = ThreadPoolExecutor(
+            # One worker per letter, so no probe ever queues behind a hung one
+            max_workers=len(string.ascii_uppercase), thread_name_prefix="DriveProbe"
+        )
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="DriveInventory", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def drives(self):
+        """Return the cached drives, probing once if nothing is cached yet."""
+        if self._drives is None:
+            self.refresh()
+        return list(self._drives)
+
+    def refresh(self):
+        """Probe the drives now and return the new list."""
+        mask = logical_drive_mask()
+        letters = [
+            letter for i, letter in enumerate(string.ascii_uppercase)
+            if mask is None or mask & (1 << i)
+        ]
+        with self._lock:
+            for letter in letters:
+                probe = self._probes.get(letter)
+                # A drive still stuck in an earlier probe is not probed again
+                if probe is None or probe.done():
+                    self._probes[letter] = self._executor.submit(probe_drive, f"{letter}:\\")
+            probes = [(letter, self._probes[letter]) for letter in letters]
+
+        # One deadline for all probes, not one per drive
+        wait([probe for _, probe in probes], timeout=self.timeout)
+        known = set(self._drives or ())
+        drives = []
+        for letter, probe in probes:
+            drive = f"{letter}:\\"
+            if not probe.done():
+                # Hung, or queued behind hung probes: keep what was known
+                logging.debug(f"Drive {letter}: did not answer within {self.timeout} s")
+                if drive in known:
+                    drives.append(drive)
+            elif probe.exception() is None and probe.result():
+                drives.append(drive)
+
+        changed = drives != self._drives
+        self._drives = drives
+        if changed and self.on_change:
+            try:
+                self.on_change(list(drives))
+            except Exception as e:
+                logging.error(f"Error in drive change callback: {e}")
+        return list(drives)
+
+    def _run(self):
+        mask = logical_drive_mask()
+        waited = 0.0
+        while not self._stopped.wait(DRIVE_MOUNT_CHECK_INTERVAL):
+            waited += DRIVE_MOUNT_CHECK_INTERVAL
+            current = logical_drive_mask()
+            if current != mask or waited >= self.refresh_interval:
+                mask = current
+                waited = 0.0
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logging.error(f"Cannot refresh drives: {e}")
@@ -1,20 +1,37 @@
 import os
+import json
+import argparse
 import shutil
-import time
 import logging
+import logging.handlers
+import queue
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import threading
-from plyer import notification
-import string
-from infi.systray import SysTrayIcon
+import time
 import sys
+from settle import SettleDetector
+from notify import Notifier
+from drives import DriveInventory
+from control import ControlServer
+from metrics import registry, summary
+from rules import RuleEngine
+from routing import get_router
 
 # Global variables
 is_enabled = True
 current_drive = "D:\\"
 observer = None
+event_handler = None
 systray = None
+notifier = Notifier()
+# Machine-readable copy of the metrics, rewritten every METRICS_INTERVAL seconds
+METRICS_FILE = os.path.join(os.path.expanduser("~"), ".autosorter", "metrics.json")
+METRICS_INTERVAL = 5.0
+# Set by the "quit" control command to end a headless run
+quit_event = threading.Event()
+# Rebuild the drive menu when a drive is plugged in or removed
+drive_inventory = DriveInventory(on_change=lambda drives: update_systray())
 
 # File extension -> folder mapping
 ext_to_type = {
@@ -34,6 +51,8 @@ ext_to_type = {
     "mov": "Videos",
     "7z": "Others",
     "gz": "Others",
+    "tar.gz": "Others",
+    "tgz": "Others",
     "rar": "Others",
     "zip": "Others",
     "exe": "Programs",
@@ -42,74 +61,144 @@ ext_to_type = {
     "img": "DiskImages",
 }
 
+# Rules tried before ext_to_type, first match wins (see RuleEngine in rules.py),
+# e.g. {"name": ["*.jpg", "*.png"], "dest": "Images/{yyyy}/{mm}"}
+RULES = []
+rule_engine = RuleEngine(RULES)
+
+# Logs live outside the watched drive so writing them never triggers a watch event
+LOG_DIR = os.path.join(os.path.expanduser("~"), ".autosorter", "logs")
+LOG_FILE = os.path.join(LOG_DIR, "auto_sorter.log")
+# Machine-readable log, one JSON object per line
+JSON_LOG_FILE = os.path.join(LOG_DIR, "auto_sorter.jsonl")
+# Fields a record can carry through extra={...}, copied into the JSON lines
+RECORD_FIELDS = ("path", "category", "bytes", "latency_ms")
+log_listener = None
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format each record as one JSON object per line, same layout as the autosorter package"""
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in RECORD_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        return json.dumps(entry, ensure_ascii=False)
+
 # Setup logging
-def setup_logging(drive):
-    log_dir = os.path.join(drive, "Logs")
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, "auto_sorter.log")
-    
+def setup_logging():
+    """Log through a queue to rotating text and JSON-lines files, so movers never wait on disk I/O"""
+    global log_listener
+    if log_listener:
+        return
+    os.makedirs(LOG_DIR, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8"
+    )
+    file_handler.setFormatter(logging.Formatter(
+        "[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%d/%m/%Y %H:%M:%S"
+    ))
+    json_handler = logging.handlers.RotatingFileHandler(
+        JSON_LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8"
+    )
+    json_handler.setFormatter(JsonLinesFormatter())
+
+    records = queue.SimpleQueue()
     # Remove old handlers
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
-    
-    logging.basicConfig(
-        filename=log_file,
-        level=logging.INFO,
-        format="[%(asctime)s] [%(levelname)s] %(message)s",
-        datefmt="%d/%m/%Y %H:%M:%S",
-        force=True
-    )
+    logging.root.addHandler(logging.handlers.QueueHandler(records))
+    logging.root.setLevel(logging.INFO)
+    log_listener = logging.handlers.QueueListener(records, file_handler, json_handler)
+    log_listener.start()
 
 def get_available_drives():
-    """Get a list of available drives on the system"""
-    drives = []
-    for letter in string.ascii_uppercase:
-        drive = f"{letter}:\\"
-        if os.path.exists(drive):
-            drives.append(drive)
-    return drives
-
-def move_file(file_path, source):
-    """Move the file to the appropriate folder"""
+    """Get the cached list of available drives, refreshed in the background"""
+    return drive_inventory.drives()
+
+def move_file(file_path, source, detected_at=None):
+    """Move the file to the appropriate folder
+
+    detected_at is the time.monotonic() at which the file was first seen,
+    used for the detect-to-move latency metric.
+    """
     if os.path.isfile(file_path):
-        ext = os.path.splitext(file_path)[1].lower().lstrip(".")
-        folder = ext_to_type.get(ext, "Misc")
-        dest_path = os.path.join(source, folder)
-        os.makedirs(dest_path, exist_ok=True)
         try:
+            folder = rule_engine.destination(file_path, source)
+            if not folder:
+                # Longest known suffix first, so "tar.gz" wins over "gz"
+                folder = get_router(ext_to_type).route(file_path)
+            dest_path = os.path.join(source, *folder.split("/"))
+            os.makedirs(dest_path, exist_ok=True)
+            started = time.perf_counter()
+            size = os.path.getsize(file_path)
             shutil.move(file_path, os.path.join(dest_path, os.path.basename(file_path)))
-            msg = f"Moved '{os.path.basename(file_path)}' to '{folder}'"
-            logging.info(msg)
-            notification.notify(
-                title="AutoSorter",
-                message=msg,
-                app_name="AutoSorter",
-                timeout=3
+            elapsed = time.perf_counter() - started
+            logging.info(
+                f"Moved '{os.path.basename(file_path)}' to '{folder}'",
+                extra={"path": file_path, "category": folder.split("/")[0], "bytes": size, "latency_ms": round(elapsed * 1000, 1)}
             )
+            notifier.file_sorted(folder.split("/")[0])
+            registry.incr("files_moved")
+            registry.incr("bytes_moved", size)
+            registry.category(folder.split("/")[0])
+            if detected_at is not None:
+                registry.observe("detect_to_move_ms", (time.monotonic() - detected_at) * 1000)
         except Exception as e:
             logging.error(f"Error when moving file '{file_path}': {e}")
+            registry.incr("errors")
 
 class Handler(FileSystemEventHandler):
     """Handle events when new files are created"""
     def __init__(self, source):
         self.source = source
+        self.detected = {}  # path -> time.monotonic() of its first event
+        self.detector = SettleDetector(self.on_ready)
+        self.detector.start()
     
     def on_created(self, event):
+        registry.incr("events_received")
         if not event.is_directory:
-            time.sleep(10)
-            msg = f"New file detected: {os.path.basename(event.src_path)}"
-            logging.info(msg)
-            notification.notify(
-                title="AutoSorter",
-                message=msg,
-                app_name="AutoSorter",
-                timeout=3
-            )
-            move_file(event.src_path, self.source)
+            self.detected.setdefault(event.src_path, time.monotonic())
+            # Wait for the file to settle without blocking the observer thread
+            self.detector.watch(event.src_path)
+
+    def on_deleted(self, event):
+        self.detected.pop(event.src_path, None)
+
+    def on_ready(self, file_path):
+        """Called by the settle detector once the file is fully written"""
+        logging.info(f"New file detected: {os.path.basename(file_path)}")
+        move_file(file_path, self.source, self.detected.pop(file_path, None))
+
+    def close(self):
+        """Stop releasing files, nothing pending is moved after this"""
+        self.detector.stop()
+
+class SortingObserver(Observer):
+    """Observer that stops its handler's settle detector when it stops"""
+    def __init__(self, handler, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.handler = handler
+
+    def on_thread_stop(self):
+        super().on_thread_stop()
+        self.handler.close()
+
+def queue_depth():
+    """Files waiting to settle in the current handler, read by the metrics gauge"""
+    handler = event_handler
+    return handler.detector.pending() if handler and observer and observer.is_alive() else 0
+
+# Registered once and reading the current handler, so stopped handlers can be freed
+registry.gauge("queue_depth", queue_depth)
 
 def start_observer(drive):
     """Start the observer for the selected drive"""
-    global observer, current_drive
+    global observer, event_handler, current_drive
     
     # Stop any previous observer if running
     if observer and observer.is_alive():
@@ -117,37 +206,43 @@ def start_observer(drive):
         observer.join()
     
     current_drive = drive
-    setup_logging(drive)
+    setup_logging()
     
-    # Sort existing files on the drive
-    for file in os.listdir(drive):
-        file_path = os.path.join(drive, file)
-        if os.path.isfile(file_path):
-            move_file(file_path, drive)
+    # Sort existing files on the drive, scandir's entries already know their type
+    with os.scandir(drive) as entries:
+        files = [entry.path for entry in entries if entry.is_file()]
+    for file_path in files:
+        move_file(file_path, drive)
     
     # Start a new observer for the drive
     event_handler = Handler(drive)
-    observer = Observer()
+    observer = SortingObserver(event_handler)
     observer.schedule(event_handler, drive, recursive=False)
     observer.start()
     
     msg = f"Monitoring: {drive}"
     logging.info(msg)
-    notification.notify(
-        title="AutoSorter",
-        message=msg,
-        app_name="AutoSorter",
-        timeout=3
-    )
+    notifier.message(msg)
     
     # Update systray menu
     update_systray()
 
+def stop_observer():
+    """Stop watching the current drive"""
+    if observer and observer.is_alive():
+        observer.stop()
+        observer.join()
+    update_systray()
+
 def on_quit(systray):
     """Exit the program"""
     if observer:
         observer.stop()
     logging.info("Exiting the program.")
+    control_server.stop()
+    notifier.stop()
+    if log_listener:
+        log_listener.stop()
     os._exit(0)
 
 def on_toggle(systray):
@@ -158,25 +253,70 @@ def on_toggle(systray):
     if is_enabled:
         start_observer(current_drive)
         msg = "Automatic sorting enabled"
-        notification.notify(
-            title="AutoSorter",
-            message=msg,
-            app_name="AutoSorter",
-            timeout=3
-        )
+        notifier.message(msg)
     else:
         if observer:
             observer.stop()
         msg = "Automatic sorting disabled"
-        notification.notify(
-            title="AutoSorter",
-            message=msg,
-            app_name="AutoSorter",
-            timeout=3
-        )
+        notifier.message(msg)
     
     update_systray()
 
+def set_enabled(enabled):
+    """Pause or resume sorting, used by the control endpoint"""
+    if enabled != is_enabled:
+        on_toggle(None)
+
+def status():
+    return {
+        "drive": current_drive,
+        "enabled": is_enabled,
+        "monitoring": bool(observer and observer.is_alive()),
+    }
+
+def publish_metrics():
+    """Refresh the tray tooltip and the metrics file until the program exits"""
+    while not quit_event.wait(METRICS_INTERVAL):
+        snapshot = registry.snapshot()
+        if systray:
+            systray.update(hover_text=f"AutoSorter - {current_drive}: {summary(snapshot)}")
+        try:
+            registry.dump(METRICS_FILE)
+        except OSError as e:
+            logging.debug(f"Cannot write {METRICS_FILE}: {e}")
+
+def start_drive(request):
+    """Start watching the drive named by a control request
+
+    Only whole drives from the drive inventory are accepted, so a request
+    cannot point the sorter at an arbitrary folder.
+    """
+    drive = str(request.get("drive", current_drive)).replace("/", "\\").upper()
+    if not drive.endswith("\\"):
+        drive += "\\"
+    if drive not in get_available_drives():
+        raise ValueError(f"'{request.get('drive')}' is not an available drive")
+    start_observer(drive)
+    return status()
+
+def request_quit():
+    # Let the reply reach the client before the process exits
+    threading.Timer(0.2, quit_event.set).start()
+
+# Commands served on the local control endpoint, see control.py
+control_commands = {
+    "status": lambda request: status(),
+    "stats": lambda request: registry.snapshot(),
+    "drives": lambda request: {"drives": get_available_drives()},
+    "start": start_drive,
+    "stop": lambda request: stop_observer() or status(),
+    "pause": lambda request: set_enabled(False) or status(),
+    "resume": lambda request: set_enabled(True) or status(),
+    "add_startup": lambda request: add_to_startup(),
+    "quit": lambda request: request_quit(),
+}
+control_server = ControlServer(control_commands)
+
 def on_select_drive(systray, drive):
     """Select a new drive"""
     if is_enabled:
@@ -227,22 +367,54 @@ def add_to_startup():
         logging.error(f"Cannot add to startup: {e}")
 
 if __name__ == "__main__":
-    add_to_startup()
-    
-    # Start with the default drive
-    start_observer(current_drive)
-    
-    print(f"Watching drive {current_drive}...")
+    parser = argparse.ArgumentParser(description="Sort new files on a drive into category folders")
+    # --headless runs the sorter without a tray icon, controlled only through
+    # the local control endpoint (see control.py)
+    parser.add_argument("--headless", action="store_true", help="no tray icon, wait for control commands")
+    parser.add_argument("--drive", help=f"drive to watch right away, default {current_drive} unless headless")
+    args = parser.parse_args()
+    headless = args.headless
+    # A headless sorter without --drive stays idle until a "start" command names one
+    drive = args.drive or (None if headless else current_drive)
+    setup_logging()
+    try:
+        control_server.start()
+    except OSError as e:
+        logging.error(f"Cannot open the control endpoint, is AutoSorter already running? {e}")
+        sys.exit(1)
+    if not headless:
+        add_to_startup()
+    notifier.start()
+    drive_inventory.start()
     
-    # Icon path (replace with your .ico if desired)
-    icon_path = "images.ico"  # If None, a default icon is used
+    if drive:
+        try:
+            start_observer(drive)
+            print(f"Watching drive {current_drive}...")
+        except OSError as e:
+            # Stay up so the drive can still be picked from the tray or over the control endpoint
+            logging.error(f"Cannot watch drive {drive}: {e}")
     
-    # Start the system tray icon
-    systray = SysTrayIcon(
-        icon_path,
-        f"AutoSorter - {current_drive}",
-        create_menu(),
-        on_quit=on_quit
-    )
+    if not headless:
+        from infi.systray import SysTrayIcon
+        
+        # Icon path (replace with your .ico if desired)
+        icon_path = "images.ico"  # If None, a default icon is used
+        
+        # Start the system tray icon
+        systray = SysTrayIcon(
+            icon_path,
+            f"AutoSorter - {current_drive}",
+            create_menu(),
+            on_quit=on_quit
+        )
+        systray.start()
+    threading.Thread(target=publish_metrics, name="Metrics", daemon=True).start()
     
-    systray.start()
\ No newline at end of file
+    # Run until the tray's Quit or the "quit" control command
+    try:
+        while not quit_event.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    on_quit(None)
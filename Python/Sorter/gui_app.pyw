@@ -1,22 +1,25 @@
 import threading
+import queue
 import time
 import os
-import importlib
 import subprocess
 import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+from logtail import LogTailer
+from drives import DriveInventory
+from control import send_command
+from metrics import summary
 
-# Simple GUI wrapper for the script in file.pyw
+# Simple GUI for the sorter in file.pyw, which runs as its own process and is
+# driven through its local control endpoint (see control.py)
 # Features: select drive, start/stop monitoring, enable/disable, view tail of log, add to startup
 
+# Log written by file.pyw, outside the watched drive
+LOG_FILE = os.path.join(os.path.expanduser('~'), '.autosorter', 'logs', 'auto_sorter.log')
 
-def safe_import_autoscript():
-    try:
-        autos = importlib.import_module('file')
-        return autos
-    except Exception as e:
-        raise ImportError(f"Cannot import the autosorter script 'file.pyw': {e}")
+# Lines kept in the log viewer, older ones are dropped as new ones arrive
+MAX_LOG_LINES = 2000
 
 
 class AutoSorterGUI(tk.Tk):
@@ -25,16 +28,11 @@ class AutoSorterGUI(tk.Tk):
         self.title('AutoSorter App')
         self.geometry('1000x600')
 
-        try:
-            self.autos = safe_import_autoscript()
-        except Exception as e:
-            messagebox.showerror('Import error', str(e))
-            self.destroy()
-            return
-
-        # Drive selection
-        drives = self.autos.get_available_drives()
-        self.selected_drive = tk.StringVar(value=self.autos.current_drive if self.autos.current_drive in drives else (drives[0] if drives else ''))
+        # Drive selection, read from a cached drive inventory
+        self.drive_inventory = DriveInventory()
+        self.drive_inventory.start()
+        drives = self.drive_inventory.drives()
+        self.selected_drive = tk.StringVar(value='D:\\' if 'D:\\' in drives else (drives[0] if drives else ''))
 
         frame = ttk.Frame(self, padding=8)
         frame.pack(fill=tk.BOTH, expand=True)
@@ -50,7 +48,7 @@ class AutoSorterGUI(tk.Tk):
         self.stop_btn.grid(column=3, row=0)
 
         # Enable/disable toggle
-        self.enabled_var = tk.BooleanVar(value=self.autos.is_enabled)
+        self.enabled_var = tk.BooleanVar(value=True)
         self.enable_check = ttk.Checkbutton(frame, text='Automatic sorting enabled', variable=self.enabled_var, command=self.toggle_enabled)
         self.enable_check.grid(column=0, row=1, columnspan=2, sticky=tk.W, pady=(6, 0))
 
@@ -58,7 +56,7 @@ class AutoSorterGUI(tk.Tk):
         ttk.Button(frame, text='Add to startup', command=self.add_startup).grid(column=2, row=1, padx=8)
 
         # Run hidden / stop hidden (run the autosorter in background without showing a console window)
-        self.hidden_run_btn = ttk.Button(frame, text='Run Hidden (background)', command=self.run_hidden)
+        self.hidden_run_btn = ttk.Button(frame, text='Run Hidden (background)', command=self.run_hidden_selected)
         self.hidden_run_btn.grid(column=3, row=1, padx=(8, 0))
 
         self.hidden_stop_btn = ttk.Button(frame, text='Stop Hidden', command=self.stop_hidden, state=tk.DISABLED)
@@ -76,12 +74,25 @@ class AutoSorterGUI(tk.Tk):
         self.status_var = tk.StringVar(value='Idle')
         ttk.Label(frame, textvariable=self.status_var).grid(column=0, row=4, columnspan=4, sticky=tk.W, pady=(6, 0))
 
+        # Throughput and latency reported by the sorter's "stats" command
+        self.metrics_var = tk.StringVar(value='')
+        ttk.Label(frame, textvariable=self.metrics_var).grid(column=0, row=6, columnspan=4, sticky=tk.W, pady=(6, 0))
+
         # Internal
         self.monitor_thread = None
         self._stop_thread = threading.Event()
         self.hidden_proc = None
+        # Latest "status" and "stats" replies from the sorter, None while it is not running
+        self.sorter_status = None
+        self.sorter_stats = None
+        threading.Thread(target=self._poll_status, daemon=True).start()
+
+        # Follow the log from a background thread, the Tk thread only appends new lines
+        self.log_tailer = LogTailer(LOG_FILE, initial_lines=500)
+        self.log_tailer.start()
+        self.after(200, self.append_logs)
 
-        # Periodically refresh list of drives and logs
+        # Periodically refresh list of drives
         self.after(2000, self.periodic_refresh)
 
     def start_monitor(self):
@@ -90,15 +101,27 @@ class AutoSorterGUI(tk.Tk):
             messagebox.showerror('Drive error', 'Please select a valid drive.')
             return
 
+        if self.sorter_status is None:
+            # Nothing is listening yet, launch an idle sorter, the start command below picks the drive
+            self.run_hidden()
+
         # Start in background thread to avoid blocking UI (initial sorting can take time)
         def target():
-            try:
-                self.status_var.set(f'Starting monitor on {drive}...')
-                self.autos.start_observer(drive)
+            self.status_var.set(f'Starting monitor on {drive}...')
+            deadline = time.monotonic() + 10
+            while True:
+                try:
+                    reply = send_command('start', drive=drive, timeout=60)
+                    break
+                except OSError as e:
+                    if time.monotonic() > deadline:
+                        reply = {'ok': False, 'error': f'The sorter is not reachable: {e}'}
+                        break
+                    time.sleep(0.5)
+            if reply.get('ok'):
                 self.status_var.set(f'Monitoring: {drive}')
-            except Exception as e:
-                messagebox.showerror('Error', f'Error starting observer: {e}')
-                self.status_var.set('Error')
+            else:
+                self.status_var.set(f"Error starting observer: {reply.get('error')}")
 
         self.monitor_thread = threading.Thread(target=target, daemon=True)
         self.monitor_thread.start()
@@ -106,34 +129,48 @@ class AutoSorterGUI(tk.Tk):
         self.stop_btn.config(state=tk.NORMAL)
 
     def stop_monitor(self):
-        # Stop observer if exists
-        try:
-            if self.autos.observer:
-                self.autos.observer.stop()
-                self.autos.observer.join(timeout=2)
+        reply = self.command('stop')
+        if reply is not None:
             self.status_var.set('Stopped')
-        except Exception as e:
-            messagebox.showwarning('Warning', f'Problem stopping observer: {e}')
 
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
 
     def toggle_enabled(self):
-        # Use the script's existing toggle function (it expects a systray param but doesn't require it)
-        try:
-            # Call on_toggle with None - it will flip global is_enabled and update state
-            self.autos.on_toggle(None)
-            self.enabled_var.set(self.autos.is_enabled)
-            self.status_var.set('Enabled' if self.autos.is_enabled else 'Disabled')
-        except Exception as e:
-            messagebox.showerror('Error', f'Cannot toggle enabled state: {e}')
+        reply = self.command('resume' if self.enabled_var.get() else 'pause')
+        if reply is None:
+            self.enabled_var.set(not self.enabled_var.get())
+            return
+        self.enabled_var.set(reply['enabled'])
+        self.status_var.set('Enabled' if reply['enabled'] else 'Disabled')
 
     def add_startup(self):
-        try:
-            self.autos.add_to_startup()
+        if self.command('add_startup') is not None:
             messagebox.showinfo('Startup', 'Attempted to add to startup (check logs for errors).')
-        except Exception as e:
-            messagebox.showerror('Error', f'Cannot add to startup: {e}')
+
+    def command(self, cmd, **args):
+        """Send a command to the sorter, return its reply or None after showing the error"""
+        try:
+            reply = send_command(cmd, **args)
+        except OSError as e:
+            messagebox.showerror('Error', f'AutoSorter is not running (start it with Run Hidden): {e}')
+            return None
+        if not reply.get('ok'):
+            messagebox.showerror('Error', reply.get('error', 'Unknown error'))
+            return None
+        return reply
+
+    def _poll_status(self):
+        while True:
+            try:
+                reply = send_command('status', timeout=1.0)
+                self.sorter_status = reply if reply.get('ok') else None
+                reply = send_command('stats', timeout=1.0)
+                self.sorter_stats = reply if reply.get('ok') else None
+            except (OSError, ValueError):
+                self.sorter_status = None
+                self.sorter_stats = None
+            time.sleep(2)
 
     def _find_autoscript_path(self):
         # Try to locate the autosorter script in the same folder
@@ -142,16 +179,15 @@ class AutoSorterGUI(tk.Tk):
         for c in candidates:
             if os.path.exists(c):
                 return c
-        # fallback to module file if imported
-        try:
-            return os.path.abspath(self.autos.__file__)
-        except Exception:
-            return None
+        return None
 
-    def run_hidden(self):
-        """Start the autosorter as a separate hidden/background process (no console window)."""
-        if self.hidden_proc and self.hidden_proc.poll() is None:
-            messagebox.showinfo('Hidden runner', 'Hidden process already running.')
+    def run_hidden(self, drive=None):
+        """Start the autosorter as a separate hidden/background process (no console window).
+
+        Without a drive the sorter starts idle and waits for a "start" command.
+        """
+        if (self.hidden_proc and self.hidden_proc.poll() is None) or self.sorter_status is not None:
+            messagebox.showinfo('Hidden runner', 'AutoSorter is already running.')
             return
 
         script_path = self._find_autoscript_path()
@@ -182,19 +218,31 @@ class AutoSorterGUI(tk.Tk):
                 startupinfo = None
 
         try:
-            self.hidden_proc = subprocess.Popen([exe, script_path], creationflags=creationflags, startupinfo=startupinfo, close_fds=True)
+            self.hidden_proc = subprocess.Popen([exe, script_path, '--headless'] + (['--drive', drive] if drive else []), creationflags=creationflags, startupinfo=startupinfo, close_fds=True)
             self.hidden_run_btn.config(state=tk.DISABLED)
             self.hidden_stop_btn.config(state=tk.NORMAL)
             self.status_var.set(f'Hidden process started (pid={self.hidden_proc.pid})')
         except Exception as e:
             messagebox.showerror('Error', f'Failed to start hidden process: {e}')
 
+    def run_hidden_selected(self):
+        """Run hidden, watching the selected drive if it exists"""
+        drive = self.selected_drive.get()
+        self.run_hidden(drive if drive and os.path.exists(drive) else None)
+
     def stop_hidden(self):
+        # Ask the sorter to exit on its own, this also stops one started elsewhere
+        try:
+            send_command('quit')
+            self.status_var.set('AutoSorter stopped')
+        except OSError:
+            pass
         if not self.hidden_proc:
-            messagebox.showinfo('Stop hidden', 'No hidden process to stop.')
             return
         try:
-            if self.hidden_proc.poll() is None:
+            try:
+                self.hidden_proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
                 self.hidden_proc.terminate()
                 self.hidden_proc.wait(timeout=5)
             self.status_var.set('Hidden process stopped')
@@ -208,48 +256,76 @@ class AutoSorterGUI(tk.Tk):
     def show_help(self):
         help_text = (
             "AutoSorter GUI - Instructions\n\n"
-            "1) Select a drive and click 'Start Monitoring' to start the watcher in this GUI.\n"
+            "1) Select a drive and click 'Start Monitoring' to watch it (the sorter is launched in the background if it is not running).\n"
             "2) 'Run Hidden (background)' launches the autosorter script as a separate process without showing a console window.\n"
             "   - This uses pythonw.exe when available, or hides the window via the Windows API.\n"
-            "3) Use 'Stop Hidden' to terminate the background hidden process.\n"
+            "3) Use 'Stop Hidden' to shut the background sorter down.\n"
             "4) 'Add to startup' will attempt to create a shortcut in your Windows startup folder so the autosorter runs at login.\n"
-            "5) Logs are stored at <DRIVE>\\Logs\\auto_sorter.log (the GUI shows the tail).\n\n"
+            "5) Logs are stored at %USERPROFILE%\\.autosorter\\logs\\auto_sorter.log (the GUI shows the tail).\n\n"
             "Notes:\n"
             "- If you double-click to run a script without console, use the .pyw variant or the Run Hidden button.\n"
             "- On Windows, running as hidden does not make the process a service; it still runs under your user session.\n"
         )
         messagebox.showinfo('Help / Instructions', help_text)
 
-    def tail_log(self, path, n=200):
-        if not os.path.exists(path):
-            return ''
-        try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            return ''.join(lines[-n:])
-        except Exception:
-            return ''
-
-    def refresh_logs(self):
-        # Determine log path used by the autoscript
-        drive = self.selected_drive.get() or self.autos.current_drive
-        log_path = os.path.join(drive, 'Logs', 'auto_sorter.log')
-        content = self.tail_log(log_path, n=500)
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete('1.0', tk.END)
-        self.log_text.insert(tk.END, content)
-        self.log_text.config(state=tk.DISABLED)
+    def append_logs(self):
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.log_tailer.lines.get_nowait())
+            except queue.Empty:
+                break
+        if chunks:
+            self.log_text.config(state=tk.NORMAL)
+            self.log_text.insert(tk.END, ''.join(chunks))
+            # Keep the widget bounded, drop the oldest lines
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - MAX_LOG_LINES
+            if excess > 0:
+                self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.see(tk.END)
+            self.log_text.config(state=tk.DISABLED)
+        self.after(200, self.append_logs)
 
     def refresh_drives(self):
-        drives = self.autos.get_available_drives()
+        drives = self.drive_inventory.drives()
         self.drive_combo['values'] = drives
         if self.selected_drive.get() not in drives and drives:
             self.selected_drive.set(drives[0])
 
+    def refresh_status(self):
+        status = self.sorter_status
+        self.metrics_var.set(self.format_metrics(self.sorter_stats))
+        if status is None:
+            self.start_btn.config(state=tk.NORMAL)
+            self.stop_btn.config(state=tk.DISABLED)
+            self.hidden_stop_btn.config(state=tk.DISABLED)
+            return
+        self.enabled_var.set(status['enabled'])
+        self.hidden_run_btn.config(state=tk.DISABLED)
+        self.hidden_stop_btn.config(state=tk.NORMAL)
+        self.start_btn.config(state=tk.DISABLED if status['monitoring'] else tk.NORMAL)
+        self.stop_btn.config(state=tk.NORMAL if status['monitoring'] else tk.DISABLED)
+
+    def format_metrics(self, stats):
+        if not stats:
+            return ''
+        counters = stats['counters']
+        text = (
+            f"{summary(stats)} | events {counters.get('events_received', 0)}, "
+            f"{counters.get('bytes_moved', 0) / (1024 * 1024):.1f} MiB moved, errors {counters.get('errors', 0)}"
+        )
+        latency = stats['histograms'].get('detect_to_move_ms')
+        if latency:
+            text += f" | latency p50/p95/p99 {latency['p50']:g}/{latency['p95']:g}/{latency['p99']:g} ms"
+        if stats['categories']:
+            top = sorted(stats['categories'].items(), key=lambda item: -item[1])[:5]
+            text += ' | ' + ', '.join(f'{name} {count}' for name, count in top)
+        return text
+
     def periodic_refresh(self):
         try:
             self.refresh_drives()
-            self.refresh_logs()
+            self.refresh_status()
         finally:
             self.after(2000, self.periodic_refresh)
 
@@ -0,0 +1,93 @@
+import os
+import queue
+import threading
+
+# Bytes read per step when searching backwards for the last lines of a log
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def last_lines(f, n, block_size=TAIL_BLOCK_SIZE):
+    """Return (last n lines as bytes, end offset) by seeking backwards in blocks."""
+    end = f.seek(0, os.SEEK_END)
+    pos = end
+    data = b""
+    while pos > 0 and data.count(b"\n") <= n:
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+    lines = data.splitlines(keepends=True)
+    if pos > 0 and lines:
+        # The first line is cut off by the block boundary
+        lines = lines[1:]
+    return b"".join(lines[-n:]), end
+
+
+class LogTailer:
+    """Follow a log file from a background thread, like tail -F.
+
+    The first read returns the last initial_lines lines; after that only
+    complete new lines are reported. A file that shrinks or is replaced
+    (truncation or rotation) is read again from its start. Chunks of text
+    are put on self.lines for the GUI thread to pick up.
+    """
+
+    def __init__(self, path, initial_lines=500, interval=1.0):
+        self.path = path
+        self.initial_lines = initial_lines
+        self.interval = interval
+        self.lines = queue.Queue()
+        self._file_id = None
+        self._offset = None
+        self._partial = b""
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="LogTailer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def poll(self):
+        """Return text appended since the last call, or '' if there is none."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return ""
+        file_id = (st.st_dev, st.st_ino)
+        if self._offset is not None and (file_id != self._file_id or st.st_size < self._offset):
+            # Rotated or truncated, the new content starts at offset 0
+            self._offset = 0
+            self._partial = b""
+        if self._offset is not None and st.st_size == self._offset:
+            return ""
+
+        with open(self.path, "rb") as f:
+            if self._offset is None:
+                data, self._offset = last_lines(f, self.initial_lines)
+            else:
+                f.seek(self._offset)
+                data = f.read()
+                self._offset += len(data)
+        self._file_id = file_id
+
+        data = self._partial + data
+        cut = data.rfind(b"\n") + 1
+        self._partial = data[cut:]
+        return data[:cut].decode("utf-8", errors="replace")
+
+    def _run(self):
+        while True:
+            try:
+                text = self.poll()
+            except OSError:
+                text = ""
+            if text:
+                self.lines.put(text)
+            if self._stopped.wait(self.interval):
+                return
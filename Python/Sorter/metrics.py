@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import bisect
+import threading
+
+# Upper bounds (ms) of the latency histogram buckets, the last one catches the rest
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, float("inf"))
+
+
+class Histogram:
+    """Count observations into fixed buckets and estimate percentiles from them."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q):
+        """Return the upper bound of the bucket holding the q-th quantile.
+
+        Values past the last finite bound are reported as that bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        return bound if bound != float("inf") else self.bounds[-2]
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of counters, per-category counts, gauges and histograms.
+
+    Gauges are callables read when a snapshot is taken, e.g. the number of
+    files still waiting to settle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._categories = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._started = time.time()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def category(self, name):
+        with self._lock:
+            self._categories[name] = self._categories.get(name, 0) + 1
+
+    def gauge(self, name, func):
+        with self._lock:
+            self._gauges[name] = func
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def get(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            gauges = dict(self._gauges)
+            result = {
+                "uptime": time.time() - self._started,
+                "counters": dict(self._counters),
+                "categories": dict(self._categories),
+                "histograms": {name: h.snapshot() for name, h in self._histograms.items()},
+            }
+        # Read gauges outside the lock, they may take locks of their own
+        result["gauges"] = {}
+        for name, func in gauges.items():
+            try:
+                result["gauges"][name] = func()
+            except Exception:
+                result["gauges"][name] = None
+        return result
+
+    def dump(self, path):
+        """Write the snapshot as JSON, replacing the file atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+
+def summary(snapshot):
+    """One line for tooltips and status bars."""
+    counters = snapshot["counters"]
+    pending = snapshot["gauges"].get("queue_depth")
+    latency = snapshot["histograms"].get("detect_to_move_ms", {})
+    text = f"{counters.get('files_moved', 0)} moved, {pending or 0} pending"
+    if latency.get("p95") is not None:
+        text += f", p95 {latency['p95']:g} ms"
+    return text
+
+
+# Registry shared by the whole process
+registry = Metrics()
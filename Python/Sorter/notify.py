@@ -0,0 +1,126 @@
+# Shared with the other apps in this repository. This file in
+# auto-sorter/src/autosorter is the source, run auto-sorter/sync_shared.py
+# after editing it to update the copies.
+
+import time
+import queue
+import logging
+import threading
+
+# Defaults for apps without a config module, the autosorter package passes
+# config.NOTIFY_WINDOW, NOTIFY_RATE and NOTIFY_BURST instead.
+# Seconds of sorting activity folded into one desktop notification
+NOTIFY_WINDOW = 2.0
+
+# Notifications per second allowed on average, and how many may come at once
+NOTIFY_RATE = 0.2
+NOTIFY_BURST = 3
+
+
+def desktop_notify(message):
+    from plyer import notification
+
+    notification.notify(
+        title="AutoSorter",
+        message=message,
+        app_name="AutoSorter",
+        timeout=3
+    )
+
+
+class Notifier:
+    """Show desktop notifications from a background thread.
+
+    Calls only enqueue, so they never block a mover. Everything received
+    within window seconds is folded into one message such as
+    "37 files sorted into Images (30), Videos (7)", and a token bucket
+    (rate per second, up to burst) limits how often a popup is shown; while
+    it is empty, messages keep accumulating into the next one.
+    """
+
+    def __init__(self, window=NOTIFY_WINDOW, rate=NOTIFY_RATE, burst=NOTIFY_BURST, send=desktop_notify):
+        self.window = window
+        self.rate = rate
+        self.burst = burst
+        self.send = send
+        self._queue = queue.Queue(maxsize=10000)
+        self._tokens = burst
+        self._refilled = time.monotonic()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._reset()
+
+    def _reset(self):
+        self._sorted = {}
+        self._messages = []
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="Notifier", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread, showing whatever is still pending"""
+        self._stopped.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def file_sorted(self, category):
+        self._put(("sorted", category))
+
+    def message(self, text):
+        self._put(("message", text))
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            pass
+
+    def _drain(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                kind, value = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                return
+            if kind == "sorted":
+                self._sorted[value] = self._sorted.get(value, 0) + 1
+            else:
+                self._messages.append(value)
+
+    def summary(self):
+        lines = list(self._messages)
+        if self._sorted:
+            total = sum(self._sorted.values())
+            parts = sorted(self._sorted.items(), key=lambda item: -item[1])
+            into = ", ".join(f"{category} ({count})" for category, count in parts)
+            noun = "file" if total == 1 else "files"
+            lines.append(f"{total} {noun} sorted into {into}")
+        return "\n".join(lines)
+
+    def _take_token(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _flush(self, force=False):
+        text = self.summary()
+        if not text or not (force or self._take_token()):
+            return
+        self._reset()
+        try:
+            self.send(text)
+        except Exception as e:
+            logging.debug(f"Cannot show notification: {e}")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._drain(self.window)
+            self._flush()
+        self._drain(0)
+        self._flush(force=True)
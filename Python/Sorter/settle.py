@@ -0,0 +1,122 @@
+# Shared with the other apps in this repository. This file in
+# auto-sorter/src/autosorter is the source, run auto-sorter/sync_shared.py
+# after editing it to update the copies.
+
+import os
+import math
+import time
+import logging
+import threading
+
+# Defaults for apps without a config module, the autosorter package passes
+# config.SETTLE_QUIET_PERIOD and config.SETTLE_POLL_INTERVAL instead.
+# Seconds a new file's size and mtime must stay unchanged before it is sorted
+SETTLE_QUIET_PERIOD = 2.0
+
+# Tick of the timer wheel, in seconds
+SETTLE_POLL_INTERVAL = 0.5
+
+
+def is_unlocked(path):
+    """Return True if no other process holds the file open for writing."""
+    if not os.access(path, os.W_OK):
+        # Read-only files cannot be probed this way, rely on size/mtime only
+        return True
+    try:
+        with open(path, "rb+"):
+            return True
+    except OSError:
+        return False
+
+
+class SettleDetector:
+    """Release new files once their size, mtime and lock state stop changing.
+
+    Pending files live on a hashed timer wheel driven by a single background
+    thread, so watching a file never blocks the caller.
+    """
+
+    def __init__(self, on_ready, quiet_period=SETTLE_QUIET_PERIOD,
+                 poll_interval=SETTLE_POLL_INTERVAL, slots=64):
+        self.on_ready = on_ready
+        self.quiet_period = quiet_period
+        self.poll_interval = poll_interval
+        self._wheel = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._state = {}  # path -> ((size, mtime_ns), stable_since)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="SettleDetector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def watch(self, path):
+        """Start tracking a file; calling it again restarts the quiet period."""
+        with self._lock:
+            if path in self._state:
+                self._state[path] = None
+                return
+            self._state[path] = None
+            self._schedule(path, self.poll_interval)
+
+    def pending(self):
+        with self._lock:
+            return len(self._state)
+
+    def _schedule(self, path, delay):
+        ticks = max(1, math.ceil(delay / self.poll_interval))
+        ticks = min(ticks, len(self._wheel) - 1)
+        self._wheel[(self._cursor + ticks) % len(self._wheel)].add(path)
+
+    def _run(self):
+        while not self._stopped.wait(self.poll_interval):
+            with self._lock:
+                self._cursor = (self._cursor + 1) % len(self._wheel)
+                due = self._wheel[self._cursor]
+                self._wheel[self._cursor] = set()
+                ready = [path for path in due if self._check(path)]
+            for path in ready:
+                if self._stopped.is_set():
+                    # Stopped while releasing, leave the rest where they are
+                    return
+                try:
+                    self.on_ready(path)
+                except Exception as e:
+                    logging.error(f"Error releasing file '{path}': {e}")
+
+    def _check(self, path):
+        """Return True if the file is ready, otherwise reschedule or drop it."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Deleted or renamed before it settled
+            del self._state[path]
+            return False
+
+        signature = (st.st_size, st.st_mtime_ns)
+        now = time.monotonic()
+        previous = self._state[path]
+        if previous is None or previous[0] != signature:
+            self._state[path] = (signature, now)
+            self._schedule(path, self.quiet_period)
+            return False
+
+        remaining = self.quiet_period - (now - previous[1])
+        if remaining > 0:
+            self._schedule(path, remaining)
+            return False
+
+        if not is_unlocked(path):
+            self._schedule(path, self.poll_interval)
+            return False
+
+        del self._state[path]
+        return True
@@ -3,6 +3,7 @@ import shutil
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from routing import SuffixRouter
 
 source = r"D:\\"
 
@@ -19,21 +20,15 @@ dest_folders = {
     "DiskImages": ["diskimage"],
 }
 
+# One dict lookup per suffix length instead of a scan over every folder
+router = SuffixRouter.from_extensions_map(dest_folders, default="Others")
+
 def sort_file(filepath):
     if os.path.isfile(filepath):
         file = os.path.basename(filepath)
-        moved = False
-        for folder, exts in dest_folders.items():
-            if file.lower().endswith(tuple(exts)):
-                target = os.path.join(source, folder)
-                os.makedirs(target, exist_ok=True)
-                shutil.move(filepath, os.path.join(target, file))
-                moved = True
-                break
-        if not moved:
-            target = os.path.join(source, "Others")
-            os.makedirs(target, exist_ok=True)
-            shutil.move(filepath, os.path.join(target, file))
+        target = os.path.join(source, router.route(file))
+        os.makedirs(target, exist_ok=True)
+        shutil.move(filepath, os.path.join(target, file))
 
 class Handler(FileSystemEventHandler):
     def on_created(self, event):
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import shutil
+import socket
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from control import ControlServer, dispatch, load_token, parse_request, send_command
+
+class TestDispatch(unittest.TestCase):
+    def test_commands(self):
+        commands = {"status": lambda request: {"drive": "D:\\"}, "fail": lambda request: 1 / 0}
+
+        self.assertEqual(dispatch(commands, {"cmd": "status"}), {"drive": "D:\\", "ok": True})
+        self.assertFalse(dispatch(commands, {"cmd": "nope"})["ok"])
+        self.assertFalse(dispatch(commands, {"cmd": "fail"})["ok"])
+
+    def test_parse_request_rejects(self):
+        self.assertEqual(parse_request(b'{"cmd": "status", "token": "t"}', "t")["cmd"], "status")
+        for line in (b"POST / HTTP/1.1\r\n", b"[]", b'{"token": "t"}', b'{"cmd": "status"}', b'{"cmd": "status", "token": "x"}'):
+            with self.assertRaises(ValueError, msg=line):
+                parse_request(line, "t")
+
+class TestControlServer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.token_file = os.path.join(self.test_dir, "control.token")
+        self.started = []
+        commands = {"start": lambda request: self.started.append(request["drive"]) or {}}
+        self.server = ControlServer(commands, port=0, token_file=self.token_file)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_token_created_private(self):
+        self.assertEqual(len(load_token(self.token_file)), 64)
+        if os.name == "posix":
+            self.assertEqual(os.stat(self.token_file).st_mode & 0o777, 0o600)
+
+    def test_authorized_command(self):
+        reply = send_command("start", port=self.server.port, token_file=self.token_file, drive="E:\\")
+
+        self.assertTrue(reply["ok"])
+        self.assertEqual(self.started, ["E:\\"])
+
+    def test_http_post_not_dispatched(self):
+        body = json.dumps({"cmd": "start", "drive": "C:\\Users"}).encode()
+        request = (
+            b"POST / HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: text/plain\r\n"
+            + f"Content-Length: {len(body) + 1}\r\n\r\n".encode() + body + b"\n"
+        )
+        with socket.create_connection(("127.0.0.1", self.server.port), timeout=2) as sock:
+            sock.sendall(request)
+            with sock.makefile("rb") as f:
+                replies = f.read().splitlines()
+
+        # One error for the request line, then the connection is closed
+        self.assertEqual(len(replies), 1)
+        self.assertFalse(json.loads(replies[0])["ok"])
+        self.assertEqual(self.started, [])
+
+    def test_wrong_token_rejected(self):
+        with socket.create_connection(("127.0.0.1", self.server.port), timeout=2) as sock:
+            sock.sendall(b'{"cmd": "start", "drive": "C:\\\\", "token": "guess"}\n')
+            with sock.makefile("rb") as f:
+                reply = json.loads(f.readline())
+
+        self.assertFalse(reply["ok"])
+        self.assertEqual(self.started, [])
+
+if __name__ == "__main__":
+    unittest.main()
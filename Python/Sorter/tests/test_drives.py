@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import drives
+from drives import DriveInventory
+
+class TestDriveInventory(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.hung = set("ABCDEFGHI")
+        self.present = {"C", "X", "Y", "Z"}
+
+    def probe(self, drive):
+        if drive[0] in self.hung:
+            self.release.wait(10)
+        return drive[0] in self.present
+
+    def refresh(self, inventory):
+        with patch.object(drives, "logical_drive_mask", return_value=None), \
+                patch.object(drives, "probe_drive", self.probe):
+            started = time.monotonic()
+            result = inventory.refresh()
+        return result, time.monotonic() - started
+
+    def test_hung_drives_share_one_deadline(self):
+        changes = []
+        inventory = DriveInventory(timeout=0.3, on_change=changes.append)
+
+        result, seconds = self.refresh(inventory)
+
+        self.assertLess(seconds, 2)
+        self.assertEqual(result, ["X:\\", "Y:\\", "Z:\\"])
+        self.assertEqual(changes, [result])
+
+    def test_hung_drive_keeps_last_state(self):
+        inventory = DriveInventory(timeout=0.3)
+        self.hung = set()
+        self.assertEqual(self.refresh(inventory)[0], ["C:\\", "X:\\", "Y:\\", "Z:\\"])
+
+        # C: stops answering, it is neither dropped nor probed twice
+        self.hung = {"C"}
+        self.assertEqual(self.refresh(inventory)[0], ["C:\\", "X:\\", "Y:\\", "Z:\\"])
+        self.present.discard("X")
+        self.assertEqual(self.refresh(inventory)[0], ["C:\\", "Y:\\", "Z:\\"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logtail import LogTailer, last_lines
+
+class TestLastLines(unittest.TestCase):
+    def test_small_blocks(self):
+        data = b"".join(f"line {i}\n".encode() for i in range(100))
+        for block_size in (1, 7, 64, 4096):
+            text, end = last_lines(io.BytesIO(data), 3, block_size)
+            self.assertEqual(text, b"line 97\nline 98\nline 99\n", block_size)
+            self.assertEqual(end, len(data))
+
+    def test_short_and_empty_files(self):
+        self.assertEqual(last_lines(io.BytesIO(b"only\n"), 5), (b"only\n", 5))
+        self.assertEqual(last_lines(io.BytesIO(b""), 5), (b"", 0))
+
+class TestLogTailer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "auto_sorter.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, data, mode="ab"):
+        with open(self.path, mode) as f:
+            f.write(data)
+
+    def test_initial_lines_then_appends(self):
+        self.write(b"a\nb\nc\n")
+        tailer = LogTailer(self.path, initial_lines=2)
+
+        self.assertEqual(tailer.poll(), "b\nc\n")
+        self.assertEqual(tailer.poll(), "")
+        self.write(b"d\n")
+        self.assertEqual(tailer.poll(), "d\n")
+
+    def test_partial_line_held_back(self):
+        self.write(b"first\nhalf")
+        tailer = LogTailer(self.path)
+
+        self.assertEqual(tailer.poll(), "first\n")
+        self.write(b" done\nnext")
+        self.assertEqual(tailer.poll(), "half done\n")
+        self.write(b"\n")
+        self.assertEqual(tailer.poll(), "next\n")
+
+    def test_truncation(self):
+        self.write(b"old line one\nold line two\n")
+        tailer = LogTailer(self.path)
+        tailer.poll()
+
+        self.write(b"new\n", mode="wb")
+        self.assertEqual(tailer.poll(), "new\n")
+
+    def test_truncation_drops_partial_line(self):
+        self.write(b"old\ncut off")
+        tailer = LogTailer(self.path)
+        tailer.poll()
+
+        self.write(b"x\n", mode="wb")
+        self.assertEqual(tailer.poll(), "x\n")
+
+    def test_rotation(self):
+        self.write(b"before\n")
+        tailer = LogTailer(self.path)
+        self.assertEqual(tailer.poll(), "before\n")
+
+        # RotatingFileHandler renames the log and starts a new file, which may
+        # already be longer than the old offset
+        os.rename(self.path, self.path + ".1")
+        self.write(b"after rotation, a longer line\n")
+        self.assertEqual(tailer.poll(), "after rotation, a longer line\n")
+
+    def test_missing_file(self):
+        tailer = LogTailer(self.path)
+        self.assertEqual(tailer.poll(), "")
+        self.write(b"created\n")
+        self.assertEqual(tailer.poll(), "created\n")
+
+if __name__ == "__main__":
+    unittest.main()
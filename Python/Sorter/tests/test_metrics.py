@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Histogram, Metrics, summary
+
+class TestHistogram(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(Histogram().snapshot(), {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None})
+
+    def test_single_sample(self):
+        histogram = Histogram()
+        histogram.observe(42)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual((snapshot["p50"], snapshot["p95"], snapshot["p99"]), (50, 50, 50))
+        self.assertEqual(snapshot["mean"], 42)
+
+    def test_known_distribution(self):
+        histogram = Histogram()
+        for _ in range(90):
+            histogram.observe(3)
+        for _ in range(9):
+            histogram.observe(150)
+        histogram.observe(4000)
+
+        self.assertEqual(histogram.percentile(0.50), 5)
+        self.assertEqual(histogram.percentile(0.90), 5)
+        self.assertEqual(histogram.percentile(0.95), 200)
+        self.assertEqual(histogram.percentile(0.99), 200)
+        self.assertEqual(histogram.percentile(1.0), 5000)
+
+    def test_bounds_are_inclusive(self):
+        histogram = Histogram()
+        histogram.observe(5)
+        histogram.observe(0)
+        self.assertEqual(histogram.counts[:3], [1, 0, 1])
+
+    def test_beyond_top_bucket(self):
+        histogram = Histogram()
+        histogram.observe(10 ** 9)
+
+        self.assertEqual(histogram.counts[-1], 1)
+        # Reported as the last finite bound so the snapshot stays valid JSON
+        self.assertEqual(histogram.percentile(0.99), 60000)
+        json.dumps(histogram.snapshot(), allow_nan=False)
+
+class TestMetrics(unittest.TestCase):
+    def test_snapshot_and_dump(self):
+        metrics = Metrics()
+        metrics.incr("files_moved")
+        metrics.incr("files_moved", 2)
+        metrics.category("Images")
+        metrics.observe("detect_to_move_ms", 150)
+        metrics.gauge("queue_depth", lambda: 4)
+        metrics.gauge("broken", lambda: 1 / 0)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"], {"files_moved": 3})
+        self.assertEqual(snapshot["categories"], {"Images": 1})
+        self.assertEqual(snapshot["gauges"], {"queue_depth": 4, "broken": None})
+        self.assertEqual(summary(snapshot), "3 moved, 4 pending, p95 200 ms")
+
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        path = os.path.join(test_dir, "metrics.json")
+        metrics.dump(path)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["counters"], {"files_moved": 3})
+
+if __name__ == "__main__":
+    unittest.main()
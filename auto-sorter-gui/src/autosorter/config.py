@@ -9,10 +9,13 @@ class Config:
             "Docs": [".pdf", ".docx", ".txt", ".xlsx"],
             "Music": [".mp3", ".wav"],
             "Videos": [".mp4", ".mkv", ".avi"],
-            "Others": [".rar", ".zip", ".exe", ".msi"],
+            "Others": [".rar", ".zip", ".tar.gz", ".tgz"],
+            "Programs": [".exe", ".msi"],
             "DiskImages": [".iso", ".img"],
         }
         self.logging_enabled = True
+        # Rules checked before extensions_map, see rules.RuleEngine
+        self.rules = []
 
     def get_log_file(self):
         return self.log_file
@@ -23,6 +26,9 @@ class Config:
     def get_extensions_map(self):
         return self.extensions_map
 
+    def get_rules(self):
+        return self.rules
+
     def set_default_directory(self, directory):
         self.default_directory = directory
 
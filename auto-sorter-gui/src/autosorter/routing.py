@@ -0,0 +1,63 @@
+# Shared with the other apps in this repository. This file in
+# auto-sorter/src/autosorter is the source, run auto-sorter/sync_shared.py
+# after editing it to update the copies.
+
+import os
+
+
+class SuffixRouter:
+    """Map file names to categories by their longest known suffix.
+
+    Suffixes are stored lower-cased and without the leading dot in one dict
+    ("tar.gz", "gz", "png"), so routing a name costs at most one dict lookup
+    per suffix length, longest first, instead of a scan over every extension.
+    """
+
+    def __init__(self, ext_to_type, default="Misc"):
+        self.default = default
+        self._table = {}
+        self._max_parts = 1
+        for ext, category in ext_to_type.items():
+            self.add(ext, category)
+
+    @classmethod
+    def from_extensions_map(cls, extensions_map, default="Misc"):
+        """Build a router from a {category: [".ext", ...]} map like Config's."""
+        return cls(
+            {ext: category for category, exts in extensions_map.items() for ext in exts},
+            default,
+        )
+
+    def add(self, ext, category):
+        ext = ext.lower().lstrip(".")
+        self._table[ext] = category
+        self._max_parts = max(self._max_parts, ext.count(".") + 1)
+
+    def suffix(self, file_name):
+        """Return the longest known suffix of file_name, or its last one."""
+        parts = os.path.basename(file_name).lower().rsplit(".", self._max_parts)
+        if not parts[0]:
+            # Dot files such as ".bashrc" have no extension
+            del parts[0]
+        table = self._table
+        for n in range(len(parts) - 1, 1, -1):
+            ext = ".".join(parts[-n:])
+            if ext in table:
+                return ext
+        return parts[-1] if len(parts) > 1 else ""
+
+    def route(self, file_name):
+        """Return the category for file_name, or the default one."""
+        return self._table.get(self.suffix(file_name), self.default)
+
+
+# Routers compiled so far, keyed by id() of the mapping they were built from
+_routers = {}
+
+def get_router(ext_to_type):
+    """Return a cached router for an extension -> category mapping."""
+    cached = _routers.get(id(ext_to_type))
+    if cached is None or cached[0] is not ext_to_type:
+        cached = (ext_to_type, SuffixRouter(ext_to_type))
+        _routers[id(ext_to_type)] = cached
+    return cached[1]
@@ -1,6 +1,12 @@
-def sort_files_by_extension(source_directory, destination_directory):
+def sort_files_by_extension(source_directory, destination_directory, rules=None, dry_run=False):
+    """Sort files into category folders, or with dry_run only return the [(file, folder)] plan."""
     import os
     import shutil
+    from .rules import RuleEngine
+    from .routing import SuffixRouter
+
+    # Rules (see rules.RuleEngine) are tried first, then the extension map
+    engine = RuleEngine(rules) if rules else None
 
     ext_to_folder = {
         "png": "Images",
@@ -18,17 +24,32 @@ def sort_files_by_extension(source_directory, destination_directory):
         "avi": "Videos",
         "rar": "Others",
         "zip": "Others",
+        "tar.gz": "Others",
+        "tgz": "Others",
         "exe": "Programs",
         "msi": "Programs",
         "iso": "DiskImages",
         "img": "DiskImages",
     }
 
+    # Longest known suffix first, so "tar.gz" wins over "gz"
+    router = SuffixRouter(ext_to_folder)
+
+    plan = []
     for filename in os.listdir(source_directory):
         file_path = os.path.join(source_directory, filename)
         if os.path.isfile(file_path):
-            ext = os.path.splitext(filename)[1].lower().lstrip(".")
-            folder_name = ext_to_folder.get(ext, "Misc")
-            dest_folder = os.path.join(destination_directory, folder_name)
+            try:
+                folder_name = engine.destination(file_path, source_directory) if engine else None
+            except OSError:
+                # Removed while sorting
+                continue
+            if not folder_name:
+                folder_name = router.route(filename)
+            dest_folder = os.path.join(destination_directory, *folder_name.split("/"))
+            plan.append((file_path, dest_folder))
+            if dry_run:
+                continue
             os.makedirs(dest_folder, exist_ok=True)
-            shutil.move(file_path, os.path.join(dest_folder, filename))
\ No newline at end of file
+            shutil.move(file_path, os.path.join(dest_folder, filename))
+    return plan
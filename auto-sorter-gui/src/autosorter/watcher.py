@@ -3,6 +3,8 @@ import shutil
 import logging
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from .config import Config
+from .rules import RuleEngine
 
 class Watcher:
     def __init__(self, directory, sorter):
@@ -11,7 +13,10 @@ class Watcher:
         self.observer = Observer()
 
     def run(self):
-        event_handler = Handler(self.sorter)
+        # Never re-sort what already landed in a category folder
+        config = Config()
+        excluded = set(config.get_extensions_map()) | {"Misc"} | RuleEngine(config.get_rules()).top_folders()
+        event_handler = Handler(self.sorter, self.directory, excluded)
         self.observer.schedule(event_handler, self.directory, recursive=True)
         self.observer.start()
         logging.info(f"Started watching directory: {self.directory}")
@@ -23,15 +28,37 @@ class Watcher:
             self.observer.stop()
         self.observer.join()
 
+# Names used by browsers and download managers while a file is still in progress
+TEMP_SUFFIXES = (".crdownload", ".part", ".partial", ".download", ".opdownload", ".tmp")
+
+def is_temporary(path):
+    return os.path.basename(path).lower().endswith(TEMP_SUFFIXES)
+
 class Handler(FileSystemEventHandler):
-    def __init__(self, sorter):
+    def __init__(self, sorter, directory=None, excluded=()):
         self.sorter = sorter
+        self.directory = directory
+        self.excluded = {folder.lower() for folder in excluded}
+
+    def is_sorted(self, path):
+        """Return True for files inside one of the sorter's own folders"""
+        if not self.directory:
+            return False
+        relative = os.path.relpath(path, self.directory)
+        top = relative.split(os.sep)[0]
+        return top != relative and top.lower() in self.excluded
 
     def on_created(self, event):
-        if not event.is_directory:
+        if not event.is_directory and not is_temporary(event.src_path) and not self.is_sorted(event.src_path):
             logging.info(f"Detected new file: {event.src_path}")
             self.sorter.sort_file(event.src_path)
 
+    def on_moved(self, event):
+        # Downloads are renamed from their temp name once finished
+        if not event.is_directory and not is_temporary(event.dest_path) and not self.is_sorted(event.dest_path):
+            logging.info(f"Detected renamed file: {event.dest_path}")
+            self.sorter.sort_file(event.dest_path)
+
 def setup_logging(log_file):
     logging.basicConfig(
         filename=log_file,
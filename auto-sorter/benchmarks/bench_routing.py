@@ -0,0 +1,60 @@
+"""Compare extension routing strategies on a synthetic batch of file names.
+
+Usage:
+    python benchmarks/bench_routing.py [number_of_files]
+"""
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from autosorter.config import EXT_TO_TYPE
+from autosorter.routing import SuffixRouter
+
+# Same shape as dest_folders in Python/Sorter/sort.py
+DEST_FOLDERS = {}
+for _ext, _category in EXT_TO_TYPE.items():
+    DEST_FOLDERS.setdefault(_category, []).append("." + _ext)
+
+def endswith_scan(name):
+    """Linear scan over every category like Python/Sorter/sort.py."""
+    lower = name.lower()
+    for folder, exts in DEST_FOLDERS.items():
+        if lower.endswith(tuple(exts)):
+            return folder
+    return "Misc"
+
+def splitext_lookup(name):
+    """Final-suffix dict lookup like the original autosorter.mover."""
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    return EXT_TO_TYPE.get(ext, "Misc")
+
+def make_names(count):
+    exts = list(EXT_TO_TYPE) + ["js", "xyz", "tmp", ""]
+    rng = random.Random(0)
+    names = []
+    for i in range(count):
+        ext = rng.choice(exts)
+        names.append(f"File_{i}.{ext.upper() if i % 3 == 0 else ext}" if ext else f"File_{i}")
+    return names
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    names = make_names(count)
+    router = SuffixRouter(EXT_TO_TYPE)
+
+    for label, func in (
+        ("endswith scan", endswith_scan),
+        ("splitext lookup", splitext_lookup),
+        ("suffix router", router.route),
+    ):
+        seconds = min(timeit.repeat(lambda: [func(n) for n in names], number=1, repeat=5))
+        print(f"{label:16} {seconds * 1000:8.1f} ms  {count / seconds:12,.0f} files/s")
+
+    misrouted = sum(1 for n in names if splitext_lookup(n) != router.route(n))
+    print(f"{misrouted} of {count} names routed differently by the final-suffix lookup")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import os
+import sys
+import stat
+import queue
+import logging
+import tarfile
+import zipfile
+import threading
+from contextlib import closing
+from .config import EXTRACT_MAX_BYTES, EXTRACT_CHUNK_SIZE
+from .naming import get_name_index
+
+# Archive suffixes that can be unpacked with the standard library, longest first
+ARCHIVE_SUFFIXES = ("tar.gz", "tgz", "zip")
+
+# Added to niceness of the extractor thread where threads can be reprioritized
+EXTRACT_NICENESS = 10
+
+_STOP = object()
+
+
+class ArchiveTooLarge(Exception):
+    """Raised when an archive unpacks to more than the allowed number of bytes."""
+
+
+def archive_suffix(path):
+    """Return the archive suffix of path, or None if it is not unpacked."""
+    name = os.path.basename(path).lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith("." + suffix) and len(name) > len(suffix) + 1:
+            return suffix
+    return None
+
+
+def safe_member_path(folder, name):
+    """Return where member name goes inside folder, or None if it would escape it.
+
+    Absolute names, drive letters and ".." components are refused, so a
+    crafted archive cannot write outside the extraction folder (zip-slip).
+    """
+    parts = name.replace("\\", "/").split("/")
+    if name.startswith(("/", "\\")) or ":" in parts[0]:
+        return None
+    parts = [part for part in parts if part not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    path = os.path.join(folder, *parts)
+    base = os.path.abspath(folder) + os.sep
+    return path if os.path.abspath(path).startswith(base) else None
+
+
+def _zip_members(archive):
+    """Yield (name, open file) for each regular file of a zip, in order."""
+    with zipfile.ZipFile(archive) as z:
+        for info in z.infolist():
+            mode = info.external_attr >> 16
+            if info.is_dir() or stat.S_ISLNK(mode):
+                continue
+            with z.open(info) as f:
+                yield info.filename, f
+
+
+def _tar_members(archive):
+    """Yield (name, open file) for each regular file of a gzipped tar.
+
+    The tar is read as a stream ("r|gz"), so members are decompressed in
+    order and nothing but the current member is ever held.
+    """
+    with tarfile.open(archive, "r|gz") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            f = tar.extractfile(member)
+            try:
+                yield member.name, f
+            finally:
+                f.close()
+
+
+def _copy(src, dest_path, budget, chunk_size):
+    """Stream src into dest_path, return the bytes written."""
+    written = 0
+    with open(dest_path, "xb") as dest:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                return written
+            written += len(chunk)
+            if written > budget:
+                raise ArchiveTooLarge("unpacks to more than the extraction limit")
+            dest.write(chunk)
+
+
+def _remove_empty_dirs(folder):
+    for path, _, _ in os.walk(folder, topdown=False):
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+
+
+def extract_archive(archive, route=None, max_bytes=EXTRACT_MAX_BYTES, chunk_size=EXTRACT_CHUNK_SIZE, stopped=None):
+    """Unpack archive into a folder next to it and return (members, bytes).
+
+    Members are streamed one at a time in chunk_size reads, so memory use
+    does not depend on the archive size. Each one is handed to route(path)
+    as soon as it is complete, e.g. to sort it; the folder is removed at
+    the end if routing emptied it. Unpacking stops once max_bytes have been
+    written or the stopped event is set. The archive itself is left alone.
+    """
+    suffix = archive_suffix(archive)
+    if suffix is None:
+        raise ValueError(f"Not a supported archive: {archive}")
+    parent, name = os.path.split(archive)
+    folder = os.path.join(parent, get_name_index().reserve(parent, name[:-len(suffix) - 1]))
+    os.makedirs(folder)
+
+    members = written = 0
+    open_members = _zip_members if suffix == "zip" else _tar_members
+    try:
+        with closing(open_members(archive)) as entries:
+            for member, f in entries:
+                if stopped is not None and stopped.is_set():
+                    logging.info(f"Stopped unpacking '{archive}' after {members} files")
+                    break
+                dest = safe_member_path(folder, member)
+                if dest is None:
+                    logging.warning(f"Skipping unsafe member '{member}' of '{archive}'")
+                    continue
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                try:
+                    written += _copy(f, dest, max_bytes - written, chunk_size)
+                except FileExistsError:
+                    logging.warning(f"Skipping repeated member '{member}' of '{archive}'")
+                    continue
+                except ArchiveTooLarge:
+                    os.remove(dest)
+                    raise
+                members += 1
+                if route:
+                    route(dest)
+    finally:
+        _remove_empty_dirs(folder)
+    logging.info(f"Unpacked {members} files ({written / 1048576:.1f} MB) from '{archive}'")
+    return members, written
+
+
+class ArchiveExtractor:
+    """Unpack archives on one low-priority background thread.
+
+    Sorting never waits for it: submit() only queues the archive. The
+    thread lowers its own scheduling priority where the platform allows
+    it, so a large archive competes as little as possible with the movers.
+    """
+
+    def __init__(self, max_bytes=EXTRACT_MAX_BYTES, chunk_size=EXTRACT_CHUNK_SIZE):
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="Extractor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop after the member being unpacked, dropping queued archives"""
+        self._stopped.set()
+        self._queue.put(_STOP)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._drop_queued()
+
+    def submit(self, archive, route=None):
+        """Queue archive, route(path) is called for each unpacked member"""
+        if self._stopped.is_set():
+            logging.warning(f"Not unpacking '{archive}', the extractor is stopped")
+            return False
+        self._queue.put((archive, route))
+        return True
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def _drop_queued(self):
+        """Log the archives left unpacked because the extractor stopped"""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is not _STOP:
+                logging.warning(f"Not unpacking '{job[0]}', the extractor was stopped")
+
+    def _run(self):
+        if sys.platform.startswith("linux"):
+            try:
+                # On Linux the priority of a single thread can be changed by its id
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), EXTRACT_NICENESS)
+            except (AttributeError, OSError) as e:
+                logging.debug(f"Cannot lower extractor priority: {e}")
+        while True:
+            job = self._queue.get()
+            if job is _STOP or self._stopped.is_set():
+                if job is not _STOP:
+                    logging.warning(f"Not unpacking '{job[0]}', the extractor was stopped")
+                return
+            archive, route = job
+            try:
+                extract_archive(archive, route, self.max_bytes, self.chunk_size, self._stopped)
+            except Exception as e:
+                logging.error(f"Error unpacking '{archive}': {e}")
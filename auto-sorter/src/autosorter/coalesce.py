@@ -0,0 +1,93 @@
+import os
+import time
+import heapq
+import logging
+import threading
+from .config import COALESCE_WINDOW, TEMP_SUFFIXES, TEMP_PREFIXES
+
+
+def is_temporary(path):
+    """Return True for names browsers, archivers and editors use while writing."""
+    name = os.path.basename(path).lower()
+    return name.endswith(TEMP_SUFFIXES) or name.startswith(TEMP_PREFIXES)
+
+
+class EventCoalescer:
+    """Fold bursts of watcher events into one ready call per finished file.
+
+    Every created/modified event pushes the path's deadline window seconds
+    out, a move re-keys the pending entry to its new name (so a download
+    renamed from .crdownload is followed to the final file) and a delete
+    drops it. Temporary names are never reported. on_ready(path) runs on
+    the coalescer's own thread once a path has been quiet for the window.
+    """
+
+    def __init__(self, on_ready, window=COALESCE_WINDOW):
+        self.on_ready = on_ready
+        self.window = window
+        self._pending = {}  # path -> deadline
+        self._deadlines = []  # heap of (deadline, path), stale entries skipped
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="EventCoalescer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    def touched(self, path):
+        """A file was created or written to."""
+        if is_temporary(path):
+            return
+        with self._cond:
+            self._push(path)
+
+    def moved(self, src_path, dest_path):
+        with self._cond:
+            self._pending.pop(src_path, None)
+            if not is_temporary(dest_path):
+                self._push(dest_path)
+
+    def deleted(self, path):
+        with self._cond:
+            self._pending.pop(path, None)
+
+    def _push(self, path):
+        deadline = time.monotonic() + self.window
+        self._pending[path] = deadline
+        heapq.heappush(self._deadlines, (deadline, path))
+        self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                ready = []
+                while not ready:
+                    if self._stopped:
+                        return
+                    now = time.monotonic()
+                    while self._deadlines and self._deadlines[0][0] <= now:
+                        deadline, path = heapq.heappop(self._deadlines)
+                        if self._pending.get(path) == deadline:
+                            del self._pending[path]
+                            ready.append(path)
+                    if not ready:
+                        timeout = self._deadlines[0][0] - now if self._deadlines else None
+                        self._cond.wait(timeout)
+            for path in ready:
+                try:
+                    self.on_ready(path)
+                except Exception as e:
+                    logging.error(f"Error releasing file '{path}': {e}")
@@ -2,10 +2,23 @@
 
 # Configuration settings for the AutoSorter application
 
+import os
+
+# Folder for the sorter's own state, kept outside the watched drives
+APP_DIR = os.path.join(os.path.expanduser("~"), ".autosorter")
+
 # Default drive to monitor
 DEFAULT_DRIVE = "D:\\"
 
-# Mapping of file extensions to their respective categories
+# Folders to watch. Each root can override "ext_to_type", sort files up to
+# "max_depth" folders deep and skip names matching "exclude" globs. The
+# category folders of a root are never watched.
+WATCH_ROOTS = [
+    {"path": DEFAULT_DRIVE, "max_depth": 0, "exclude": ["Logs/*", "$RECYCLE.BIN/*", "System Volume Information/*"]},
+]
+
+# Mapping of file extensions to their respective categories.
+# Multi-part suffixes such as "tar.gz" win over their last part.
 EXT_TO_TYPE = {
     "png": "Images",
     "jpg": "Images",
@@ -22,8 +35,131 @@ EXT_TO_TYPE = {
     "avi": "Videos",
     "rar": "Others",
     "zip": "Others",
+    "7z": "Others",
+    "gz": "Others",
+    "tar.gz": "Others",
+    "tgz": "Others",
+    "tar.bz2": "Others",
+    "tar.xz": "Others",
     "exe": "Programs",
     "msi": "Programs",
     "iso": "DiskImages",
     "img": "DiskImages",
-}
\ No newline at end of file
+    "user.js": "Scripts",
+}
+
+# Rules checked before EXT_TO_TYPE, first match wins. Each rule has a "dest"
+# template under the watched root and any of: "name" (globs), "regex",
+# "min_size"/"max_size" (bytes), "min_age"/"max_age" (seconds), "root"
+# (glob on the watched root) and "sniffed" (extensions found by content).
+# Example: {"name": ["*.jpg", "*.png"], "min_size": 1048576, "dest": "Images/{yyyy}/{mm}"}
+RULES = []
+
+# Partition category folders by date, e.g. "{yyyy}/{mm}" puts a photo taken in
+# May 2024 into Images/2024/05. Photos use their EXIF capture date, other files
+# their modification date. None keeps flat category folders.
+DATE_LAYOUT = None
+
+# Categories the date layout applies to, None for all of them
+DATE_LAYOUT_CATEGORIES = None
+
+# Where EXIF capture dates are remembered between runs
+METADATA_CACHE_FILE = os.path.join(APP_DIR, "metadata_cache.json")
+
+# Most EXIF dates remembered, the least recently used are dropped first
+METADATA_CACHE_SIZE = 20000
+
+# Undo history: every move of a run is recorded here so the run can be
+# reverted with "python -m autosorter.history revert RUN"
+HISTORY_FILE = os.path.join(APP_DIR, "history.sqlite3")
+
+# Moves buffered before they are written to the history in one transaction
+HISTORY_FLUSH_EVERY = 100
+
+# Unpack zip and tar.gz archives after they are sorted into a folder next to
+# them and sort the unpacked files too. Runs on one low-priority thread.
+EXTRACT_ARCHIVES = False
+
+# Stop unpacking an archive once it has written this many bytes (zip bombs)
+EXTRACT_MAX_BYTES = 16 * 1024 * 1024 * 1024
+
+# Bytes decompressed per read while unpacking
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+# Seconds a new file's size and mtime must stay unchanged before it is sorted
+SETTLE_QUIET_PERIOD = 2.0
+
+# Tick of the settle detector's timer wheel, in seconds
+SETTLE_POLL_INTERVAL = 0.5
+
+# Number of mover threads sorting files in parallel
+MOVER_WORKERS = 4
+
+# Maximum number of files waiting to be moved before new ones are held back
+MOVER_QUEUE_SIZE = 256
+
+# Bytes copied per call when moving a file to another volume
+TRANSFER_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Bytes copied between fsync + journal checkpoints of a cross-device move
+TRANSFER_CHECKPOINT = 64 * 1024 * 1024
+
+# Look at file contents to classify files: None (off), "unknown" (only files
+# whose extension maps to nothing) or "all" (also fix mislabeled files)
+SNIFF_MODE = None
+
+# Where sniffed file types are remembered between runs
+SNIFF_CACHE_FILE = os.path.join(APP_DIR, "sniff_cache.json")
+
+# Most sniffed file types remembered, the least recently used are dropped first
+SNIFF_CACHE_SIZE = 20000
+
+# What to do with a file whose exact content is already sorted: None (off),
+# "skip" (leave it in place), "hardlink" (link to the existing copy) or
+# "quarantine" (move it into DUPLICATES_FOLDER)
+DEDUP_ACTION = None
+
+# Folder under the watched drive that receives quarantined duplicates
+DUPLICATES_FOLDER = "Duplicates"
+
+# SQLite index of sizes and hashes of sorted files
+DEDUP_INDEX_FILE = os.path.join(APP_DIR, "dedup.sqlite3")
+
+# Seconds without new events before a file is handed to the settle detector
+COALESCE_WINDOW = 1.0
+
+# Names written by browsers, download managers, archivers and editors while
+# a file is still in progress, never sorted
+TEMP_SUFFIXES = (
+    ".crdownload", ".part", ".partial", ".download", ".opdownload",
+    ".tmp", ".!ut", ".!qb", ".sortpart", ".sortpart.json",
+)
+TEMP_PREFIXES = ("~$", ".~lock.")
+
+# Write-ahead journal of accepted files, replayed on startup after a crash
+JOURNAL_FILE = os.path.join(APP_DIR, "journal.jsonl")
+
+# Number of journal records appended between compactions
+JOURNAL_COMPACT_EVERY = 1000
+
+# Snapshot of watched folders used to catch up on files that arrived while
+# the sorter was not running
+SNAPSHOT_FILE = os.path.join(APP_DIR, "snapshot.sqlite3")
+
+# Polling of network and removable drives: seconds between polls right after
+# a change, the cap reached when idle, and the growth factor per idle poll
+POLL_MIN_INTERVAL = 0.5
+POLL_MAX_INTERVAL = 30.0
+POLL_BACKOFF = 1.5
+
+# Notifications: seconds of activity folded into one popup, and the token
+# bucket limiting popups (tokens per second, largest burst)
+NOTIFY_WINDOW = 2.0
+NOTIFY_RATE = 0.2
+NOTIFY_BURST = 3
+
+# Logging: folder for the sorter's logs (outside the watched roots so writing
+# them never triggers a watch event), rotation size and rotated copies kept
+LOG_DIR = os.path.join(APP_DIR, "logs")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
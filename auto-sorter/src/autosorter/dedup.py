@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+from .config import DEDUP_INDEX_FILE
+
+# Bytes hashed from each end of a file for the cheap partial hash
+PARTIAL_BYTES = 64 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partial TEXT,
+    full TEXT
+);
+CREATE INDEX IF NOT EXISTS files_size ON files (size);
+"""
+
+
+def partial_hash(file_path, size):
+    """Hash the size plus the first and last PARTIAL_BYTES of a file."""
+    h = hashlib.blake2b(str(size).encode())
+    with open(file_path, "rb") as f:
+        h.update(f.read(PARTIAL_BYTES))
+        if size > 2 * PARTIAL_BYTES:
+            f.seek(-PARTIAL_BYTES, os.SEEK_END)
+            h.update(f.read(PARTIAL_BYTES))
+    return h.hexdigest()
+
+
+def full_hash(file_path):
+    h = hashlib.blake2b()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DedupIndex:
+    """SQLite index of files already sorted into destination folders.
+
+    Every file is stored with its size and mtime only. Partial and full
+    hashes are computed lazily, the first time another file of the same
+    size (and then the same partial hash) needs comparing, and are kept in
+    the index afterwards.
+    """
+
+    def __init__(self, path=DEDUP_INDEX_FILE):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._indexed_folders = set()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def add(self, file_path, st=None):
+        """Record a file that now lives in a destination folder."""
+        st = st or os.stat(file_path)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                (os.path.abspath(file_path), st.st_size, st.st_mtime_ns),
+            )
+
+    def remove(self, file_path):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM files WHERE path = ?", (os.path.abspath(file_path),))
+
+    def index_folder(self, folder):
+        """Add files already in folder, once per folder and process."""
+        if folder in self._indexed_folders:
+            return
+        rows = []
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    rows.append((os.path.abspath(entry.path), st.st_size, st.st_mtime_ns))
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO files (path, size, mtime_ns) VALUES (?, ?, ?)", rows
+            )
+        self._indexed_folders.add(folder)
+
+    def _candidates(self, size):
+        with self._lock:
+            return self._db.execute(
+                "SELECT path, mtime_ns, partial, full FROM files WHERE size = ?", (size,)
+            ).fetchall()
+
+    def _store(self, path, column, value):
+        with self._lock, self._db:
+            self._db.execute(f"UPDATE files SET {column} = ? WHERE path = ?", (value, path))
+
+    def find_duplicate(self, file_path):
+        """Return the path of an indexed file with identical content, or None."""
+        st = os.stat(file_path)
+        if not st.st_size:
+            return None
+        source = os.path.abspath(file_path)
+        partial = full = None
+        for path, mtime_ns, cand_partial, cand_full in self._candidates(st.st_size):
+            if path == source:
+                continue
+            try:
+                cand_st = os.stat(path)
+            except FileNotFoundError:
+                self.remove(path)
+                continue
+            if cand_st.st_size != st.st_size:
+                self.remove(path)
+                continue
+            if cand_st.st_mtime_ns != mtime_ns:
+                # Changed since it was indexed, its hashes are stale
+                self.add(path, cand_st)
+                cand_partial = cand_full = None
+
+            if partial is None:
+                partial = partial_hash(file_path, st.st_size)
+            if cand_partial is None:
+                cand_partial = partial_hash(path, st.st_size)
+                self._store(path, "partial", cand_partial)
+            if cand_partial != partial:
+                continue
+
+            if full is None:
+                full = full_hash(file_path)
+            if cand_full is None:
+                cand_full = full_hash(path)
+                self._store(path, "full", cand_full)
+            if cand_full == full:
+                return path
+        return None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_dedup_index():
+    """Return the process-wide dedup index, opening it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DedupIndex()
+            logging.info(f"Opened dedup index '{DEDUP_INDEX_FILE}'")
+        return _index
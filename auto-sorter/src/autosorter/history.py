@@ -0,0 +1,230 @@
+import os
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from .config import HISTORY_FILE, HISTORY_FLUSH_EVERY
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS moves (
+    id INTEGER PRIMARY KEY,
+    run INTEGER NOT NULL,
+    at REAL NOT NULL,
+    src_dir INTEGER NOT NULL,
+    src_name TEXT NOT NULL,
+    dst_dir INTEGER NOT NULL,
+    dst_name TEXT NOT NULL,
+    method TEXT NOT NULL,
+    reverted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS moves_run ON moves (run);
+CREATE INDEX IF NOT EXISTS moves_at ON moves (at);
+"""
+
+
+class MoveHistory:
+    """Per-run SQLite record of every move, so a run can be undone.
+
+    Folders are stored once in their own table and moves refer to them by
+    id, which keeps thousands of moves from one folder compact. Records are
+    buffered and written flush_every at a time in a single transaction.
+    """
+
+    def __init__(self, path=HISTORY_FILE, flush_every=HISTORY_FLUSH_EVERY):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self.flush_every = flush_every
+        self.run = None
+        self._dirs = {}
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def start_run(self, label=None):
+        """Begin a new run, later moves are recorded under its id."""
+        with self._lock:
+            self._flush()
+            cursor = self._db.execute("INSERT INTO runs (started, label) VALUES (?, ?)", (time.time(), label))
+            self._db.commit()
+            self.run = cursor.lastrowid
+            return self.run
+
+    def record(self, source, dest, method):
+        with self._lock:
+            if self.run is None:
+                return
+            self._buffer.append((self.run, time.time(), source, dest, method))
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def _dir_id(self, folder):
+        dir_id = self._dirs.get(folder)
+        if dir_id is None:
+            self._db.execute("INSERT OR IGNORE INTO dirs (path) VALUES (?)", (folder,))
+            (dir_id,) = self._db.execute("SELECT id FROM dirs WHERE path = ?", (folder,)).fetchone()
+            self._dirs[folder] = dir_id
+        return dir_id
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        rows = []
+        for run, at, source, dest, method in self._buffer:
+            src_dir, src_name = os.path.split(source)
+            dst_dir, dst_name = os.path.split(dest)
+            rows.append((run, at, self._dir_id(src_dir), src_name, self._dir_id(dst_dir), dst_name, method))
+        self._db.executemany(
+            "INSERT INTO moves (run, at, src_dir, src_name, dst_dir, dst_name, method) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._db.commit()
+        self._buffer = []
+
+    def runs(self):
+        """Return [(id, started, label, moves, reverted)] oldest first."""
+        with self._lock:
+            self._flush()
+            return self._db.execute(
+                "SELECT runs.id, runs.started, runs.label, COUNT(moves.id), COALESCE(SUM(moves.reverted), 0) "
+                "FROM runs LEFT JOIN moves ON moves.run = runs.id GROUP BY runs.id ORDER BY runs.id"
+            ).fetchall()
+
+    def moves(self, run=None, since=None, until=None):
+        """Return [(id, source, dest, method)] not yet reverted, newest first."""
+        query = (
+            "SELECT moves.id, src.path, moves.src_name, dst.path, moves.dst_name, moves.method FROM moves "
+            "JOIN dirs AS src ON src.id = moves.src_dir JOIN dirs AS dst ON dst.id = moves.dst_dir "
+            "WHERE moves.reverted = 0"
+        )
+        args = []
+        for clause, value in (("moves.run = ?", run), ("moves.at >= ?", since), ("moves.at <= ?", until)):
+            if value is not None:
+                query += " AND " + clause
+                args.append(value)
+        with self._lock:
+            self._flush()
+            rows = self._db.execute(query + " ORDER BY moves.id DESC", args).fetchall()
+        return [
+            (move_id, os.path.join(src_dir, src_name), os.path.join(dst_dir, dst_name), method)
+            for move_id, src_dir, src_name, dst_dir, dst_name, method in rows
+        ]
+
+    def revert(self, run=None, since=None, until=None):
+        """Move files of a run and/or time range back, return (reverted, errors).
+
+        Moves are grouped by (sorted folder, original folder) so each group
+        needs one device check and goes through the same no-clobber rename
+        as sorting; a name taken in the meantime gets a " (n)" suffix.
+        """
+        from .mover import relocate, same_device, ensure_folder
+
+        groups = {}
+        for move in self.moves(run, since, until):
+            key = (os.path.dirname(move[2]), os.path.dirname(move[1]))
+            groups.setdefault(key, []).append(move)
+
+        reverted, errors = [], 0
+        for (dest_dir, source_dir), moves in groups.items():
+            try:
+                ensure_folder(source_dir)
+                local = same_device(dest_dir, source_dir)
+            except OSError as e:
+                logging.error(f"Cannot revert moves from '{dest_dir}' to '{source_dir}': {e}")
+                errors += len(moves)
+                continue
+            for move_id, source, dest, method in moves:
+                try:
+                    relocate(dest, source, local=local)
+                except OSError as e:
+                    logging.error(f"Cannot move '{dest}' back to '{source}': {e}")
+                    errors += 1
+                    continue
+                reverted.append((move_id,))
+
+        with self._lock:
+            self._db.executemany("UPDATE moves SET reverted = 1 WHERE id = ?", reverted)
+            self._db.commit()
+        logging.info(f"Reverted {len(reverted)} moves, {errors} errors")
+        return len(reverted), errors
+
+
+# History that moves are currently recorded into, None when not recording
+_active = None
+
+def set_active_history(history):
+    global _active
+    _active = history
+
+def record_move(source, dest, method):
+    """Add a move to the active history, if any."""
+    history = _active
+    if history is not None:
+        history.record(source, dest, method)
+
+@contextmanager
+def recording(label, path=HISTORY_FILE):
+    """Record the moves made inside the with block as one run."""
+    history = MoveHistory(path)
+    history.start_run(label)
+    set_active_history(history)
+    try:
+        yield history
+    finally:
+        set_active_history(None)
+        history.close()
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m autosorter.history", description="List and undo sorting runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="show recorded runs")
+    undo = commands.add_parser("revert", help="move the files of a run or time range back")
+    undo.add_argument("run", nargs="?", type=int, help="run id from 'list'")
+    undo.add_argument("--since", help="ISO date/time, e.g. 2024-05-17T09:00")
+    undo.add_argument("--until", help="ISO date/time")
+    args = parser.parse_args(argv)
+
+    history = MoveHistory()
+    try:
+        if args.command == "list":
+            for run, started, label, moves, reverted in history.runs():
+                print(f"{run}\t{datetime.fromtimestamp(started):%Y-%m-%d %H:%M:%S}\t{moves} moves\t{reverted} reverted\t{label or ''}")
+            return 0
+        if args.run is None and not (args.since or args.until):
+            parser.error("give a run id or a --since/--until range")
+        reverted, errors = history.revert(args.run, _timestamp(args.since), _timestamp(args.until))
+        print(f"Reverted {reverted} moves, {errors} errors")
+        return 1 if errors else 0
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import os
+import json
+import logging
+import threading
+from .config import JOURNAL_FILE, JOURNAL_COMPACT_EVERY
+
+PENDING = "pending"
+STARTED = "started"
+DONE = "done"
+
+
+class MoveJournal:
+    """Append-only write-ahead log of the files the sorter has accepted.
+
+    Each file goes through pending -> started -> done. After a crash the
+    files that never reached done are returned by unfinished(), so startup
+    only has to look at those instead of re-listing the watched drives. The
+    log is rewritten with just the unfinished entries every
+    compact_every appends.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, compact_every=JOURNAL_COMPACT_EVERY):
+        self.path = path
+        self.compact_every = compact_every
+        self._entries = {}  # path -> (source, state), in insertion order
+        self._appends = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._load()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write at the end of a crashed run
+                        continue
+                    self._apply(record)
+        except FileNotFoundError:
+            pass
+
+    def _apply(self, record):
+        if record["op"] == DONE:
+            self._entries.pop(record["path"], None)
+        else:
+            previous = self._entries.get(record["path"])
+            source = record.get("source") or (previous[0] if previous else None)
+            self._entries[record["path"]] = (source, record["op"])
+
+    def _append(self, record):
+        with self._lock:
+            self._apply(record)
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            self._appends += 1
+            if self._appends >= self.compact_every:
+                self._compact()
+
+    def pending(self, file_path, source):
+        self._append({"op": PENDING, "path": file_path, "source": source})
+
+    def started(self, file_path):
+        self._append({"op": STARTED, "path": file_path})
+
+    def done(self, file_path):
+        self._append({"op": DONE, "path": file_path})
+
+    def unfinished(self, source=None):
+        """Return (path, source) pairs that were never marked done."""
+        with self._lock:
+            return [
+                (path, entry_source) for path, (entry_source, _) in self._entries.items()
+                if source is None or entry_source == source
+            ]
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        # Entries whose file is gone can never be replayed
+        self._entries = {
+            path: entry for path, entry in self._entries.items() if os.path.exists(path)
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for path, (source, state) in self._entries.items():
+                f.write(json.dumps({"op": state, "path": path, "source": source}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._appends = 0
+        logging.debug(f"Compacted journal to {len(self._entries)} entries")
+
+    def close(self):
+        with self._lock:
+            self._compact()
+            self._file.close()
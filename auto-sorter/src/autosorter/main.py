@@ -1,14 +1,24 @@
 import os
 import logging
-from autosorter.watcher import start_observer
-from autosorter.config import current_drive, setup_logging
+from autosorter.watcher import start_roots
+from autosorter.config import WATCH_ROOTS
+from autosorter.utils import setup_logging, stop_logging
 
 def main():
-    setup_logging(current_drive)
-    logging.info(f"Starting AutoSorter on drive: {current_drive}")
+    # Logs go to LOG_DIR, outside the watched roots
+    setup_logging()
+    logging.info(f"Starting AutoSorter on: {', '.join(root['path'] for root in WATCH_ROOTS)}")
     
-    # Start monitoring the specified drive
-    start_observer(current_drive)
+    # Start monitoring every configured root with one observer
+    observer = start_roots(WATCH_ROOTS)
+    try:
+        while observer.is_alive():
+            observer.join(1)
+    except KeyboardInterrupt:
+        # Stopping the observer drains moves that are already queued
+        observer.stop()
+    observer.join()
+    stop_logging()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import struct
+import logging
+import threading
+from .config import METADATA_CACHE_FILE, METADATA_CACHE_SIZE
+
+# Extensions whose header may carry an EXIF capture date
+EXIF_EXTENSIONS = {"jpg", "jpeg", "jpe", "tif", "tiff", "dng", "cr2", "nef", "arw", "orf", "rw2", "pef"}
+
+# Bytes of a JPEG scanned for the APP1 segment, and of a TIFF read for its IFDs
+EXIF_SCAN_LIMIT = 256 * 1024
+
+# EXIF tags holding when the picture was taken, in order of preference
+EXIF_IFD_POINTER = 0x8769
+DATE_TAGS = (0x9003, 0x9004)  # DateTimeOriginal, DateTimeDigitized
+
+
+def _parse_date(value):
+    """Turn an EXIF "YYYY:MM:DD HH:MM:SS" string into (year, month, day)."""
+    try:
+        year, month, day = (int(part) for part in value[:10].split(":"))
+    except ValueError:
+        return None
+    if year < 1900 or not 1 <= month <= 12 or not 1 <= day <= 31:
+        return None
+    return year, month, day
+
+
+def _read_ifd(tiff, offset, endian):
+    """Return {tag: (type, count, value, offset of the value field)} for one IFD."""
+    (count,) = struct.unpack_from(endian + "H", tiff, offset)
+    entries = {}
+    for i in range(count):
+        tag, kind, n, value = struct.unpack_from(endian + "HHII", tiff, offset + 2 + i * 12)
+        entries[tag] = (kind, n, value, offset + 2 + i * 12 + 8)
+    return entries
+
+
+def _tiff_date(tiff):
+    """Return the capture date stored in a TIFF structure, or None."""
+    if tiff[:4] == b"II*\x00":
+        endian = "<"
+    elif tiff[:4] == b"MM\x00*":
+        endian = ">"
+    else:
+        return None
+    try:
+        (ifd0,) = struct.unpack_from(endian + "I", tiff, 4)
+        pointer = _read_ifd(tiff, ifd0, endian).get(EXIF_IFD_POINTER)
+        if not pointer:
+            return None
+        exif = _read_ifd(tiff, pointer[2], endian)
+        for tag in DATE_TAGS:
+            if tag in exif:
+                kind, n, value, inline = exif[tag]
+                # ASCII values of more than 4 bytes live at the given offset
+                start = value if n > 4 else inline
+                date = _parse_date(tiff[start:start + n].decode("ascii", "replace"))
+                if date:
+                    return date
+    except struct.error:
+        # Truncated or pointing past what was read
+        return None
+    return None
+
+
+def read_exif_date(file_path):
+    """Return (year, month, day) from a JPEG or TIFF header, or None.
+
+    Only the header is read: JPEG segments are skipped until APP1, and
+    nothing past EXIF_SCAN_LIMIT bytes is looked at.
+    """
+    with open(file_path, "rb") as f:
+        start = f.read(4)
+        if start[:4] in (b"II*\x00", b"MM\x00*"):
+            return _tiff_date(start + f.read(EXIF_SCAN_LIMIT - 4))
+        if start[:2] != b"\xff\xd8":
+            return None
+        f.seek(2)
+        while f.tell() < EXIF_SCAN_LIMIT:
+            marker = f.read(4)
+            if len(marker) < 4 or marker[0] != 0xFF:
+                return None
+            # Start of scan or end of image: no EXIF before the pixel data
+            if marker[1] in (0xDA, 0xD9):
+                return None
+            (length,) = struct.unpack(">H", marker[2:])
+            if length < 2:
+                return None
+            if marker[1] == 0xE1:
+                segment = f.read(length - 2)
+                if segment.startswith(b"Exif\x00\x00"):
+                    return _tiff_date(segment[6:])
+            else:
+                f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+
+class MetadataCache:
+    """Persistent map of (path, size, mtime) -> EXIF capture date.
+
+    Files are only parsed again after they have been modified or moved.
+    At most max_entries are kept, the least recently used are dropped.
+    """
+
+    def __init__(self, path=METADATA_CACHE_FILE, save_every=100, max_entries=METADATA_CACHE_SIZE):
+        self.path = path
+        self.save_every = save_every
+        self.max_entries = max_entries
+        self._entries = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def key(file_path, st):
+        return f"{os.path.abspath(file_path)}|{st.st_size}|{st.st_mtime_ns}"
+
+    def _evict(self):
+        """Drop the least recently used entries past max_entries."""
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            # Caches written before the size limit may be larger
+            self._evict()
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable metadata cache '{self.path}': {e}")
+            self._entries = {}
+
+    def prune(self):
+        """Drop the entries of files that are gone, e.g. sorted away."""
+        with self._lock:
+            paths = {key.rsplit("|", 2)[0] for key in self._entries}
+        missing = {path for path in paths if not os.path.exists(path)}
+        with self._lock:
+            for key in [key for key in self._entries if key.rsplit("|", 2)[0] in missing]:
+                del self._entries[key]
+        return len(missing)
+
+    def save(self, prune=False):
+        if prune:
+            self.prune()
+        with self._lock:
+            entries = dict(self._entries)
+            self._unsaved = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
+
+    def exif_date(self, file_path, st=None):
+        """Return the EXIF capture date of file_path, parsing it at most once."""
+        key = self.key(file_path, st or os.stat(file_path))
+        with self._lock:
+            if key in self._entries:
+                # Reinsert so the oldest entries are the least recently used
+                date = self._entries[key] = self._entries.pop(key)
+                return tuple(date) if date else None
+        try:
+            date = read_exif_date(file_path)
+        except OSError as e:
+            logging.debug(f"Cannot read metadata of '{file_path}': {e}")
+            return None
+        with self._lock:
+            self._entries[key] = date
+            self._evict()
+            self._unsaved += 1
+            flush = self._unsaved >= self.save_every
+        if flush:
+            self.save()
+        return date
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_metadata_cache():
+    """Return the process-wide metadata cache, loading it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MetadataCache()
+        return _cache
+
+def capture_date(file_path):
+    """Return (year, month, day) the file was taken, or else last modified."""
+    st = os.stat(file_path)
+    if file_path.rsplit(".", 1)[-1].lower() in EXIF_EXTENSIONS:
+        date = get_metadata_cache().exif_date(file_path, st)
+        if date:
+            return date
+    modified = time.localtime(st.st_mtime)
+    return modified.tm_year, modified.tm_mon, modified.tm_mday
+
+def save_metadata_cache():
+    """Write the metadata cache to disk if it was used, without missing files."""
+    if _cache is not None:
+        _cache.save(prune=True)
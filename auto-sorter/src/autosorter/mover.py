@@ -1,18 +1,215 @@
-def move_file(file_path, source, ext_to_type):
-    """Move the file to the appropriate folder based on its extension."""
+import os
+import time
+import logging
+import threading
+from . import config
+from .config import EXT_TO_TYPE
+from .transfer import transfer_file
+from .routing import get_router
+from .sniff import sniff_category, get_sniff_cache
+from .rules import RuleEngine
+from .metadata import capture_date
+from .history import record_move
+from .dedup import get_dedup_index
+from .naming import get_name_index
+
+# Destination folders already created by this process
+_created_folders = set()
+
+# Move method -> [count, total seconds]
+_timings = {}
+_timings_lock = threading.Lock()
+
+# Rule engines compiled so far, keyed by id() of the rule list
+_engines = {}
+
+def _sniffed_extension(file_path):
+    try:
+        return get_sniff_cache().extension(file_path)
+    except OSError:
+        return None
+
+def get_rule_engine(rules):
+    """Return a cached engine compiled from a list of rule dicts."""
+    cached = _engines.get(id(rules))
+    if cached is None or cached[0] is not rules:
+        cached = (rules, RuleEngine(rules, sniff=_sniffed_extension, date=capture_date))
+        _engines[id(rules)] = cached
+    return cached[1]
+
+def get_category(file_path, ext_to_type=EXT_TO_TYPE):
+    """Return the category of a file by extension, or by content if enabled."""
+    router = get_router(ext_to_type)
+    category = router.route(file_path)
+    if config.SNIFF_MODE == "all" or (config.SNIFF_MODE and category == router.default):
+        category = sniff_category(file_path, ext_to_type) or category
+    return category
+
+def get_folder(file_path, source, ext_to_type=EXT_TO_TYPE):
+    """Return the "/"-separated folder under source that the file belongs in.
+
+    The first matching rule in config.RULES decides, otherwise the category,
+    partitioned by date when config.DATE_LAYOUT is set.
+    """
+    if config.RULES:
+        folder = get_rule_engine(config.RULES).destination(file_path, source)
+        if folder:
+            return folder
+    category = get_category(file_path, ext_to_type)
+    if config.DATE_LAYOUT and (config.DATE_LAYOUT_CATEGORIES is None or category in config.DATE_LAYOUT_CATEGORIES):
+        year, month, day = capture_date(file_path)
+        layout = config.DATE_LAYOUT.format(yyyy=f"{year:04d}", mm=f"{month:02d}", dd=f"{day:02d}")
+        return f"{category}/{layout}"
+    return category
+
+def get_destination(file_path, source, ext_to_type=EXT_TO_TYPE):
+    """Return the folder under source that the file belongs in."""
+    return os.path.join(source, *get_folder(file_path, source, ext_to_type).split("/"))
+
+def ensure_folder(path):
+    """Create a destination folder, skipping the syscall once it is known to exist."""
+    if path not in _created_folders:
+        os.makedirs(path, exist_ok=True)
+        _created_folders.add(path)
+
+def same_device(file_path, folder):
+    """Return True if a rename from file_path into folder stays on one volume."""
+    return os.stat(file_path).st_dev == os.stat(folder).st_dev
+
+def relocate(file_path, dest_file, progress=None, local=None):
+    """Move file_path to dest_file, return (method, final path).
+
+    An existing file is never overwritten: if the name is taken the next
+    free " (n)" name is used instead. A single no-clobber rename is enough on
+    the same volume, only cross-device moves pay for a chunked copy and
+    delete (see transfer_file). local=True skips the device check.
+    """
+    folder, name = os.path.split(dest_file)
+    if local is None:
+        try:
+            local = same_device(file_path, folder)
+        except FileNotFoundError:
+            # The cached folder was removed behind our back
+            _created_folders.discard(folder)
+            get_name_index().forget(folder)
+            ensure_folder(folder)
+            local = same_device(file_path, folder)
+
+    names = get_name_index()
+    if local:
+        final = names.place(file_path, folder, name)
+        record_move(file_path, final, "rename")
+        return "rename", final
+    # The temp name stays tied to dest_file so an interrupted copy can resume
+    final = transfer_file(file_path, dest_file, progress, rename=lambda temp: names.place(temp, folder, name))
+    record_move(file_path, final, "copy")
+    return "copy", final
+
+def record_timing(method, seconds):
+    with _timings_lock:
+        entry = _timings.setdefault(method, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+def get_move_timings():
+    """Return {method: (count, total_ms, avg_ms)} for moves done so far."""
+    with _timings_lock:
+        return {
+            method: (count, total * 1000, total * 1000 / count)
+            for method, (count, total) in _timings.items()
+        }
+
+def handle_duplicate(file_path, source, dest_file, duplicate):
+    """Apply DEDUP_ACTION to a file whose content is already sorted, return the method used."""
+    action = config.DEDUP_ACTION
+    if action == "hardlink":
+        folder, name = os.path.split(dest_file)
+        try:
+            link = None
+            if os.path.abspath(dest_file) != duplicate:
+                link = os.path.join(folder, get_name_index().reserve(folder, name))
+                os.link(duplicate, link)
+            os.remove(file_path)
+            if link:
+                # Moving the link back restores the removed file
+                record_move(file_path, link, "hardlink")
+            return "hardlink"
+        except OSError as e:
+            logging.warning(f"Cannot hard-link '{dest_file}' to '{duplicate}': {e}")
+    elif action == "quarantine":
+        folder = os.path.join(source, config.DUPLICATES_FOLDER)
+        ensure_folder(folder)
+        relocate(file_path, os.path.join(folder, os.path.basename(file_path)))
+        return "quarantine"
+    return "skip"
+
+def place_file(file_path, source, dest_path, progress=None, local=None, on_placed=None):
+    """Move file_path into dest_path and return the method used.
+
+    With DEDUP_ACTION set, files whose content already exists in the sorted
+    folders are handed to handle_duplicate instead. local=True skips the
+    device check when the caller already knows both sides share a volume.
+    on_placed(path) is called with the final path of a file that was moved.
+    """
+    dest_file = os.path.join(dest_path, os.path.basename(file_path))
+    if config.DEDUP_ACTION:
+        index = get_dedup_index()
+        index.index_folder(dest_path)
+        duplicate = index.find_duplicate(file_path)
+        if duplicate:
+            method = handle_duplicate(file_path, source, dest_file, duplicate)
+            logging.info(f"'{file_path}' duplicates '{duplicate}': {method}")
+            return method
+
+    method, dest_file = relocate(file_path, dest_file, progress, local)
+    if config.DEDUP_ACTION:
+        get_dedup_index().add(dest_file)
+    if on_placed:
+        on_placed(dest_file)
+    return method
+
+def move_file(file_path, source, ext_to_type=EXT_TO_TYPE, progress=None, on_placed=None, folder=None):
+    """Move the file to the appropriate folder based on its extension.
+
+    progress(copied, total) is reported while copying to another volume,
+    on_placed(path) receives where the file ended up. A folder already
+    returned by get_folder() is used as is instead of routing again.
+    """
     if os.path.isfile(file_path):
-        ext = os.path.splitext(file_path)[1].lower().lstrip(".")
-        folder = ext_to_type.get(ext, "Misc")
-        dest_path = os.path.join(source, folder)
-        os.makedirs(dest_path, exist_ok=True)
         try:
-            shutil.move(file_path, os.path.join(dest_path, os.path.basename(file_path)))
+            started = time.perf_counter()
+            if folder is None:
+                folder = get_folder(file_path, source, ext_to_type)
+            dest_path = os.path.join(source, *folder.split("/"))
+            category = folder.split("/")[0]
+            size = os.path.getsize(file_path)
+            ensure_folder(dest_path)
+            method = place_file(file_path, source, dest_path, progress, on_placed=on_placed)
+            if method == "skip":
+                # A duplicate left where it is, nothing was moved
+                logging.info(f"Skipped '{file_path}', its content is already in '{folder}'")
+                return f"Skipped '{os.path.basename(file_path)}', already sorted"
+            elapsed = time.perf_counter() - started
+            record_timing(method, elapsed)
+            logging.info(
+                f"Moved '{file_path}' to '{folder}' by {method}",
+                extra={"path": file_path, "category": category, "bytes": size, "latency_ms": round(elapsed * 1000, 1)}
+            )
             return f"File '{os.path.basename(file_path)}' moved to '{folder}'"
         except Exception as e:
             return f"Error moving file '{file_path}': {e}"
 
-def sort_files_in_directory(directory, ext_to_type):
-    """Sort all files in the specified directory."""
-    for file in os.listdir(directory):
-        file_path = os.path.join(directory, file)
-        move_file(file_path, directory, ext_to_type)
\ No newline at end of file
+def sort_files_in_directory(directory, ext_to_type=EXT_TO_TYPE, dry_run=False):
+    """Sort all files in the specified directory.
+
+    With dry_run=True nothing is moved and the MovePlan is returned instead.
+    """
+    if dry_run:
+        from .planner import plan_directory
+        return plan_directory(directory, ext_to_type)
+    from .sweep import sweep_directory
+
+    report = sweep_directory(directory, ext_to_type)
+    for method, (count, total_ms, avg_ms) in get_move_timings().items():
+        logging.info(f"{method}: {count} files in {total_ms:.0f} ms ({avg_ms:.2f} ms/file)")
+    return report
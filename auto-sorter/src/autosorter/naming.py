@@ -0,0 +1,127 @@
+import os
+import threading
+
+
+class NameIndex:
+    """In-memory view of the names taken in destination folders.
+
+    A folder is listed once, the first time something is placed in it.
+    After that it is kept current from our own placements. Destination
+    folders are not watched, so names created there by something else are
+    only noticed when a placement hits one; the folder is then listed
+    again. Each (folder, stem, extension) remembers the next " (n)" suffix
+    to try, so finding a free name in a crowded folder does not re-probe
+    every earlier suffix.
+    """
+
+    def __init__(self):
+        self._folders = {}  # folder -> set of lower-cased names
+        self._counters = {}  # (folder, stem, ext) -> next suffix number
+        self._lock = threading.Lock()
+
+    def _names(self, folder):
+        names = self._folders.get(folder)
+        if names is None:
+            try:
+                with os.scandir(folder) as it:
+                    names = {entry.name.lower() for entry in it}
+            except FileNotFoundError:
+                names = set()
+            self._folders[folder] = names
+        return names
+
+    def reserve(self, folder, name):
+        """Return a free name in folder, name itself if possible, and mark it taken."""
+        with self._lock:
+            names = self._names(folder)
+            if name.lower() not in names:
+                names.add(name.lower())
+                return name
+            stem, ext = os.path.splitext(name)
+            key = (folder, stem.lower(), ext.lower())
+            n = self._counters.get(key, 1)
+            candidate = f"{stem} ({n}){ext}"
+            while candidate.lower() in names:
+                n += 1
+                candidate = f"{stem} ({n}){ext}"
+            self._counters[key] = n + 1
+            names.add(candidate.lower())
+            return candidate
+
+    def file_added(self, path):
+        """Note a name that appeared in an already indexed folder."""
+        folder, name = os.path.split(path)
+        with self._lock:
+            if folder in self._folders:
+                self._folders[folder].add(name.lower())
+
+    def file_removed(self, path):
+        """Free a name so it can be used again."""
+        folder, name = os.path.split(path)
+        with self._lock:
+            if folder in self._folders:
+                self._folders[folder].discard(name.lower())
+
+    def place(self, file_path, folder, name):
+        """Rename file_path into folder under name or the next free variant.
+
+        Returns the final path. A FileExistsError means names were created
+        behind our back, so the folder is listed again before the next try.
+        """
+        while True:
+            target = os.path.join(folder, self.reserve(folder, name))
+            try:
+                rename_exclusive(file_path, target)
+                return target
+            except FileExistsError:
+                self.forget(folder)
+                continue
+            except Exception:
+                self.file_removed(target)
+                raise
+
+    def forget(self, folder):
+        """Drop a folder so it is listed again on next use."""
+        with self._lock:
+            self._folders.pop(folder, None)
+
+
+_index = NameIndex()
+
+def get_name_index():
+    return _index
+
+
+def claim(path):
+    """Atomically create an empty placeholder, FileExistsError if path is taken."""
+    os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+
+
+def rename_exclusive(file_path, dest_file):
+    """Rename on one volume without ever replacing an existing dest_file.
+
+    A hard link fails if the name is taken, so link + unlink is an atomic
+    no-clobber rename. Filesystems without hard links (FAT, exFAT, some
+    shares) claim the name with an exclusive create and rename over it.
+    """
+    try:
+        os.link(file_path, dest_file)
+    except FileExistsError:
+        raise
+    except (OSError, NotImplementedError):
+        claim(dest_file)
+        try:
+            os.replace(file_path, dest_file)
+        except BaseException:
+            # Do not leave the empty placeholder behind
+            try:
+                os.remove(dest_file)
+            except OSError:
+                pass
+            raise
+        return
+    try:
+        os.remove(file_path)
+    except OSError:
+        os.remove(dest_file)
+        raise
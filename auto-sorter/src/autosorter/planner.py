@@ -0,0 +1,215 @@
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+from . import config
+from .config import EXT_TO_TYPE, MOVER_WORKERS
+from .mover import ensure_folder, same_device, place_file, record_timing, get_destination, get_rule_engine
+from .pool import MoverPool
+from .sweep import SweepReport
+from .history import recording
+
+# Columns of a plan saved as CSV, one row per file
+CSV_FIELDS = ["source", "dest", "category", "bytes", "mtime_ns", "cross_device", "collision"]
+
+
+def _existing_parent(folder):
+    """Return folder or its nearest ancestor that exists."""
+    while not os.path.exists(folder):
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            break
+        folder = parent
+    return folder
+
+
+class MovePlan:
+    """What sorting a directory would do, computed without touching it.
+
+    entries holds one dict per file with its source path, destination
+    folder, category, size and mtime_ns, whether it would be copied to
+    another volume and whether its name is already taken there.
+    """
+
+    def __init__(self, root, entries=None):
+        self.root = root
+        self.entries = entries or []
+
+    def totals(self):
+        """Return per-category and overall file and byte counts."""
+        categories = {}
+        summary = {"files": 0, "bytes": 0, "cross_device_files": 0, "cross_device_bytes": 0, "collisions": 0}
+        for entry in self.entries:
+            totals = categories.setdefault(entry["category"], {"files": 0, "bytes": 0})
+            totals["files"] += 1
+            totals["bytes"] += entry["bytes"]
+            summary["files"] += 1
+            summary["bytes"] += entry["bytes"]
+            if entry["cross_device"]:
+                summary["cross_device_files"] += 1
+                summary["cross_device_bytes"] += entry["bytes"]
+            if entry["collision"]:
+                summary["collisions"] += 1
+        summary["categories"] = categories
+        return summary
+
+    def save(self, path):
+        """Write the plan as JSON, or as CSV if path ends with .csv."""
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.entries)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"root": self.root, "totals": self.totals(), "entries": self.entries}, f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        """Read a plan written by save(), only JSON plans carry their root."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["root"], data["entries"])
+
+    def __str__(self):
+        totals = self.totals()
+        lines = [
+            f"{totals['files']} files ({totals['bytes'] / 1048576:.1f} MB), "
+            f"{totals['cross_device_files']} copied across volumes ({totals['cross_device_bytes'] / 1048576:.1f} MB), "
+            f"{totals['collisions']} name collisions"
+        ]
+        for category, counts in sorted(totals["categories"].items()):
+            lines.append(f"  {category}: {counts['files']} files, {counts['bytes'] / 1048576:.1f} MB")
+        return "\n".join(lines)
+
+
+def plan_directory(directory, ext_to_type=EXT_TO_TYPE, max_depth=0):
+    """Walk directory with scandir and return the MovePlan for sorting it.
+
+    Files up to max_depth folders deep are planned, the sorter's own
+    category folders are skipped. Nothing is created or moved.
+    """
+    skipped = set(ext_to_type.values()) | {"Misc", config.DUPLICATES_FOLDER}
+    if config.RULES:
+        skipped |= get_rule_engine(config.RULES).top_folders()
+    skipped = {folder.lower() for folder in skipped}
+
+    plan = MovePlan(directory)
+    taken = set()
+    devices = {}
+    pending = [(directory, 0)]
+    while pending:
+        folder, depth = pending.pop()
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if depth < max_depth and not (folder == directory and entry.name.lower() in skipped):
+                        pending.append((entry.path, depth + 1))
+                    continue
+                if not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                    dest = get_destination(entry.path, directory, ext_to_type)
+                except OSError as e:
+                    logging.warning(f"Cannot plan '{entry.path}': {e}")
+                    continue
+                if dest not in devices:
+                    devices[dest] = os.stat(_existing_parent(dest)).st_dev
+                target = os.path.normcase(os.path.join(dest, entry.name))
+                plan.entries.append({
+                    "source": entry.path,
+                    "dest": dest,
+                    "category": os.path.relpath(dest, directory).split(os.sep)[0],
+                    "bytes": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "cross_device": st.st_dev != devices[dest],
+                    "collision": target in taken or os.path.exists(target),
+                })
+                taken.add(target)
+    return plan
+
+
+def _run_group(root, folder, entries, report):
+    moved = size = errors = skipped = 0
+    local = same_device(os.path.dirname(entries[0]["source"]), folder)
+    for entry in entries:
+        started = time.perf_counter()
+        try:
+            method = place_file(entry["source"], root, folder, local=local)
+        except OSError as e:
+            errors += 1
+            logging.error(f"Error moving file '{entry['source']}': {e}")
+            continue
+        if method == "skip":
+            skipped += 1
+            continue
+        record_timing(method, time.perf_counter() - started)
+        moved += 1
+        size += entry["bytes"]
+    report.add(moved, size, errors, skipped)
+
+
+def execute_plan(plan, workers=MOVER_WORKERS):
+    """Carry out a MovePlan on a MoverPool and return a SweepReport.
+
+    Files that are gone or were modified since planning are skipped and
+    counted as errors. Names that are taken by then get the usual
+    " (n)" suffix instead of overwriting anything.
+    """
+    report = SweepReport()
+    started = time.perf_counter()
+
+    groups = {}
+    for entry in plan.entries:
+        try:
+            st = os.stat(entry["source"])
+        except OSError:
+            st = None
+        if st is None or (st.st_size, st.st_mtime_ns) != (int(entry["bytes"]), int(entry["mtime_ns"])):
+            logging.warning(f"'{entry['source']}' changed since it was planned, skipping it")
+            report.add(0, 0, 1)
+            continue
+        # One device check per source folder and destination pair
+        key = (os.path.dirname(entry["source"]), entry["dest"])
+        groups.setdefault(key, []).append(entry)
+
+    pool = MoverPool(workers=workers, queue_size=max(workers, len(groups)))
+    pool.start()
+    for (_, folder), entries in groups.items():
+        ensure_folder(folder)
+        pool.submit(folder, _run_group, plan.root, folder, entries, report)
+    pool.shutdown(wait=True)
+
+    report.seconds = time.perf_counter() - started
+    logging.info(f"{plan.root}: {report}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m autosorter.planner", description="Plan a sort, then run the saved plan")
+    commands = parser.add_subparsers(dest="command", required=True)
+    make = commands.add_parser("plan", help="write what sorting a directory would do")
+    make.add_argument("directory")
+    make.add_argument("-o", "--output", help="plan file, .json or .csv")
+    make.add_argument("--depth", type=int, default=0, help="sort files this many folders deep")
+    run = commands.add_parser("run", help="execute a saved JSON plan")
+    run.add_argument("plan")
+    run.add_argument("--workers", type=int, default=MOVER_WORKERS)
+    args = parser.parse_args(argv)
+
+    if args.command == "plan":
+        plan = plan_directory(args.directory, max_depth=args.depth)
+        if args.output:
+            plan.save(args.output)
+        print(plan)
+    else:
+        with recording(f"plan {args.plan}"):
+            print(execute_plan(MovePlan.load(args.plan), args.workers))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import os
+import sys
+import logging
+from watchdog.events import FileCreatedEvent, FileDeletedEvent, DirCreatedEvent, DirDeletedEvent
+from watchdog.observers.api import BaseObserver, EventEmitter
+from .config import POLL_MIN_INTERVAL, POLL_MAX_INTERVAL, POLL_BACKOFF
+
+# Filesystems where native change notifications are missing or unreliable
+REMOTE_FS_TYPES = {
+    "nfs", "nfs4", "cifs", "smbfs", "smb3", "fuse.sshfs", "9p",
+    "vfat", "exfat", "msdos", "fuseblk", "iso9660", "udf",
+}
+
+
+def _windows_drive_type(path):
+    import ctypes
+
+    drive = os.path.splitdrive(os.path.abspath(path))[0] + "\\"
+    # DRIVE_REMOVABLE = 2, DRIVE_REMOTE = 4, DRIVE_CDROM = 5
+    return ctypes.windll.kernel32.GetDriveTypeW(drive)
+
+
+def _mount_fs_type(path):
+    """Return the filesystem type of the mount holding path, from /proc/mounts."""
+    path = os.path.realpath(path)
+    best, fs_type = "", None
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount = fields[1].replace("\\040", " ")
+                inside = path == mount or path.startswith(mount.rstrip("/") + "/")
+                if inside and len(mount) > len(best):
+                    best, fs_type = mount, fields[2]
+    except OSError:
+        return None
+    return fs_type
+
+
+def needs_polling(path):
+    """Return True for network shares and removable or optical drives."""
+    if path.startswith(("\\\\", "//")):
+        return True
+    if os.name == "nt":
+        try:
+            return _windows_drive_type(path) in (2, 4, 5)
+        except Exception as e:
+            logging.debug(f"Cannot get drive type of {path}: {e}")
+            return False
+    if sys.platform == "darwin":
+        return os.path.realpath(path).startswith("/Volumes/")
+    return _mount_fs_type(path) in REMOTE_FS_TYPES
+
+
+class AdaptivePollingEmitter(EventEmitter):
+    """Scandir-based emitter whose interval follows the change rate.
+
+    Each poll stats the known folders first and only lists those whose
+    mtime moved, so an idle poll costs one stat per folder. The interval
+    drops to POLL_MIN_INTERVAL whenever something changed and grows by
+    POLL_BACKOFF per idle poll up to POLL_MAX_INTERVAL.
+    """
+
+    def __init__(self, event_queue, watch, **kwargs):
+        super().__init__(event_queue, watch, **kwargs)
+        self.interval = POLL_MIN_INTERVAL
+        self._dirs = None  # folder -> (mtime_ns, set of entry names, set of subfolders)
+
+    def _list(self, folder):
+        names, subdirs = set(), set()
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.add(entry.name)
+                else:
+                    names.add(entry.name)
+        return names, subdirs
+
+    def _scan(self, folder, recursive):
+        """Record folder (and subfolders if recursive) without emitting events."""
+        try:
+            mtime_ns = os.stat(folder).st_mtime_ns
+            names, subdirs = self._list(folder)
+        except OSError:
+            return
+        self._dirs[folder] = (mtime_ns, names, subdirs)
+        if recursive:
+            for sub in subdirs:
+                self._scan(os.path.join(folder, sub), recursive)
+
+    def _forget(self, folder):
+        _, _, subdirs = self._dirs.pop(folder, (None, set(), set()))
+        for sub in subdirs:
+            self._forget(os.path.join(folder, sub))
+
+    def poll(self):
+        """Diff changed folders against the last poll, return the number of events."""
+        recursive = self.watch.is_recursive
+        if self._dirs is None:
+            self._dirs = {}
+            self._scan(self.watch.path, recursive)
+            return 0
+
+        events = 0
+        for folder in list(self._dirs):
+            if folder not in self._dirs:
+                continue
+            old_mtime, old_names, old_subdirs = self._dirs[folder]
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+                if mtime_ns == old_mtime:
+                    continue
+                names, subdirs = self._list(folder)
+            except OSError:
+                self._forget(folder)
+                self.queue_event(DirDeletedEvent(folder))
+                events += 1
+                continue
+            self._dirs[folder] = (mtime_ns, names, subdirs)
+
+            for name in names - old_names:
+                self.queue_event(FileCreatedEvent(os.path.join(folder, name)))
+            for name in old_names - names:
+                self.queue_event(FileDeletedEvent(os.path.join(folder, name)))
+            events += len(names ^ old_names)
+            for name in subdirs - old_subdirs:
+                self.queue_event(DirCreatedEvent(os.path.join(folder, name)))
+                if recursive:
+                    self._scan(os.path.join(folder, name), recursive)
+                    # Files already inside a new folder were never seen
+                    for file_name in self._dirs.get(os.path.join(folder, name), (0, set()))[1]:
+                        self.queue_event(FileCreatedEvent(os.path.join(folder, name, file_name)))
+            for name in old_subdirs - subdirs:
+                self._forget(os.path.join(folder, name))
+                self.queue_event(DirDeletedEvent(os.path.join(folder, name)))
+            events += len(subdirs ^ old_subdirs)
+        return events
+
+    def queue_events(self, timeout):
+        if self.stopped_event.wait(self.interval):
+            return
+        if self.poll():
+            self.interval = POLL_MIN_INTERVAL
+        else:
+            self.interval = min(self.interval * POLL_BACKOFF, POLL_MAX_INTERVAL)
+
+
+class AdaptivePollingObserver(BaseObserver):
+    """Observer for roots where native change notifications cannot be trusted"""
+
+    def __init__(self, timeout=1.0):
+        super().__init__(AdaptivePollingEmitter, timeout=timeout)
@@ -0,0 +1,69 @@
+import queue
+import logging
+import threading
+from .config import MOVER_WORKERS, MOVER_QUEUE_SIZE
+
+_STOP = object()
+
+
+class MoverPool:
+    """Run file moves on a fixed set of worker threads.
+
+    Each job carries a key (its destination folder). Jobs with the same key
+    always land on the same worker, so moves into one folder keep their
+    submission order while different folders are sorted in parallel.
+    """
+
+    def __init__(self, workers=MOVER_WORKERS, queue_size=MOVER_QUEUE_SIZE):
+        per_worker = max(1, queue_size // workers)
+        self._queues = [queue.Queue(maxsize=per_worker) for _ in range(workers)]
+        self._threads = []
+        self._closed = False
+
+    def start(self):
+        for i, jobs in enumerate(self._queues):
+            thread = threading.Thread(target=self._work, args=(jobs,), name=f"Mover-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, key, func, *args, timeout=None):
+        """Queue func(*args) behind earlier jobs with the same key.
+
+        Blocks while that worker's queue is full. Returns False if the pool is
+        shut down or the queue stayed full for longer than timeout.
+        """
+        if self._closed:
+            return False
+        jobs = self._queues[hash(key) % len(self._queues)]
+        try:
+            jobs.put((func, args), timeout=timeout)
+        except queue.Full:
+            logging.warning(f"Mover queue full, dropped job for '{key}'")
+            return False
+        return True
+
+    def qsize(self):
+        return sum(jobs.qsize() for jobs in self._queues)
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and let the workers finish what is queued."""
+        if self._closed:
+            return
+        self._closed = True
+        for jobs in self._queues:
+            jobs.put(_STOP)
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def _work(self, jobs):
+        while True:
+            job = jobs.get()
+            if job is _STOP:
+                return
+            func, args = job
+            try:
+                func(*args)
+            except Exception as e:
+                logging.error(f"Error in mover job {func.__name__}{args}: {e}")
@@ -0,0 +1,203 @@
+# Shared with the other apps in this repository. This file in
+# auto-sorter/src/autosorter is the source, run auto-sorter/sync_shared.py
+# after editing it to update the copies.
+
+import os
+import re
+import time
+import string
+import fnmatch
+
+# Options a rule may use, besides "dest"
+RULE_OPTIONS = {"name", "regex", "min_size", "max_size", "min_age", "max_age", "root", "sniffed"}
+
+# Fields a "dest" template may use
+DEST_FIELDS = {"yyyy", "mm", "dd", "ext", "name"}
+
+# A glob that only pins the extension, e.g. "*.png" or "*.tar.gz"
+_SUFFIX_GLOB = re.compile(r"^\*\.([^*?\[\]]+)$")
+
+
+def _as_list(value):
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _normalize(path):
+    return path.replace("\\", "/").rstrip("/").lower()
+
+
+class _File:
+    """Facts about one file, each looked up only when a rule needs it."""
+
+    def __init__(self, path, root, sniff):
+        self.path = path
+        self.root = root
+        self.name = os.path.basename(path).lower()
+        self._sniff = sniff
+        self._stat = None
+        self._sniffed = False
+
+    @property
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    @property
+    def sniffed(self):
+        if self._sniffed is False:
+            self._sniffed = self._sniff(self.path) if self._sniff else None
+        return self._sniffed
+
+
+class _Fields(dict):
+    """Template fields for a destination, computed on first use."""
+
+    def __init__(self, file, suffix, date=None):
+        super().__init__()
+        self.file = file
+        self.suffix = suffix
+        self.date = date
+
+    def __missing__(self, key):
+        if key in ("yyyy", "mm", "dd"):
+            date = self.date(self.file.path) if self.date else None
+            if not date:
+                modified = time.localtime(self.file.stat.st_mtime)
+                date = modified.tm_year, modified.tm_mon, modified.tm_mday
+            self.update(yyyy=f"{date[0]:04d}", mm=f"{date[1]:02d}", dd=f"{date[2]:02d}")
+        elif key == "ext":
+            self["ext"] = self.suffix
+        elif key == "name":
+            base = os.path.basename(self.file.path)
+            self["name"] = base[:-len(self.suffix) - 1] if self.suffix else base
+        else:
+            raise KeyError(f"Unknown field {{{key}}} in rule destination")
+        return self[key]
+
+
+class Rule:
+    """One compiled rule: every given predicate must hold for a file to match."""
+
+    def __init__(self, spec):
+        unknown = set(spec) - RULE_OPTIONS - {"dest"}
+        if unknown:
+            raise ValueError(f"Unknown rule option(s) {sorted(unknown)} in {spec}")
+        if "dest" not in spec:
+            raise ValueError(f"Rule without a destination: {spec}")
+        self.dest = spec["dest"].replace("\\", "/").strip("/")
+        try:
+            fields = {field for _, field, _, _ in string.Formatter().parse(self.dest) if field is not None}
+        except ValueError as e:
+            raise ValueError(f"Bad destination template in {spec}: {e}")
+        if fields - DEST_FIELDS:
+            raise ValueError(f"Unknown field(s) {sorted(fields - DEST_FIELDS)} in rule destination: {spec}")
+        globs = [glob.lower() for glob in _as_list(spec.get("name", ()))]
+        self.name = re.compile("|".join(fnmatch.translate(glob) for glob in globs)) if globs else None
+        self.regex = re.compile(spec["regex"], re.IGNORECASE) if "regex" in spec else None
+        self.min_size = spec.get("min_size")
+        self.max_size = spec.get("max_size")
+        self.min_age = spec.get("min_age")
+        self.max_age = spec.get("max_age")
+        roots = [_normalize(root) for root in _as_list(spec.get("root", ()))]
+        self.root = re.compile("|".join(fnmatch.translate(root) for root in roots)) if roots else None
+        sniffed = spec.get("sniffed")
+        self.sniffed = {ext.lower().lstrip(".") for ext in _as_list(sniffed)} if sniffed else None
+
+        # Rules matching on nothing but "*.ext" globs can be indexed by suffix
+        suffixes = [_SUFFIX_GLOB.match(glob) for glob in globs]
+        if globs and all(suffixes) and not self.regex:
+            self.suffixes = {match.group(1) for match in suffixes}
+        else:
+            self.suffixes = None
+
+    def matches(self, file, now):
+        if self.name and not self.name.match(file.name):
+            return False
+        if self.regex and not self.regex.search(file.name):
+            return False
+        if self.root and not (file.root is not None and self.root.match(_normalize(file.root))):
+            return False
+        if self.min_size is not None and file.stat.st_size < self.min_size:
+            return False
+        if self.max_size is not None and file.stat.st_size > self.max_size:
+            return False
+        if self.min_age is not None and now - file.stat.st_mtime < self.min_age:
+            return False
+        if self.max_age is not None and now - file.stat.st_mtime > self.max_age:
+            return False
+        if self.sniffed and file.sniffed not in self.sniffed:
+            return False
+        return True
+
+
+class RuleEngine:
+    """Pick a destination for a file from an ordered list of rules.
+
+    A rule is a dict with a "dest" template and any of these predicates:
+    "name" (glob or list of globs), "regex" (searched in the file name),
+    "min_size"/"max_size" (bytes), "min_age"/"max_age" (seconds since the
+    last modification), "root" (glob on the watched root) and "sniffed"
+    (extensions recognized from the file's content). Names match
+    case-insensitively and the first matching rule wins. "dest" may use
+    {yyyy}, {mm}, {dd}, {ext} and {name}. The date comes from
+    date(path) -> (year, month, day) if given (e.g. an EXIF capture date),
+    else from the modification time.
+
+    Rules are compiled once. Rules that only test "*.ext" globs are indexed
+    by suffix, so a file is checked against the rules for its own suffix
+    plus the rules that cannot be indexed, never against the whole list.
+    sniff(path) -> extension or None is only called when a rule needs it.
+    """
+
+    def __init__(self, rules, sniff=None, date=None):
+        self.rules = [Rule(spec) for spec in rules]
+        self.sniff = sniff
+        self.date = date
+        indexed = set()
+        for rule in self.rules:
+            indexed |= rule.suffixes or set()
+        self._max_parts = max([suffix.count(".") + 1 for suffix in indexed] or [1])
+        self._generic = tuple(rule for rule in self.rules if rule.suffixes is None)
+        # "a.tar.gz" must also be checked against "*.gz" rules
+        self._by_suffix = {
+            suffix: tuple(
+                rule for rule in self.rules
+                if rule.suffixes is None
+                or any(suffix == own or suffix.endswith("." + own) for own in rule.suffixes)
+            )
+            for suffix in indexed
+        }
+
+    def suffix(self, name):
+        """Return the longest indexed suffix of a lower-cased name, or its last one."""
+        parts = name.rsplit(".", self._max_parts)
+        if not parts[0]:
+            # Dot files such as ".bashrc" have no extension
+            del parts[0]
+        for n in range(len(parts) - 1, 1, -1):
+            ext = ".".join(parts[-n:])
+            if ext in self._by_suffix:
+                return ext
+        return parts[-1] if len(parts) > 1 else ""
+
+    def match(self, file_path, root=None):
+        """Return (rule, fields) for the first matching rule, or (None, None)."""
+        file = _File(file_path, root, self.sniff)
+        suffix = self.suffix(file.name)
+        now = time.time()
+        for rule in self._by_suffix.get(suffix, self._generic):
+            if rule.matches(file, now):
+                return rule, _Fields(file, suffix, self.date)
+        return None, None
+
+    def destination(self, file_path, root=None):
+        """Return the destination folder relative to root, "/"-separated, or None."""
+        rule, fields = self.match(file_path, root)
+        if rule is None:
+            return None
+        return rule.dest.format_map(fields)
+
+    def top_folders(self):
+        """Return the fixed first folder of each rule's destination."""
+        return {rule.dest.split("/")[0] for rule in self.rules if "{" not in rule.dest.split("/")[0]}
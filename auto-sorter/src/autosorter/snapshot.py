@@ -0,0 +1,120 @@
+import os
+import sqlite3
+import logging
+import threading
+from .config import SNAPSHOT_FILE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+"""
+
+
+class DirectorySnapshot:
+    """SQLite snapshot of the names, sizes and mtimes under watched roots.
+
+    A folder whose own mtime matches the snapshot has had no entries added,
+    removed or renamed, so catching up after a restart costs one stat per
+    known folder plus a listing of only the folders that changed.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _forget_dir(self, folder):
+        prefix = folder.rstrip("/\\") + os.sep
+        self._db.execute("DELETE FROM files WHERE dir = ? OR substr(dir, 1, ?) = ?", (folder, len(prefix), prefix))
+        self._db.execute("DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?", (folder, len(prefix), prefix))
+
+    def _relist(self, folder, parent, mtime_ns, accept):
+        """Compare a changed folder with the snapshot, return (changed files, subfolders)."""
+        known = {
+            path: (size, mtime) for path, size, mtime in
+            self._db.execute("SELECT path, size, mtime_ns FROM files WHERE dir = ?", (folder,))
+        }
+        known_dirs = {
+            path for (path,) in self._db.execute("SELECT path FROM dirs WHERE parent = ?", (folder,))
+        }
+        changed, subdirs, rows = [], [], []
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    st = entry.stat()
+                    rows.append((entry.path, folder, st.st_size, st.st_mtime_ns))
+                    if known.pop(entry.path, None) != (st.st_size, st.st_mtime_ns) and accept(entry.path):
+                        changed.append(entry.path)
+        self._db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in known])
+        self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", rows)
+        for gone in known_dirs - set(subdirs):
+            self._forget_dir(gone)
+        self._db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (folder, parent, mtime_ns))
+        return changed, subdirs
+
+    def catch_up(self, root, max_depth=0, accept=None, accept_dir=None):
+        """Return files under root that are new or changed since the snapshot.
+
+        The snapshot is updated as it goes. accept(path) filters the files
+        returned and accept_dir(path) the folders descended into.
+        """
+        accept = accept or (lambda path: True)
+        accept_dir = accept_dir or (lambda path: True)
+        changed = []
+        listed = 0
+        stack = [(root, None, 0)]
+        with self._lock, self._db:
+            while stack:
+                folder, parent, depth = stack.pop()
+                try:
+                    mtime_ns = os.stat(folder).st_mtime_ns
+                except FileNotFoundError:
+                    self._forget_dir(folder)
+                    continue
+                row = self._db.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (folder,)).fetchone()
+                if row and row[0] == mtime_ns:
+                    subdirs = [
+                        path for (path,) in
+                        self._db.execute("SELECT path FROM dirs WHERE parent = ?", (folder,))
+                    ]
+                else:
+                    listed += 1
+                    found, subdirs = self._relist(folder, parent, mtime_ns, accept)
+                    changed.extend(found)
+                if depth < max_depth:
+                    stack.extend((sub, folder, depth + 1) for sub in subdirs if accept_dir(sub))
+        logging.info(f"Catch-up of {root}: listed {listed} changed folders, {len(changed)} new files")
+        return changed
+
+    def refresh(self, folders, accept=None):
+        """Record the current state of folders that changed while watching."""
+        accept = accept or (lambda path: True)
+        with self._lock, self._db:
+            for folder in folders:
+                try:
+                    mtime_ns = os.stat(folder).st_mtime_ns
+                except FileNotFoundError:
+                    self._forget_dir(folder)
+                    continue
+                row = self._db.execute("SELECT parent FROM dirs WHERE path = ?", (folder,)).fetchone()
+                parent = row[0] if row else os.path.dirname(folder)
+                self._relist(folder, parent, mtime_ns, accept)
@@ -0,0 +1,138 @@
+import os
+import json
+import logging
+import threading
+from .config import SNIFF_CACHE_FILE, SNIFF_CACHE_SIZE
+
+# Bytes read from the start of a file to match signatures
+HEAD_SIZE = 512
+
+# (offset, magic bytes, extension) checked in order against the file header
+SIGNATURES = [
+    (0, b"\x89PNG\r\n\x1a\n", "png"),
+    (0, b"\xff\xd8\xff", "jpg"),
+    (0, b"GIF87a", "gif"),
+    (0, b"GIF89a", "gif"),
+    (0, b"%PDF-", "pdf"),
+    (0, b"PK\x03\x04", "zip"),
+    (0, b"Rar!\x1a\x07", "rar"),
+    (0, b"7z\xbc\xaf\x27\x1c", "7z"),
+    (0, b"\x1f\x8b", "gz"),
+    (4, b"ftyp", "mp4"),
+    (0, b"\x1a\x45\xdf\xa3", "mkv"),
+    (0, b"ID3", "mp3"),
+    (0, b"MZ", "exe"),
+]
+
+# ISO9660 volume descriptors start at sector 16, the only read past HEAD_SIZE
+ISO_OFFSET = 32769
+ISO_MAGIC = b"CD001"
+
+# Entry names inside a zip header that mark an Office Open XML document
+OOXML_MARKERS = [(b"word/", "docx"), (b"xl/", "xlsx")]
+
+
+def sniff_extension(file_path):
+    """Return the extension matching the file's magic bytes, or None."""
+    with open(file_path, "rb") as f:
+        head = f.read(HEAD_SIZE)
+        for offset, magic, ext in SIGNATURES:
+            if head.startswith(magic, offset):
+                break
+        else:
+            f.seek(ISO_OFFSET)
+            return "iso" if f.read(len(ISO_MAGIC)) == ISO_MAGIC else None
+
+    if ext == "zip" and b"[Content_Types].xml" in head:
+        for marker, office_ext in OOXML_MARKERS:
+            if marker in head:
+                return office_ext
+        return "docx"
+    return ext
+
+
+class SniffCache:
+    """Persistent map of (inode, size, mtime) -> sniffed extension.
+
+    A file is only read again after it has been replaced or modified.
+    At most max_entries are kept, the least recently used are dropped.
+    """
+
+    def __init__(self, path=SNIFF_CACHE_FILE, save_every=100, max_entries=SNIFF_CACHE_SIZE):
+        self.path = path
+        self.save_every = save_every
+        self.max_entries = max_entries
+        self._entries = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def key(st):
+        return f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+    def _evict(self):
+        """Drop the least recently used entries past max_entries."""
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            # Caches written before the size limit may be larger
+            self._evict()
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable sniff cache '{self.path}': {e}")
+            self._entries = {}
+
+    def save(self):
+        with self._lock:
+            entries = dict(self._entries)
+            self._unsaved = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
+
+    def extension(self, file_path):
+        """Return the sniffed extension of file_path, reading it at most once."""
+        key = self.key(os.stat(file_path))
+        with self._lock:
+            if key in self._entries:
+                # Reinsert so the oldest entries are the least recently used
+                ext = self._entries[key] = self._entries.pop(key)
+                return ext
+        ext = sniff_extension(file_path)
+        with self._lock:
+            self._entries[key] = ext
+            self._evict()
+            self._unsaved += 1
+            flush = self._unsaved >= self.save_every
+        if flush:
+            self.save()
+        return ext
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_sniff_cache():
+    """Return the process-wide sniff cache, loading it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SniffCache()
+        return _cache
+
+def sniff_category(file_path, ext_to_type):
+    """Return the category of the file's content, or None if unknown."""
+    try:
+        ext = get_sniff_cache().extension(file_path)
+    except OSError as e:
+        logging.debug(f"Cannot sniff '{file_path}': {e}")
+        return None
+    return ext_to_type.get(ext) if ext else None
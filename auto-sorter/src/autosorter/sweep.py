@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import logging
+import threading
+from . import config
+from .config import EXT_TO_TYPE, MOVER_WORKERS
+from .mover import ensure_folder, same_device, place_file, record_timing, get_destination
+from .pool import MoverPool
+from .sniff import get_sniff_cache
+from .metadata import save_metadata_cache
+
+
+class SweepReport:
+    """Totals for one bulk sort of a directory."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.errors = 0
+        self.skipped = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, files, size, errors, skipped=0):
+        with self._lock:
+            self.files += files
+            self.bytes += size
+            self.errors += errors
+            self.skipped += skipped
+
+    def __str__(self):
+        seconds = max(self.seconds, 1e-9)
+        return (
+            f"Sorted {self.files} files ({self.bytes / 1048576:.1f} MB) in {self.seconds:.2f} s: "
+            f"{self.files / seconds:.0f} files/s, {self.bytes / 1048576 / seconds:.1f} MB/s, "
+            f"{self.errors} errors, {self.skipped} duplicates skipped"
+        )
+
+
+def _move_group(directory, folder, entries, report):
+    """Move every (path, size) pair of one destination folder."""
+    moved = size = errors = skipped = 0
+    # All entries come from the same directory, so one device check covers them
+    local = same_device(directory, folder)
+    for path, file_size in entries:
+        started = time.perf_counter()
+        try:
+            method = place_file(path, directory, folder, local=local)
+        except OSError as e:
+            errors += 1
+            logging.error(f"Error moving file '{path}': {e}")
+            continue
+        if method == "skip":
+            skipped += 1
+            continue
+        record_timing(method, time.perf_counter() - started)
+        moved += 1
+        size += file_size
+    report.add(moved, size, errors, skipped)
+
+
+def sweep_directory(directory, ext_to_type=EXT_TO_TYPE, workers=MOVER_WORKERS):
+    """Sort every file directly inside directory and return a SweepReport.
+
+    The directory is read once with os.scandir, entries are grouped by
+    destination, each folder is created once and the groups are moved in
+    parallel on a MoverPool.
+    """
+    report = SweepReport()
+    started = time.perf_counter()
+
+    groups = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file():
+                try:
+                    folder = get_destination(entry.path, directory, ext_to_type)
+                    size = entry.stat().st_size
+                except OSError as e:
+                    # Gone or unreadable, the rest of the directory is still sorted
+                    logging.error(f"Error routing file '{entry.path}': {e}")
+                    report.add(0, 0, 1)
+                    continue
+                groups.setdefault(folder, []).append((entry.path, size))
+
+    pool = MoverPool(workers=workers, queue_size=max(workers, len(groups)))
+    pool.start()
+    for folder, entries in groups.items():
+        ensure_folder(folder)
+        pool.submit(folder, _move_group, directory, folder, entries, report)
+    pool.shutdown(wait=True)
+    if config.SNIFF_MODE:
+        get_sniff_cache().save()
+    save_metadata_cache()
+
+    report.seconds = time.perf_counter() - started
+    logging.info(f"{directory}: {report}")
+    return report
+
+
+if __name__ == "__main__":
+    from .history import recording
+
+    paths = sys.argv[1:] or ["."]
+    with recording("sweep " + ", ".join(paths)):
+        for path in paths:
+            print(f"{path}: {sweep_directory(path)}")
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import shutil
+import logging
+from .config import TRANSFER_CHUNK_SIZE, TRANSFER_CHECKPOINT
+
+# Suffix of the partially copied file, its journal adds ".json" on top
+PARTIAL_SUFFIX = ".sortpart"
+
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+
+def _copy_chunk(src_fd, dst_fd, offset, count):
+    """Copy count bytes at offset between two fds, return bytes copied."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+        except OSError:
+            # Older kernels refuse cross-filesystem ranges, try the next option
+            pass
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    if sys.platform.startswith("linux"):
+        try:
+            return os.sendfile(dst_fd, src_fd, offset, count)
+        except OSError:
+            pass
+    os.lseek(src_fd, offset, os.SEEK_SET)
+    data = os.read(src_fd, count)
+    view = memoryview(data)
+    while view:
+        written = os.write(dst_fd, view)
+        view = view[written:]
+    return len(data)
+
+
+def _read_journal(journal):
+    try:
+        with open(journal, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_journal(journal, state):
+    tmp = journal + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, journal)
+
+
+def _resume_offset(state, temp, journal):
+    """Return how many bytes of temp can be trusted from a previous run."""
+    previous = _read_journal(journal)
+    if not previous:
+        return 0
+    if any(previous.get(key) != state[key] for key in ("source", "size", "mtime_ns")):
+        logging.info(f"Source of '{temp}' changed, restarting copy")
+        return 0
+    try:
+        if os.path.getsize(temp) < previous["offset"]:
+            return 0
+    except OSError:
+        return 0
+    return previous["offset"]
+
+
+def _sync_folder(folder):
+    """Make a rename inside folder durable, not supported on Windows."""
+    if os.name == "nt":
+        return
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def transfer_file(file_path, dest_file, progress=None, chunk_size=TRANSFER_CHUNK_SIZE, rename=None):
+    """Copy a file to another volume in chunks, delete the source, return the final path.
+
+    Data goes to dest_file + PARTIAL_SUFFIX and is only renamed into place
+    after an fsync and a size check, by rename(temp) -> final path if given
+    or os.replace otherwise. A sidecar journal records the last synced
+    offset, so calling this again after a crash picks up where the previous
+    copy stopped. progress(copied, total) is called after each chunk.
+    """
+    st = os.stat(file_path)
+    temp = dest_file + PARTIAL_SUFFIX
+    journal = temp + ".json"
+    state = {"source": os.path.abspath(file_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    offset = _resume_offset(state, temp, journal)
+    if offset:
+        logging.info(f"Resuming copy of '{file_path}' at {offset} of {st.st_size} bytes")
+
+    src_fd = os.open(file_path, os.O_RDONLY | _O_BINARY)
+    try:
+        dst_fd = os.open(temp, os.O_WRONLY | os.O_CREAT | _O_BINARY, 0o666)
+        try:
+            os.ftruncate(dst_fd, offset)
+            synced = offset
+            while offset < st.st_size:
+                copied = _copy_chunk(src_fd, dst_fd, offset, min(chunk_size, st.st_size - offset))
+                if not copied:
+                    raise OSError(f"'{file_path}' shrank while it was being copied")
+                offset += copied
+                if offset - synced >= TRANSFER_CHECKPOINT:
+                    os.fsync(dst_fd)
+                    _write_journal(journal, dict(state, offset=offset))
+                    synced = offset
+                if progress:
+                    progress(offset, st.st_size)
+            os.fsync(dst_fd)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+    if os.path.getsize(temp) != st.st_size:
+        raise OSError(f"Size mismatch after copying '{file_path}'")
+    shutil.copystat(file_path, temp)
+    if rename:
+        dest_file = rename(temp)
+    else:
+        os.replace(temp, dest_file)
+    _sync_folder(os.path.dirname(os.path.abspath(dest_file)))
+    if os.path.exists(journal):
+        os.remove(journal)
+    os.remove(file_path)
+    return dest_file
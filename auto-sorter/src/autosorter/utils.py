@@ -1,29 +1,82 @@
-def setup_logging(drive):
-    import os
-    import logging
-    
-    log_dir = os.path.join(drive, "Logs")
+import os
+import json
+import queue
+import string
+import logging
+import logging.handlers
+from .config import LOG_DIR, LOG_MAX_BYTES, LOG_BACKUPS
+
+# Fields a record can carry through extra={...}, copied into the JSON lines
+RECORD_FIELDS = ("path", "category", "bytes", "latency_ms")
+
+_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format each record as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in RECORD_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(log_dir=LOG_DIR, level=logging.INFO):
+    """Route logging through a queue to rotating text and JSON-lines files.
+
+    Callers only enqueue records; a QueueListener thread does the file I/O.
+    Returns the listener, stop it (or call stop_logging) to flush on exit.
+    """
+    global _listener
+    stop_logging()
     os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, "auto_sorter.log")
-    
+
+    text = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, "auto_sorter.log"),
+        maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+    )
+    text.setFormatter(logging.Formatter(
+        "[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%d/%m/%Y %H:%M:%S"
+    ))
+    records = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, "auto_sorter.jsonl"),
+        maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+    )
+    records.setFormatter(JsonLinesFormatter())
+
+    records_queue = queue.SimpleQueue()
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
-    
-    logging.basicConfig(
-        filename=log_file,
-        level=logging.INFO,
-        format="[%(asctime)s] [%(levelname)s] %(message)s",
-        datefmt="%d/%m/%Y %H:%M:%S",
-        force=True
-    )
+        handler.close()
+    logging.root.addHandler(logging.handlers.QueueHandler(records_queue))
+    logging.root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records_queue, text, records, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Write out queued records and close the log files."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
 
 def get_available_drives():
-    import string
-    import os
-    
     drives = []
     for letter in string.ascii_uppercase:
-        drive = f"{letter}:\\" 
+        drive = f"{letter}:\\"
         if os.path.exists(drive):
             drives.append(drive)
-    return drives
\ No newline at end of file
+    return drives
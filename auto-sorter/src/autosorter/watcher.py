@@ -1,43 +1,300 @@
 import os
-import time
 import logging
+import fnmatch
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from .mover import move_file
-from plyer import notification
+from .mover import move_file, get_folder, get_rule_engine
+from .settle import SettleDetector
+from .coalesce import EventCoalescer
+from .pool import MoverPool
+from .sniff import get_sniff_cache
+from .metadata import save_metadata_cache
+from .naming import get_name_index
+from .journal import MoveJournal
+from .history import MoveHistory, set_active_history
+from .snapshot import DirectorySnapshot
+from .polling import AdaptivePollingObserver, needs_polling
+from .notify import Notifier
+from .archives import ArchiveExtractor, archive_suffix
+from . import config
+from .config import EXT_TO_TYPE
+
+def new_notifier():
+    """Return a Notifier using the configured window and rate limits"""
+    return Notifier(config.NOTIFY_WINDOW, config.NOTIFY_RATE, config.NOTIFY_BURST)
+
+class WatchRoot:
+    """A watched folder with its own routing rules, depth limit and exclusions"""
+    def __init__(self, path, ext_to_type=EXT_TO_TYPE, max_depth=0, exclude=(), polling=None):
+        self.path = path
+        self.ext_to_type = ext_to_type
+        self.max_depth = max_depth
+        self.exclude = tuple(exclude)
+        # None detects network and removable drives, which get polled
+        self.polling = needs_polling(path) if polling is None else polling
+        # The sorter's own output is never sorted again
+        folders = set(ext_to_type.values()) | {"Misc", config.DUPLICATES_FOLDER}
+        if config.RULES:
+            folders |= get_rule_engine(config.RULES).top_folders()
+        self.destinations = {folder.lower() for folder in folders}
+        self._prefix = path if path.endswith(("/", "\\")) else path + os.sep
+
+    @classmethod
+    def from_dict(cls, options):
+        return cls(
+            options["path"],
+            options.get("ext_to_type", EXT_TO_TYPE),
+            options.get("max_depth", 0),
+            options.get("exclude", ()),
+            options.get("polling"),
+        )
+
+    def accepts(self, file_path):
+        """Return True if a file event under this root should be sorted"""
+        if not file_path.startswith(self._prefix):
+            return False
+        relative = file_path[len(self._prefix):].lstrip("/\\")
+        parts = relative.replace("\\", "/").split("/")
+        if len(parts) - 1 > self.max_depth:
+            return False
+        if len(parts) > 1 and parts[0].lower() in self.destinations:
+            return False
+        return not any(
+            fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(parts[-1], pattern)
+            for pattern in self.exclude
+        )
+
+    def accepts_dir(self, folder):
+        """Return True if files inside folder may be sorted"""
+        if not folder.startswith(self._prefix):
+            return False
+        relative = folder[len(self._prefix):].strip("/\\")
+        if relative.replace("\\", "/").split("/")[0].lower() in self.destinations:
+            return False
+        return not any(
+            fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(relative + "/", pattern)
+            for pattern in self.exclude
+        )
 
 class Handler(FileSystemEventHandler):
-    """Handle events when new files are created"""
-    def __init__(self, source):
+    """Handle events when new files are created or renamed into place"""
+    def __init__(self, source, pool=None, root=None, journal=None, notifier=None, extractor=None):
         self.source = source
+        self.root = root or WatchRoot(source)
+        self.journal = journal
+        # Folders that changed while watching, re-snapshotted on close
+        self.touched_dirs = {source}
+        self._owns_pool = pool is None
+        self.coalescer = EventCoalescer(self.on_finished)
+        self.detector = SettleDetector(self.on_ready, config.SETTLE_QUIET_PERIOD, config.SETTLE_POLL_INTERVAL)
+        self.pool = pool or MoverPool()
+        self._owns_notifier = notifier is None
+        self.notifier = notifier or new_notifier()
+        self._owns_extractor = extractor is None and config.EXTRACT_ARCHIVES
+        self.extractor = extractor or (ArchiveExtractor() if config.EXTRACT_ARCHIVES else None)
     
     def on_created(self, event):
         if not event.is_directory:
-            time.sleep(10)  # Delay to ensure the file is fully created
-            msg = f"New file detected: {os.path.basename(event.src_path)}"
-            logging.info(msg)
-            notification.notify(
-                title="AutoSorter",
-                message=msg,
-                app_name="AutoSorter",
-                timeout=3
-            )
-            move_file(event.src_path, self.source)
+            self.touched_dirs.add(os.path.dirname(event.src_path))
+            get_name_index().file_added(event.src_path)
+            if self.root.accepts(event.src_path):
+                # Fold event storms per path, nothing here blocks the observer thread
+                self.coalescer.touched(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory and self.root.accepts(event.src_path):
+            self.coalescer.touched(event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.touched_dirs.add(os.path.dirname(event.src_path))
+            get_name_index().file_removed(event.src_path)
+            self.coalescer.deleted(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.touched_dirs.add(os.path.dirname(event.src_path))
+            self.touched_dirs.add(os.path.dirname(event.dest_path))
+            get_name_index().file_removed(event.src_path)
+            get_name_index().file_added(event.dest_path)
+            if self.root.accepts(event.dest_path):
+                self.coalescer.moved(event.src_path, event.dest_path)
+            else:
+                self.coalescer.deleted(event.src_path)
+
+    def on_finished(self, file_path):
+        """Called by the coalescer once events for a file have stopped"""
+        if self.journal:
+            self.journal.pending(file_path, self.source)
+        self.detector.watch(file_path)
+
+    def replay(self):
+        """Pick up files accepted by a previous run that never got moved"""
+        if not self.journal:
+            return
+        unfinished = self.journal.unfinished(self.source)
+        if unfinished:
+            logging.info(f"Replaying {len(unfinished)} unfinished files for {self.source}")
+        for file_path, _ in unfinished:
+            self.detector.watch(file_path)
+
+    def catch_up(self, snapshot):
+        """Queue files that arrived while the sorter was not running"""
+        for file_path in snapshot.catch_up(self.source, self.root.max_depth, self.root.accepts, self.root.accepts_dir):
+            self.on_finished(file_path)
+
+    def on_ready(self, file_path):
+        """Called by the settle detector once the file is fully written"""
+        try:
+            folder = get_folder(file_path, self.source, self.root.ext_to_type)
+        except OSError as e:
+            # Left pending in the journal, so the next start tries again
+            logging.error(f"Error routing file '{file_path}': {e}")
+            return
+        # Moves into the same folder share a worker and keep their order
+        dest = os.path.join(self.source, *folder.split("/"))
+        self.pool.submit(dest, self.sort, file_path, folder)
+
+    def sort(self, file_path, folder=None, unpack=True):
+        """Move a settled file and queue a notification, runs on a mover thread
+
+        folder is where on_ready routed the file, so it is routed only once.
+        """
+        logging.info(f"New file detected: {os.path.basename(file_path)}")
+        if self.journal:
+            self.journal.started(file_path)
+        if folder is None:
+            try:
+                folder = get_folder(file_path, self.source, self.root.ext_to_type)
+            except OSError as e:
+                logging.error(f"Error routing file '{file_path}': {e}")
+                return
+        result = move_file(file_path, self.source, self.root.ext_to_type,
+                           on_placed=self.placed if unpack else None, folder=folder)
+        if result and result.startswith("Error"):
+            # Left unfinished in the journal, so the next start tries again
+            logging.error(result)
+            return
+        if self.journal:
+            self.journal.done(file_path)
+        # Skipped duplicates stay where they are and are not announced
+        if result and not result.startswith("Skipped"):
+            self.notifier.file_sorted(folder.split("/")[0])
+
+    def placed(self, file_path):
+        """Queue a sorted archive for unpacking, its files are sorted in turn"""
+        if self.extractor and archive_suffix(file_path):
+            self.extractor.submit(file_path, self.sort_unpacked)
+
+    def sort_unpacked(self, file_path):
+        """Sort a file taken out of an archive, archives inside it stay packed"""
+        self.sort(file_path, unpack=False)
+
+    def start(self):
+        if self._owns_pool:
+            self.pool.start()
+        if self._owns_notifier:
+            self.notifier.start()
+        if self._owns_extractor:
+            self.extractor.start()
+        self.detector.start()
+        self.coalescer.start()
+
+    def close(self):
+        """Stop settling new files and wait for queued moves to finish"""
+        self.coalescer.stop()
+        self.detector.stop()
+        if self._owns_pool:
+            self.pool.shutdown(wait=True)
+        # After the pool, so archives sorted by its last jobs are still queued
+        if self._owns_extractor:
+            self.extractor.stop()
+        if self._owns_notifier:
+            self.notifier.stop()
+        if config.SNIFF_MODE:
+            get_sniff_cache().save()
+        save_metadata_cache()
+
+class SortingObserver(Observer):
+    """Observer that drains the handler's queued moves when stopped
+
+    handler is anything with a close() method, a Handler or a WatchManager.
+    """
+    def __init__(self, handler, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.handler = handler
+
+    def on_thread_stop(self):
+        super().on_thread_stop()
+        self.handler.close()
+
+class WatchManager:
+    """Watch several roots with one observer and one shared mover pool"""
+    def __init__(self, roots, pool=None, journal=None, snapshot=None, history=None):
+        self.roots = [root if isinstance(root, WatchRoot) else WatchRoot.from_dict(root) for root in roots]
+        self.pool = pool or MoverPool()
+        self.journal = journal or MoveJournal()
+        self.snapshot = snapshot or DirectorySnapshot()
+        self.history = history or MoveHistory()
+        self.notifier = new_notifier()
+        self.extractor = ArchiveExtractor() if config.EXTRACT_ARCHIVES else None
+        self.handlers = [
+            Handler(root.path, self.pool, root, self.journal, self.notifier, self.extractor) for root in self.roots
+        ]
+        self.observer = SortingObserver(self)
+        self.poller = AdaptivePollingObserver()
+
+    def start(self):
+        # Everything sorted until close() can be undone as one run
+        self.history.start_run("watch " + ", ".join(root.path for root in self.roots))
+        set_active_history(self.history)
+        self.pool.start()
+        self.notifier.start()
+        if self.extractor:
+            self.extractor.start()
+        for handler in self.handlers:
+            handler.start()
+            observer = self.poller if handler.root.polling else self.observer
+            observer.schedule(handler, handler.root.path, recursive=handler.root.max_depth > 0)
+            if handler.root.polling:
+                logging.info(f"Polling {handler.root.path}, native notifications are unreliable there")
+        self.poller.start()
+        self.observer.start()
+        # Watch first so nothing slips through between the catch-up and live events
+        for handler in self.handlers:
+            handler.replay()
+            handler.catch_up(self.snapshot)
+        return self.observer
+
+    def close(self):
+        """Stop every root, then wait for the shared pool to drain"""
+        self.poller.stop()
+        if self.poller.is_alive():
+            self.poller.join()
+        for handler in self.handlers:
+            handler.close()
+        self.pool.shutdown(wait=True)
+        if self.extractor:
+            # After the pool, so archives sorted by its last jobs are still queued
+            self.extractor.stop()
+        self.notifier.stop()
+        set_active_history(None)
+        self.history.close()
+        self.journal.close()
+        for handler in self.handlers:
+            folders = [f for f in list(handler.touched_dirs) if f == handler.source or handler.root.accepts_dir(f)]
+            self.snapshot.refresh(folders, handler.root.accepts)
+        self.snapshot.close()
+
+def start_roots(roots):
+    """Start watching several roots, return the observer"""
+    manager = WatchManager(roots)
+    observer = manager.start()
+    msg = "Monitoring: " + ", ".join(root.path for root in manager.roots)
+    logging.info(msg)
+    manager.notifier.message(msg)
+    return observer
 
 def start_observer(drive):
     """Start the observer for the selected drive"""
-    observer = Observer()
-    event_handler = Handler(drive)
-    observer.schedule(event_handler, drive, recursive=False)
-    observer.start()
-    
-    msg = f"Monitoring: {drive}"
-    logging.info(msg)
-    notification.notify(
-        title="AutoSorter",
-        message=msg,
-        app_name="AutoSorter",
-        timeout=3
-    )
-    
-    return observer
\ No newline at end of file
+    return start_roots([WatchRoot(drive)])
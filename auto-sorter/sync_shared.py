@@ -0,0 +1,47 @@
+import os
+import sys
+import shutil
+import filecmp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.join(HERE, "src", "autosorter")
+GUI = os.path.join(HERE, "..", "auto-sorter-gui", "src", "autosorter")
+STANDALONE = os.path.join(HERE, "..", "Python", "Sorter")
+
+# Modules maintained in this package and copied into the apps that cannot import it.
+# They take their settings as arguments, so the copies stay byte-identical.
+SHARED = {
+    "rules.py": [GUI, STANDALONE],
+    "routing.py": [GUI, STANDALONE],
+    "settle.py": [STANDALONE],
+    "notify.py": [STANDALONE],
+}
+
+def copies():
+    """Yield (source, copy) for every shared module."""
+    for name, folders in SHARED.items():
+        for folder in folders:
+            yield os.path.join(PACKAGE, name), os.path.join(folder, name)
+
+def stale_copies():
+    """Return the copies that differ from their source."""
+    return [
+        copy for source, copy in copies()
+        if not (os.path.exists(copy) and filecmp.cmp(source, copy, shallow=False))
+    ]
+
+def sync_shared():
+    """Copy each shared module over every copy that differs."""
+    for source, copy in copies():
+        if not (os.path.exists(copy) and filecmp.cmp(source, copy, shallow=False)):
+            shutil.copyfile(source, copy)
+            print(f"Updated {os.path.normpath(copy)}")
+
+if __name__ == "__main__":
+    # --check only reports, for CI
+    if "--check" in sys.argv[1:]:
+        stale = stale_copies()
+        for path in stale:
+            print(f"Out of date: {os.path.normpath(path)}")
+        sys.exit(1 if stale else 0)
+    sync_shared()
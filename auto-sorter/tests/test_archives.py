@@ -0,0 +1,113 @@
+import io
+import os
+import shutil
+import tarfile
+import zipfile
+import tempfile
+import threading
+import unittest
+from autosorter import mover, naming
+from autosorter.mover import move_file
+from autosorter.archives import ArchiveExtractor, ArchiveTooLarge, archive_suffix, extract_archive, safe_member_path
+
+class TestExtractArchive(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.others = os.path.join(self.test_dir, 'Others')
+        os.makedirs(self.others)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+        mover._created_folders.clear()
+        naming._index = naming.NameIndex()
+
+    def make_zip(self, members):
+        path = os.path.join(self.others, 'bundle.zip')
+        with zipfile.ZipFile(path, 'w') as z:
+            for name, data in members.items():
+                z.writestr(name, data)
+        return path
+
+    def test_suffixes(self):
+        self.assertEqual(archive_suffix('a.ZIP'), 'zip')
+        self.assertEqual(archive_suffix('a.tar.gz'), 'tar.gz')
+        self.assertEqual(archive_suffix('a.tgz'), 'tgz')
+        self.assertIsNone(archive_suffix('a.gz'))
+        self.assertIsNone(archive_suffix('.zip'))
+
+    def test_zip_slip_refused(self):
+        folder = os.path.join('data', 'out')
+        self.assertEqual(safe_member_path(folder, 'sub/a.txt'), os.path.join(folder, 'sub', 'a.txt'))
+        for name in ('../evil.txt', 'sub/../../evil.txt', '/etc/passwd', '\\evil.txt', 'C:/evil.txt', 'sub/..\\..\\x'):
+            self.assertIsNone(safe_member_path(folder, name), name)
+
+    def test_zip_members_sorted(self):
+        archive = self.make_zip({'photo.png': b'png', 'docs/report.pdf': b'pdf', '../evil.txt': b'x'})
+
+        members, written = extract_archive(archive, lambda path: move_file(path, self.test_dir))
+
+        self.assertEqual((members, written), (2, 6))
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Images', 'photo.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Docs', 'report.pdf')))
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, 'evil.txt')))
+        # The emptied folder is removed, the archive is kept
+        self.assertEqual(os.listdir(self.others), ['bundle.zip'])
+
+    def test_tar_gz_streamed(self):
+        archive = os.path.join(self.others, 'backup.tar.gz')
+        with tarfile.open(archive, 'w:gz') as tar:
+            for name in ('a.txt', 'nested/b.mp3'):
+                info = tarfile.TarInfo(name)
+                info.size = 3
+                tar.addfile(info, io.BytesIO(b'abc'))
+            link = tarfile.TarInfo('link')
+            link.type = tarfile.SYMTYPE
+            link.linkname = '/etc/passwd'
+            tar.addfile(link)
+
+        self.assertEqual(extract_archive(archive, chunk_size=2), (2, 6))
+        folder = os.path.join(self.others, 'backup')
+        self.assertTrue(os.path.exists(os.path.join(folder, 'nested', 'b.mp3')))
+        self.assertFalse(os.path.lexists(os.path.join(folder, 'link')))
+
+    def test_size_limit(self):
+        archive = self.make_zip({'big.txt': b'x' * 1000})
+
+        with self.assertRaises(ArchiveTooLarge):
+            extract_archive(archive, max_bytes=100, chunk_size=64)
+        self.assertEqual(os.listdir(self.others), ['bundle.zip'])
+
+    def test_extractor_thread(self):
+        archive = self.make_zip({'a.txt': b'a', 'b.txt': b'b'})
+        routed = []
+        done = threading.Event()
+
+        def route(path):
+            routed.append(os.path.basename(path))
+            if len(routed) == 2:
+                done.set()
+
+        extractor = ArchiveExtractor()
+        extractor.start()
+        try:
+            self.assertTrue(extractor.submit(archive, route))
+            self.assertTrue(done.wait(10))
+        finally:
+            extractor.stop()
+        self.assertEqual(routed, ['a.txt', 'b.txt'])
+        self.assertFalse(extractor.submit(archive, route))
+
+    def test_dropped_archives_logged(self):
+        extractor = ArchiveExtractor()
+        extractor.submit(os.path.join(self.others, 'queued.zip'))
+
+        with self.assertLogs(level='WARNING') as logs:
+            extractor.stop()
+            extractor.submit(os.path.join(self.others, 'late.zip'))
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('queued.zip', logs.output[0])
+        self.assertIn('late.zip', logs.output[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import time
+import threading
+import unittest
+from autosorter.coalesce import EventCoalescer, is_temporary
+
+class TestEventCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.ready = []
+        self.released = threading.Event()
+        self.coalescer = EventCoalescer(self.on_ready, window=0.1)
+        self.coalescer.start()
+
+    def tearDown(self):
+        self.coalescer.stop()
+
+    def on_ready(self, path):
+        self.ready.append(path)
+        self.released.set()
+
+    def test_is_temporary(self):
+        self.assertTrue(is_temporary('D:\\video.mp4.crdownload'))
+        self.assertTrue(is_temporary('/downloads/file.iso.PART'))
+        self.assertTrue(is_temporary('~$report.docx'))
+        self.assertFalse(is_temporary('report.docx'))
+
+    def test_burst_emits_once(self):
+        for _ in range(10):
+            self.coalescer.touched('/d/report.pdf')
+            time.sleep(0.01)
+
+        self.assertTrue(self.released.wait(1))
+        time.sleep(0.2)
+        self.assertEqual(self.ready, ['/d/report.pdf'])
+
+    def test_follows_rename_from_temp_name(self):
+        self.coalescer.touched('/d/video.mp4.crdownload')
+        self.coalescer.touched('/d/video.mp4.crdownload')
+        self.coalescer.moved('/d/video.mp4.crdownload', '/d/video.mp4')
+
+        self.assertTrue(self.released.wait(1))
+        self.assertEqual(self.ready, ['/d/video.mp4'])
+
+    def test_rename_replaces_pending_name(self):
+        self.coalescer.touched('/d/draft.txt')
+        self.coalescer.moved('/d/draft.txt', '/d/final.txt')
+
+        self.assertTrue(self.released.wait(1))
+        time.sleep(0.2)
+        self.assertEqual(self.ready, ['/d/final.txt'])
+
+    def test_deleted_file_is_dropped(self):
+        self.coalescer.touched('/d/gone.txt')
+        self.coalescer.deleted('/d/gone.txt')
+
+        self.assertFalse(self.released.wait(0.3))
+        self.assertEqual(self.coalescer.pending(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from autosorter import config, dedup, mover
+from autosorter.dedup import DedupIndex
+from autosorter.mover import move_file
+
+class TestDedupIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.images_dir = os.path.join(self.test_dir, 'Images')
+        os.makedirs(self.images_dir)
+        self.index = DedupIndex(':memory:')
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.test_dir)
+        mover._created_folders.clear()
+
+    def make_file(self, path, data):
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_no_hashing_without_size_collision(self):
+        self.make_file(os.path.join(self.images_dir, 'old.png'), b'a' * 10)
+        new = self.make_file(os.path.join(self.test_dir, 'new.png'), b'b' * 20)
+        self.index.index_folder(self.images_dir)
+
+        with patch('autosorter.dedup.partial_hash') as mock_partial, \
+             patch('autosorter.dedup.full_hash') as mock_full:
+            self.assertIsNone(self.index.find_duplicate(new))
+        mock_partial.assert_not_called()
+        mock_full.assert_not_called()
+
+    def test_finds_exact_duplicate(self):
+        old = self.make_file(os.path.join(self.images_dir, 'old.png'), b'same content')
+        new = self.make_file(os.path.join(self.test_dir, 'copy.png'), b'same content')
+        self.index.index_folder(self.images_dir)
+
+        self.assertEqual(self.index.find_duplicate(new), os.path.abspath(old))
+
+    def test_same_partial_different_content(self):
+        head = b'h' * dedup.PARTIAL_BYTES
+        tail = b't' * dedup.PARTIAL_BYTES
+        self.make_file(os.path.join(self.images_dir, 'a.iso'), head + b'1' * 10 + tail)
+        new = self.make_file(os.path.join(self.test_dir, 'b.iso'), head + b'2' * 10 + tail)
+        self.index.index_folder(self.images_dir)
+
+        with patch('autosorter.dedup.full_hash', wraps=dedup.full_hash) as mock_full:
+            self.assertIsNone(self.index.find_duplicate(new))
+        self.assertEqual(mock_full.call_count, 2)
+
+    def test_move_file_actions(self):
+        self.make_file(os.path.join(self.images_dir, 'photo.png'), b'pixels')
+        with patch.object(dedup, '_index', self.index):
+            with patch.object(config, 'DEDUP_ACTION', 'skip'):
+                skipped = self.make_file(os.path.join(self.test_dir, 'again.png'), b'pixels')
+                self.assertEqual(move_file(skipped, self.test_dir), "Skipped 'again.png', already sorted")
+                self.assertTrue(os.path.exists(skipped))
+
+            with patch.object(config, 'DEDUP_ACTION', 'quarantine'):
+                move_file(skipped, self.test_dir)
+                self.assertFalse(os.path.exists(skipped))
+                self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Duplicates', 'again.png')))
+
+            with patch.object(config, 'DEDUP_ACTION', 'hardlink'):
+                linked = self.make_file(os.path.join(self.test_dir, 'third.png'), b'pixels')
+                move_file(linked, self.test_dir)
+                self.assertFalse(os.path.exists(linked))
+                self.assertTrue(os.path.samefile(
+                    os.path.join(self.images_dir, 'third.png'),
+                    os.path.join(self.images_dir, 'photo.png'),
+                ))
+
+            with patch.object(config, 'DEDUP_ACTION', 'skip'):
+                unique = self.make_file(os.path.join(self.test_dir, 'unique.png'), b'other')
+                move_file(unique, self.test_dir)
+                self.assertTrue(os.path.exists(os.path.join(self.images_dir, 'unique.png')))
+
+if __name__ == '__main__':
+    unittest.main()
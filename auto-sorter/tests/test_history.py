@@ -0,0 +1,72 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from autosorter import mover, naming
+from autosorter.mover import move_file
+from autosorter.history import MoveHistory, set_active_history
+
+class TestMoveHistory(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.history = MoveHistory(os.path.join(self.test_dir, 'history.sqlite3'), flush_every=2)
+        set_active_history(self.history)
+
+    def tearDown(self):
+        set_active_history(None)
+        self.history.close()
+        shutil.rmtree(self.test_dir)
+        mover._created_folders.clear()
+        naming._index = naming.NameIndex()
+
+    def make(self, name):
+        path = os.path.join(self.test_dir, name)
+        with open(path, 'w') as f:
+            f.write(name)
+        return path
+
+    def test_revert_run(self):
+        first = self.history.start_run('first')
+        for name in ('a.png', 'b.png', 'c.pdf'):
+            move_file(self.make(name), self.test_dir)
+        second = self.history.start_run('second')
+        move_file(self.make('d.mp3'), self.test_dir)
+
+        runs = self.history.runs()
+        self.assertEqual([(run[0], run[2], run[3]) for run in runs], [(first, 'first', 3), (second, 'second', 1)])
+
+        self.assertEqual(self.history.revert(first), (3, 0))
+        for name in ('a.png', 'b.png', 'c.pdf'):
+            self.assertTrue(os.path.exists(os.path.join(self.test_dir, name)), name)
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Music', 'd.mp3')))
+        # Reverted moves are not reverted twice
+        self.assertEqual(self.history.revert(first), (0, 0))
+        self.assertEqual(self.history.runs()[0][4], 3)
+
+    def test_revert_time_range_keeps_taken_names(self):
+        self.history.start_run()
+        move_file(self.make('a.png'), self.test_dir)
+        middle = time.time()
+        time.sleep(0.01)
+        move_file(self.make('b.png'), self.test_dir)
+        # Something new took the original name in the meantime
+        self.make('b.png')
+
+        self.assertEqual(self.history.revert(since=middle), (1, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Images', 'a.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'b (1).png')))
+
+    def test_missing_file_counts_as_error(self):
+        run = self.history.start_run()
+        move_file(self.make('a.png'), self.test_dir)
+        os.remove(os.path.join(self.test_dir, 'Images', 'a.png'))
+
+        self.assertEqual(self.history.revert(run), (0, 1))
+
+    def test_not_recording_without_run(self):
+        move_file(self.make('a.png'), self.test_dir)
+        self.assertEqual(self.history.moves(), [])
+
+if __name__ == '__main__':
+    unittest.main()
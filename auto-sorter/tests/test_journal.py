@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import unittest
+from autosorter.journal import MoveJournal
+
+class TestMoveJournal(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.journal_file = os.path.join(self.test_dir, 'state', 'journal.jsonl')
+        self.files = []
+        for name in ('a.png', 'b.pdf', 'c.mp3'):
+            path = os.path.join(self.test_dir, name)
+            with open(path, 'w') as f:
+                f.write('test')
+            self.files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_unfinished_survive_restart(self):
+        a, b, c = self.files
+        journal = MoveJournal(self.journal_file)
+        journal.pending(a, 'D:\\')
+        journal.pending(b, 'D:\\')
+        journal.pending(c, 'E:\\')
+        journal.started(a)
+        journal.started(b)
+        journal.done(b)
+        # Simulate a crash: no close(), plus a torn last record
+        journal._file.write('{"op": "pend')
+        journal._file.flush()
+
+        reopened = MoveJournal(self.journal_file)
+        self.assertEqual(reopened.unfinished(), [(a, 'D:\\'), (c, 'E:\\')])
+        self.assertEqual(reopened.unfinished('E:\\'), [(c, 'E:\\')])
+        reopened.close()
+
+    def test_compaction_keeps_only_unfinished(self):
+        a, b, c = self.files
+        journal = MoveJournal(self.journal_file, compact_every=50)
+        for _ in range(20):
+            journal.pending(a, 'D:\\')
+            journal.done(a)
+        journal.pending(b, 'D:\\')
+        journal.pending(c, 'D:\\')
+        os.remove(c)
+        journal.close()
+
+        with open(self.journal_file) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(MoveJournal(self.journal_file).unfinished(), [(b, 'D:\\')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import time
+import struct
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from autosorter import metadata
+from autosorter.metadata import MetadataCache, read_exif_date, capture_date
+
+def exif_jpeg(date, endian='<'):
+    """Build a minimal JPEG whose APP1 segment holds DateTimeOriginal."""
+    value = date.encode('ascii') + b'\x00'
+    order = b'II*\x00' if endian == '<' else b'MM\x00*'
+    # Header, IFD0 with one entry (ExifIFD pointer), Exif IFD with one entry, then the string
+    ifd0 = 8
+    exif_ifd = ifd0 + 2 + 12 + 4
+    string_at = exif_ifd + 2 + 12 + 4
+    tiff = order + struct.pack(endian + 'I', ifd0)
+    tiff += struct.pack(endian + 'H', 1) + struct.pack(endian + 'HHII', 0x8769, 4, 1, exif_ifd) + b'\x00' * 4
+    tiff += struct.pack(endian + 'H', 1) + struct.pack(endian + 'HHII', 0x9003, 2, len(value), string_at) + b'\x00' * 4
+    tiff += value
+    app1 = b'Exif\x00\x00' + tiff
+    # An unrelated APP0 segment comes first, as in most cameras' files
+    app0 = b'JFIF\x00' + b'\x00' * 9
+    return (b'\xff\xd8' + b'\xff\xe0' + struct.pack('>H', len(app0) + 2) + app0
+            + b'\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1 + b'\xff\xda' + b'\x00' * 64)
+
+class TestMetadata(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        metadata._cache = MetadataCache(os.path.join(self.test_dir, 'cache.json'))
+
+    def tearDown(self):
+        metadata._cache = None
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_reads_date_taken(self):
+        self.assertEqual(read_exif_date(self.write('a.jpg', exif_jpeg('2019:08:03 10:11:12'))), (2019, 8, 3))
+        self.assertEqual(read_exif_date(self.write('b.jpg', exif_jpeg('2021:12:24 00:00:00', '>'))), (2021, 12, 24))
+
+    def test_missing_or_blank_date(self):
+        self.assertIsNone(read_exif_date(self.write('c.jpg', exif_jpeg('0000:00:00 00:00:00'))))
+        self.assertIsNone(read_exif_date(self.write('d.jpg', b'\xff\xd8\xff\xda' + b'\x00' * 32)))
+        self.assertIsNone(read_exif_date(self.write('e.jpg', b'not a jpeg')))
+
+    def test_falls_back_to_modified_date(self):
+        path = self.write('notes.txt', b'text')
+        mtime = time.mktime((2020, 2, 29, 12, 0, 0, 0, 0, -1))
+        os.utime(path, (mtime, mtime))
+        self.assertEqual(capture_date(path), (2020, 2, 29))
+
+    def test_cache_avoids_reparsing(self):
+        path = self.write('a.jpg', exif_jpeg('2019:08:03 10:11:12'))
+        with patch('autosorter.metadata.read_exif_date', wraps=read_exif_date) as mock_read:
+            self.assertEqual(capture_date(path), (2019, 8, 3))
+            self.assertEqual(capture_date(path), (2019, 8, 3))
+        self.assertEqual(mock_read.call_count, 1)
+
+        metadata._cache.save()
+        reloaded = MetadataCache(metadata._cache.path)
+        with patch('autosorter.metadata.read_exif_date') as mock_read:
+            self.assertEqual(reloaded.exif_date(path), (2019, 8, 3))
+        mock_read.assert_not_called()
+
+    def test_cache_drops_missing_and_least_recently_used(self):
+        cache = MetadataCache(os.path.join(self.test_dir, 'small.json'), max_entries=2)
+        a, b, c = (self.write(name, exif_jpeg('2019:08:03 10:11:12')) for name in ('a.jpg', 'b.jpg', 'c.jpg'))
+        cache.exif_date(a)
+        cache.exif_date(b)
+        cache.exif_date(a)
+        cache.exif_date(c)
+        self.assertEqual(len(cache._entries), 2)
+        self.assertFalse(any(key.startswith(b + '|') for key in cache._entries))
+
+        os.remove(c)
+        cache.save(prune=True)
+        self.assertEqual([key.rsplit('|', 2)[0] for key in MetadataCache(cache.path)._entries], [a])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
 import os
+import time
 import shutil
 import unittest
+from unittest.mock import patch
+from autosorter import mover, naming
 from autosorter.mover import move_file
 
 class TestMover(unittest.TestCase):
@@ -13,6 +16,8 @@ class TestMover(unittest.TestCase):
 
     def tearDown(self):
         shutil.rmtree(self.test_dir)
+        mover._created_folders.clear()
+        naming._index = naming.NameIndex()
 
     def test_move_image_file(self):
         test_file = os.path.join(self.test_dir, 'test_image.png')
@@ -44,5 +49,78 @@ class TestMover(unittest.TestCase):
         self.assertFalse(os.path.exists(test_file))
         self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Misc', 'test_unknown.xyz')))
 
+    def test_rules_pick_nested_destination(self):
+        test_file = os.path.join(self.test_dir, 'scan.pdf')
+        with open(test_file, 'w') as f:
+            f.write('test')
+
+        with patch('autosorter.mover.config.RULES', [{'name': 'scan*', 'dest': 'Docs/Scans'}]):
+            move_file(test_file, self.test_dir)
+
+        self.assertTrue(os.path.exists(os.path.join(self.docs_dir, 'Scans', 'scan.pdf')))
+
+    def test_routing_error_is_returned(self):
+        test_file = os.path.join(self.test_dir, 'scan.pdf')
+        with open(test_file, 'w') as f:
+            f.write('test')
+
+        with patch('autosorter.mover.get_folder', side_effect=FileNotFoundError('gone')):
+            result = move_file(test_file, self.test_dir)
+
+        self.assertTrue(result.startswith('Error moving file'))
+        self.assertTrue(os.path.exists(test_file))
+
+    def test_date_layout(self):
+        test_file = os.path.join(self.test_dir, 'photo.png')
+        with open(test_file, 'w') as f:
+            f.write('test')
+        mtime = time.mktime((2024, 5, 17, 12, 0, 0, 0, 0, -1))
+        os.utime(test_file, (mtime, mtime))
+
+        with patch('autosorter.mover.config.DATE_LAYOUT', '{yyyy}/{mm}'), self.assertLogs(level='INFO') as logs:
+            result = move_file(test_file, self.test_dir)
+
+        self.assertTrue(os.path.exists(os.path.join(self.images_dir, '2024', '05', 'photo.png')))
+        self.assertEqual(result, "File 'photo.png' moved to 'Images/2024/05'")
+        self.assertEqual([record.category for record in logs.records if hasattr(record, 'category')], ['Images'])
+
+    def test_destination_folder_created_once(self):
+        for name in ('a.mp3', 'b.mp3'):
+            with open(os.path.join(self.test_dir, name), 'w') as f:
+                f.write('test')
+
+        with patch('autosorter.mover.os.makedirs', wraps=os.makedirs) as mock_makedirs:
+            move_file(os.path.join(self.test_dir, 'a.mp3'), self.test_dir)
+            move_file(os.path.join(self.test_dir, 'b.mp3'), self.test_dir)
+
+        mock_makedirs.assert_called_once_with(os.path.join(self.test_dir, 'Music'), exist_ok=True)
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Music', 'b.mp3')))
+
+    def test_recreates_removed_cached_folder(self):
+        test_file = os.path.join(self.test_dir, 'first.png')
+        with open(test_file, 'w') as f:
+            f.write('test')
+        move_file(test_file, self.test_dir)
+        shutil.rmtree(self.images_dir)
+
+        test_file = os.path.join(self.test_dir, 'second.png')
+        with open(test_file, 'w') as f:
+            f.write('test')
+        move_file(test_file, self.test_dir)
+
+        self.assertTrue(os.path.exists(os.path.join(self.images_dir, 'second.png')))
+
+    def test_cross_device_move_copies(self):
+        test_file = os.path.join(self.test_dir, 'test_document.txt')
+        with open(test_file, 'w') as f:
+            f.write('test')
+
+        with patch('autosorter.mover.same_device', return_value=False):
+            move_file(test_file, self.test_dir)
+
+        self.assertFalse(os.path.exists(test_file))
+        self.assertTrue(os.path.exists(os.path.join(self.docs_dir, 'test_document.txt')))
+        self.assertIn('copy', mover.get_move_timings())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
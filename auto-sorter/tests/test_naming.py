@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from autosorter import mover
+from autosorter.mover import move_file
+from autosorter.naming import NameIndex, rename_exclusive
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.docs_dir = os.path.join(self.test_dir, 'Docs')
+        os.makedirs(self.docs_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+        mover._created_folders.clear()
+
+    def make_file(self, path, data=b'test'):
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_reserve_picks_next_suffix(self):
+        self.make_file(os.path.join(self.docs_dir, 'report.pdf'))
+        self.make_file(os.path.join(self.docs_dir, 'report (1).pdf'))
+        names = NameIndex()
+
+        self.assertEqual(names.reserve(self.docs_dir, 'other.pdf'), 'other.pdf')
+        self.assertEqual(names.reserve(self.docs_dir, 'report.pdf'), 'report (2).pdf')
+        self.assertEqual(names.reserve(self.docs_dir, 'REPORT.pdf'), 'REPORT (3).pdf')
+
+    def test_folder_listed_once(self):
+        names = NameIndex()
+        with patch('autosorter.naming.os.scandir', wraps=os.scandir) as mock_scandir:
+            for _ in range(5):
+                names.reserve(self.docs_dir, 'a.txt')
+        self.assertEqual(mock_scandir.call_count, 1)
+
+    def test_events_refresh_index(self):
+        names = NameIndex()
+        names.reserve(self.docs_dir, 'a.txt')
+        names.file_removed(os.path.join(self.docs_dir, 'a.txt'))
+        self.assertEqual(names.reserve(self.docs_dir, 'a.txt'), 'a.txt')
+
+        names.file_added(os.path.join(self.docs_dir, 'b.txt'))
+        self.assertEqual(names.reserve(self.docs_dir, 'b.txt'), 'b (1).txt')
+
+    def test_rename_exclusive_never_clobbers(self):
+        src = self.make_file(os.path.join(self.test_dir, 'new.txt'), b'new')
+        dst = self.make_file(os.path.join(self.docs_dir, 'new.txt'), b'old')
+
+        with self.assertRaises(FileExistsError):
+            rename_exclusive(src, dst)
+        with patch('autosorter.naming.os.link', side_effect=PermissionError):
+            with self.assertRaises(FileExistsError):
+                rename_exclusive(src, dst)
+
+        with open(dst, 'rb') as f:
+            self.assertEqual(f.read(), b'old')
+        self.assertTrue(os.path.exists(src))
+
+    def test_failed_fallback_rename_leaves_nothing(self):
+        src = self.make_file(os.path.join(self.test_dir, 'new.txt'))
+        names = NameIndex()
+
+        with patch('autosorter.naming.os.link', side_effect=PermissionError), \
+                patch('autosorter.naming.os.replace', side_effect=PermissionError):
+            with self.assertRaises(PermissionError):
+                names.place(src, self.docs_dir, 'new.txt')
+
+        self.assertEqual(os.listdir(self.docs_dir), [])
+        self.assertEqual(names.reserve(self.docs_dir, 'new.txt'), 'new.txt')
+        self.assertTrue(os.path.exists(src))
+
+    def test_place_rescans_after_collision(self):
+        names = NameIndex()
+        names.reserve(self.docs_dir, 'other.txt')
+        # Created behind the index's back, e.g. by another program
+        self.make_file(os.path.join(self.docs_dir, 'a.txt'), b'old')
+        self.make_file(os.path.join(self.docs_dir, 'a (1).txt'), b'old')
+        src = self.make_file(os.path.join(self.test_dir, 'a.txt'), b'new')
+
+        self.assertEqual(names.place(src, self.docs_dir, 'a.txt'), os.path.join(self.docs_dir, 'a (2).txt'))
+
+    def test_move_file_keeps_existing_file(self):
+        self.make_file(os.path.join(self.docs_dir, 'notes.txt'), b'old')
+        src = self.make_file(os.path.join(self.test_dir, 'notes.txt'), b'new')
+
+        with patch('autosorter.mover.get_name_index', return_value=NameIndex()):
+            move_file(src, self.test_dir)
+
+        with open(os.path.join(self.docs_dir, 'notes.txt'), 'rb') as f:
+            self.assertEqual(f.read(), b'old')
+        with open(os.path.join(self.docs_dir, 'notes (1).txt'), 'rb') as f:
+            self.assertEqual(f.read(), b'new')
+
+if __name__ == '__main__':
+    unittest.main()
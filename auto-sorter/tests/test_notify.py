@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import MagicMock
+from autosorter.notify import Notifier
+
+class TestNotifier(unittest.TestCase):
+    def test_burst_is_coalesced(self):
+        send = MagicMock()
+        notifier = Notifier(window=0.2, rate=0.01, burst=1, send=send)
+        notifier.start()
+        for _ in range(30):
+            notifier.file_sorted("Images")
+        for _ in range(7):
+            notifier.file_sorted("Videos")
+        notifier.stop()
+
+        send.assert_called_once_with("37 files sorted into Images (30), Videos (7)")
+
+    def test_token_bucket_limits_popups(self):
+        send = MagicMock()
+        notifier = Notifier(window=0.05, rate=0.01, burst=1, send=send)
+        notifier.start()
+        notifier.message("Monitoring: D:\\")
+        # Let the first popup use up the only token
+        deadline = 0
+        while not send.called and deadline < 100:
+            notifier._stopped.wait(0.02)
+            deadline += 1
+        notifier.file_sorted("Docs")
+        notifier._stopped.wait(0.2)
+        self.assertEqual(send.call_count, 1)
+        notifier.file_sorted("Docs")
+        notifier.stop()
+
+        # The held back messages are shown together on stop
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(send.call_args.args[0], "2 files sorted into Docs (2)")
+
+    def test_send_errors_are_ignored(self):
+        send = MagicMock(side_effect=RuntimeError("no display"))
+        notifier = Notifier(window=0.05, send=send)
+        notifier.start()
+        notifier.message("hello")
+        notifier.stop()
+
+        send.assert_called_once_with("hello")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import csv
+import shutil
+import tempfile
+import unittest
+from autosorter import mover, naming
+from autosorter.mover import sort_files_in_directory
+from autosorter.planner import MovePlan, plan_directory, execute_plan
+
+class TestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        for name in ['a.jpg', 'b.jpg', 'c.pdf', os.path.join('sub', 'a.jpg'), os.path.join('Images', 'a.jpg')]:
+            path = os.path.join(self.test_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b'12345')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+        mover._created_folders.clear()
+        naming._index = naming.NameIndex()
+
+    def listing(self):
+        return sorted(os.path.relpath(os.path.join(folder, name), self.test_dir)
+                      for folder, _, names in os.walk(self.test_dir) for name in names)
+
+    def test_plan_touches_nothing(self):
+        before = self.listing()
+        plan = sort_files_in_directory(self.test_dir, dry_run=True)
+
+        self.assertEqual(self.listing(), before)
+        totals = plan.totals()
+        self.assertEqual(totals['files'], 3)
+        self.assertEqual(totals['categories'], {'Images': {'files': 2, 'bytes': 10}, 'Docs': {'files': 1, 'bytes': 5}})
+        self.assertEqual(totals['cross_device_files'], 0)
+        # Images/a.jpg already exists
+        self.assertEqual(totals['collisions'], 1)
+
+    def test_depth_and_collisions_within_plan(self):
+        plan = plan_directory(self.test_dir, max_depth=1)
+
+        sources = sorted(os.path.relpath(entry['source'], self.test_dir) for entry in plan.entries)
+        self.assertEqual(sources, ['a.jpg', 'b.jpg', 'c.pdf', os.path.join('sub', 'a.jpg')])
+        collided = [entry for entry in plan.entries if entry['collision']]
+        self.assertEqual(len(collided), 2)
+
+    def test_save_load_and_execute(self):
+        plan = plan_directory(self.test_dir)
+        path = os.path.join(self.test_dir, 'plan.json')
+        plan.save(path)
+        plan.save(os.path.join(self.test_dir, 'plan.csv'))
+        with open(os.path.join(self.test_dir, 'plan.csv'), newline='') as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 3)
+
+        # A file modified after planning is left alone
+        with open(os.path.join(self.test_dir, 'b.jpg'), 'ab') as f:
+            f.write(b'more')
+        report = execute_plan(MovePlan.load(path), workers=2)
+
+        self.assertEqual((report.files, report.errors), (2, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Docs', 'c.pdf')))
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'b.jpg')))
+        # The existing Images/a.jpg was not overwritten
+        self.assertEqual(sorted(os.listdir(os.path.join(self.test_dir, 'Images'))), ['a (1).jpg', 'a.jpg'])
+
+if __name__ == '__main__':
+    unittest.main()
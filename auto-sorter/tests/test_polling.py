@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from watchdog.events import FileCreatedEvent, FileDeletedEvent
+from watchdog.observers.api import EventQueue, ObservedWatch
+from autosorter import polling
+from autosorter.polling import AdaptivePollingEmitter, needs_polling
+
+class TestAdaptivePollingEmitter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.queue = EventQueue()
+        self.emitter = AdaptivePollingEmitter(self.queue, ObservedWatch(self.test_dir, recursive=True), timeout=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def events(self):
+        found = []
+        while not self.queue.empty():
+            event, _ = self.queue.get()
+            found.append(event)
+        return found
+
+    def bump_mtime(self, path):
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000))
+
+    def test_reports_created_and_deleted_files(self):
+        existing = os.path.join(self.test_dir, 'old.txt')
+        with open(existing, 'w') as f:
+            f.write('test')
+        self.assertEqual(self.emitter.poll(), 0)
+
+        new = os.path.join(self.test_dir, 'new.txt')
+        with open(new, 'w') as f:
+            f.write('test')
+        os.remove(existing)
+        self.bump_mtime(self.test_dir)
+
+        self.assertEqual(self.emitter.poll(), 2)
+        events = self.events()
+        self.assertIn(FileCreatedEvent(new), events)
+        self.assertIn(FileDeletedEvent(existing), events)
+
+    def test_new_subfolder_contents_are_reported(self):
+        self.emitter.poll()
+        os.makedirs(os.path.join(self.test_dir, 'sub'))
+        inner = os.path.join(self.test_dir, 'sub', 'inner.txt')
+        with open(inner, 'w') as f:
+            f.write('test')
+        self.bump_mtime(self.test_dir)
+
+        self.emitter.poll()
+        self.assertIn(FileCreatedEvent(inner), self.events())
+
+    def test_idle_poll_only_stats(self):
+        self.emitter.poll()
+        with patch('autosorter.polling.os.scandir') as mock_scandir:
+            self.assertEqual(self.emitter.poll(), 0)
+        mock_scandir.assert_not_called()
+
+    def test_interval_adapts(self):
+        with patch.object(self.emitter.stopped_event, 'wait', return_value=False):
+            self.emitter.queue_events(1)
+            self.emitter.queue_events(1)
+            idle = self.emitter.interval
+            self.assertGreater(idle, polling.POLL_MIN_INTERVAL)
+
+            with open(os.path.join(self.test_dir, 'burst.txt'), 'w') as f:
+                f.write('test')
+            self.bump_mtime(self.test_dir)
+            self.emitter.queue_events(1)
+            self.assertEqual(self.emitter.interval, polling.POLL_MIN_INTERVAL)
+
+            for _ in range(50):
+                self.emitter.queue_events(1)
+            self.assertEqual(self.emitter.interval, polling.POLL_MAX_INTERVAL)
+
+class TestNeedsPolling(unittest.TestCase):
+    def test_network_paths(self):
+        self.assertTrue(needs_polling('\\\\server\\share'))
+
+    @patch('autosorter.polling.os.name', 'posix')
+    @patch('autosorter.polling.sys.platform', 'linux')
+    def test_mount_types(self):
+        with patch('autosorter.polling._mount_fs_type', return_value='cifs'):
+            self.assertTrue(needs_polling('/mnt/share'))
+        with patch('autosorter.polling._mount_fs_type', return_value='ext4'):
+            self.assertFalse(needs_polling('/home/user'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import time
+import threading
+import unittest
+from autosorter.pool import MoverPool
+
+class TestMoverPool(unittest.TestCase):
+    def test_same_key_keeps_order(self):
+        pool = MoverPool(workers=4, queue_size=64)
+        pool.start()
+        done = []
+        for i in range(20):
+            pool.submit('Images', done.append, i)
+        pool.shutdown(wait=True)
+
+        self.assertEqual(done, list(range(20)))
+
+    def test_shutdown_drains_queue(self):
+        pool = MoverPool(workers=2, queue_size=100)
+        pool.start()
+        done = []
+        for i in range(50):
+            pool.submit(f'folder{i % 5}', lambda n: (time.sleep(0.001), done.append(n)), i)
+        pool.shutdown(wait=True)
+
+        self.assertEqual(sorted(done), list(range(50)))
+        self.assertFalse(pool.submit('Images', done.append, 99))
+
+    def test_full_queue_applies_backpressure(self):
+        pool = MoverPool(workers=1, queue_size=1)
+        release = threading.Event()
+        pool.start()
+        pool.submit('Images', release.wait)
+        # Give the worker time to pick up the blocking job
+        time.sleep(0.05)
+        self.assertTrue(pool.submit('Images', lambda: None, timeout=0.1))
+        self.assertFalse(pool.submit('Images', lambda: None, timeout=0.1))
+        release.set()
+        pool.shutdown(wait=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from autosorter.config import EXT_TO_TYPE
+from autosorter.routing import SuffixRouter, get_router
+
+class TestSuffixRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = SuffixRouter(EXT_TO_TYPE)
+
+    def test_single_suffix(self):
+        self.assertEqual(self.router.route('photo.PNG'), 'Images')
+        self.assertEqual(self.router.route('C:\\Downloads\\song.mp3'), 'Music')
+
+    def test_longest_suffix_wins(self):
+        self.assertEqual(self.router.route('backup.tar.gz'), 'Others')
+        self.assertEqual(self.router.route('tweak.user.js'), 'Scripts')
+        self.assertEqual(self.router.suffix('my.backup.TAR.GZ'), 'tar.gz')
+
+    def test_unknown_and_missing_extension(self):
+        self.assertEqual(self.router.route('notes.xyz'), 'Misc')
+        self.assertEqual(self.router.route('README'), 'Misc')
+        self.assertEqual(self.router.route('.gitignore'), 'Misc')
+        self.assertEqual(self.router.suffix('.bashrc'), '')
+
+    def test_from_extensions_map(self):
+        router = SuffixRouter.from_extensions_map({'Images': ['.png'], 'Others': ['.tar.gz']})
+        self.assertEqual(router.route('a.png'), 'Images')
+        self.assertEqual(router.route('a.tar.gz'), 'Others')
+        self.assertEqual(router.route('a.gz'), 'Misc')
+
+    def test_get_router_is_cached(self):
+        self.assertIs(get_router(EXT_TO_TYPE), get_router(EXT_TO_TYPE))
+
+if __name__ == '__main__':
+    unittest.main()
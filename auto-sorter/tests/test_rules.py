@@ -0,0 +1,77 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from autosorter.rules import RuleEngine
+
+class TestRuleEngine(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def make(self, name, size=4, mtime=None):
+        path = os.path.join(self.test_dir, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_first_match_wins_and_templates(self):
+        engine = RuleEngine([
+            {'name': '*.jpg', 'min_size': 100, 'dest': 'Images/{yyyy}/{mm}'},
+            {'name': ['*.jpg', '*.PNG'], 'dest': 'Images/Small'},
+        ])
+        mtime = time.mktime((2023, 7, 14, 12, 0, 0, 0, 0, -1))
+        self.assertEqual(engine.destination(self.make('big.JPG', 200, mtime)), 'Images/2023/07')
+        self.assertEqual(engine.destination(self.make('small.jpg')), 'Images/Small')
+        self.assertEqual(engine.destination(self.make('icon.png')), 'Images/Small')
+        self.assertIsNone(engine.destination(self.make('notes.txt')))
+
+    def test_longer_suffix_still_checks_short_globs(self):
+        engine = RuleEngine([
+            {'name': '*.gz', 'dest': 'Compressed'},
+            {'name': '*.tar.gz', 'dest': 'Archives'},
+        ])
+        self.assertEqual(engine.destination(self.make('backup.tar.gz')), 'Compressed')
+        self.assertEqual(engine.suffix('backup.tar.gz'), 'tar.gz')
+
+    def test_regex_root_and_age(self):
+        engine = RuleEngine([
+            {'regex': r'^invoice[-_ ]\d+', 'root': '*/downloads', 'dest': 'Invoices/{name}'},
+            {'max_age': 3600, 'dest': 'Recent/{ext}'},
+        ])
+        invoice = self.make('Invoice-2041.pdf', mtime=time.time() - 7200)
+        self.assertEqual(engine.destination(invoice, 'C:\\Users\\me\\Downloads'), 'Invoices/Invoice-2041')
+        self.assertIsNone(engine.destination(invoice, 'D:\\'))
+        self.assertEqual(engine.destination(self.make('new.csv')), 'Recent/csv')
+
+    def test_sniffed_type_is_lazy(self):
+        calls = []
+        def sniff(path):
+            calls.append(path)
+            return 'png'
+        engine = RuleEngine([
+            {'name': '*.txt', 'dest': 'Text'},
+            {'sniffed': ['png'], 'dest': 'Images'},
+        ], sniff=sniff)
+        self.assertEqual(engine.destination(self.make('a.txt')), 'Text')
+        self.assertEqual(calls, [])
+        self.assertEqual(engine.destination(self.make('download.bin')), 'Images')
+        self.assertEqual(len(calls), 1)
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            RuleEngine([{'name': '*.png'}])
+        with self.assertRaises(ValueError):
+            RuleEngine([{'name': '*.png', 'size': 1, 'dest': 'Images'}])
+        # Template typos are caught when compiling, not on the first matching file
+        for dest in ('Images/{yyy}', 'Images/{}', 'Images/{name.upper}', 'Images/{yyyy'):
+            with self.assertRaises(ValueError, msg=dest):
+                RuleEngine([{'name': '*.jpg', 'dest': dest}])
+
+if __name__ == '__main__':
+    unittest.main()
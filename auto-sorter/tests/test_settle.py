@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from autosorter.settle import SettleDetector
+
+class TestSettleDetector(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.ready = []
+        self.released = threading.Event()
+        self.detector = SettleDetector(self.on_ready, quiet_period=0.2, poll_interval=0.02)
+        self.detector.start()
+
+    def tearDown(self):
+        self.detector.stop()
+        shutil.rmtree(self.test_dir)
+
+    def on_ready(self, path):
+        self.ready.append(path)
+        self.released.set()
+
+    def test_releases_stable_file(self):
+        test_file = os.path.join(self.test_dir, 'done.txt')
+        with open(test_file, 'w') as f:
+            f.write('test')
+
+        self.detector.watch(test_file)
+
+        self.assertTrue(self.released.wait(2))
+        self.assertEqual(self.ready, [test_file])
+        self.assertEqual(self.detector.pending(), 0)
+
+    def test_waits_while_file_grows(self):
+        test_file = os.path.join(self.test_dir, 'growing.bin')
+        with open(test_file, 'wb') as f:
+            self.detector.watch(test_file)
+            for _ in range(5):
+                f.write(b'x' * 1024)
+                f.flush()
+                os.utime(test_file)
+                self.assertFalse(self.released.wait(0.1))
+
+        self.assertTrue(self.released.wait(2))
+        self.assertEqual(self.ready, [test_file])
+
+    def test_drops_deleted_file(self):
+        test_file = os.path.join(self.test_dir, 'gone.txt')
+        with open(test_file, 'w') as f:
+            f.write('test')
+        self.detector.watch(test_file)
+        os.remove(test_file)
+
+        self.assertFalse(self.released.wait(0.5))
+        self.assertEqual(self.detector.pending(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
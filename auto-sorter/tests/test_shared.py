@@ -0,0 +1,18 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import sync_shared
+
+class TestSharedCopies(unittest.TestCase):
+    def test_copies_match_source(self):
+        """The GUI and the standalone sorter carry copies, see sync_shared.py"""
+        if not os.path.isdir(sync_shared.STANDALONE) or not os.path.isdir(sync_shared.GUI):
+            self.skipTest('not running from the full repository')
+        self.assertEqual(sync_shared.stale_copies(), [], 'run sync_shared.py')
+
+if __name__ == '__main__':
+    unittest.main()
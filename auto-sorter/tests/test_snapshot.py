@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from autosorter.snapshot import DirectorySnapshot
+
+class TestDirectorySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.sub = os.path.join(self.test_dir, 'sub')
+        os.makedirs(os.path.join(self.sub, 'deep'))
+        self.snapshot = DirectorySnapshot(':memory:')
+
+    def tearDown(self):
+        self.snapshot.close()
+        shutil.rmtree(self.test_dir)
+
+    def make_file(self, *parts):
+        path = os.path.join(self.test_dir, *parts)
+        with open(path, 'w') as f:
+            f.write('test')
+        return path
+
+    def bump_mtime(self, path):
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000))
+
+    def test_first_run_reports_everything(self):
+        a = self.make_file('a.png')
+        b = self.make_file('sub', 'b.pdf')
+
+        self.assertEqual(sorted(self.snapshot.catch_up(self.test_dir, max_depth=1)), sorted([a, b]))
+        self.assertEqual(self.snapshot.catch_up(self.test_dir, max_depth=1), [])
+
+    def test_unchanged_folders_are_not_listed(self):
+        self.make_file('a.png')
+        self.make_file('sub', 'deep', 'c.txt')
+        self.snapshot.catch_up(self.test_dir, max_depth=2)
+
+        new = self.make_file('sub', 'deep', 'd.txt')
+        self.bump_mtime(os.path.join(self.sub, 'deep'))
+        with patch('autosorter.snapshot.os.scandir', wraps=os.scandir) as mock_scandir:
+            self.assertEqual(self.snapshot.catch_up(self.test_dir, max_depth=2), [new])
+        mock_scandir.assert_called_once_with(os.path.join(self.sub, 'deep'))
+
+    def test_filters_and_removed_folders(self):
+        self.make_file('a.png')
+        self.make_file('sub', 'b.pdf')
+        found = self.snapshot.catch_up(
+            self.test_dir, max_depth=1,
+            accept=lambda p: p.endswith('.png'), accept_dir=lambda p: False,
+        )
+        self.assertEqual(found, [os.path.join(self.test_dir, 'a.png')])
+
+        shutil.rmtree(self.sub)
+        self.bump_mtime(self.test_dir)
+        self.assertEqual(self.snapshot.catch_up(self.test_dir, max_depth=1), [])
+
+    def test_refresh_records_current_state(self):
+        self.snapshot.catch_up(self.test_dir)
+        self.make_file('later.png')
+        self.snapshot.refresh([self.test_dir])
+
+        self.assertEqual(self.snapshot.catch_up(self.test_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+from autosorter import config, sniff
+from autosorter.mover import get_category
+from autosorter.sniff import SniffCache, sniff_extension
+
+class TestSniff(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def make_file(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_signatures(self):
+        self.assertEqual(sniff_extension(self.make_file('a', b'\x89PNG\r\n\x1a\nrest')), 'png')
+        self.assertEqual(sniff_extension(self.make_file('b', b'%PDF-1.7')), 'pdf')
+        self.assertEqual(sniff_extension(self.make_file('c', b'\x00\x00\x00\x18ftypmp42')), 'mp4')
+        self.assertEqual(sniff_extension(self.make_file('d', b'MZ\x90\x00')), 'exe')
+        self.assertEqual(sniff_extension(self.make_file('e', b'\x00' * 32769 + b'CD001')), 'iso')
+        self.assertIsNone(sniff_extension(self.make_file('f', b'plain text')))
+
+    def test_office_document(self):
+        path = os.path.join(self.test_dir, 'report')
+        with zipfile.ZipFile(path, 'w') as z:
+            z.writestr('[Content_Types].xml', '<Types/>')
+            z.writestr('word/document.xml', '<w:document/>')
+        self.assertEqual(sniff_extension(path), 'docx')
+
+    def test_cache_avoids_rereading(self):
+        path = self.make_file('image', b'\x89PNG\r\n\x1a\n')
+        cache = SniffCache(os.path.join(self.test_dir, 'cache', 'sniff.json'))
+        self.assertEqual(cache.extension(path), 'png')
+
+        with patch('autosorter.sniff.sniff_extension') as mock_sniff:
+            self.assertEqual(cache.extension(path), 'png')
+            cache.save()
+            self.assertEqual(SniffCache(cache.path).extension(path), 'png')
+        mock_sniff.assert_not_called()
+
+    def test_cache_drops_least_recently_used(self):
+        cache = SniffCache(os.path.join(self.test_dir, 'sniff.json'), max_entries=2)
+        a, b, c = (self.make_file(name, b'%PDF-1.4') for name in 'abc')
+        cache.extension(a)
+        cache.extension(b)
+        cache.extension(a)
+        cache.extension(c)
+        self.assertEqual(list(cache._entries), [SniffCache.key(os.stat(p)) for p in (a, c)])
+
+    def test_get_category_uses_content_for_unknown_files(self):
+        path = self.make_file('scan.bin', b'%PDF-1.4')
+        cache = SniffCache(os.path.join(self.test_dir, 'sniff.json'))
+        with patch.object(sniff, '_cache', cache):
+            with patch.object(config, 'SNIFF_MODE', None):
+                self.assertEqual(get_category(path), 'Misc')
+            with patch.object(config, 'SNIFF_MODE', 'unknown'):
+                self.assertEqual(get_category(path), 'Docs')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from autosorter import config, dedup, mover
+from autosorter.dedup import DedupIndex
+from autosorter.sweep import sweep_directory
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+        mover._created_folders.clear()
+
+    def test_sorts_all_files_and_reports(self):
+        names = [f'photo{i}.jpg' for i in range(20)] + [f'doc{i}.pdf' for i in range(10)] + ['backup.tar.gz']
+        for name in names:
+            with open(os.path.join(self.test_dir, name), 'wb') as f:
+                f.write(b'1234')
+        os.makedirs(os.path.join(self.test_dir, 'Existing'))
+
+        report = sweep_directory(self.test_dir, workers=3)
+
+        self.assertEqual(report.files, 31)
+        self.assertEqual(report.bytes, 31 * 4)
+        self.assertEqual(report.errors, 0)
+        self.assertEqual(len(os.listdir(os.path.join(self.test_dir, 'Images'))), 20)
+        self.assertEqual(len(os.listdir(os.path.join(self.test_dir, 'Docs'))), 10)
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'Others', 'backup.tar.gz')))
+        self.assertTrue(os.path.isdir(os.path.join(self.test_dir, 'Existing')))
+        self.assertIn('files/s', str(report))
+
+    def test_skipped_duplicates_not_counted(self):
+        os.makedirs(os.path.join(self.test_dir, 'Docs'))
+        with open(os.path.join(self.test_dir, 'Docs', 'a.txt'), 'wb') as f:
+            f.write(b'same')
+        for name, data in (('b.txt', b'same'), ('c.txt', b'new!')):
+            with open(os.path.join(self.test_dir, name), 'wb') as f:
+                f.write(data)
+
+        index = DedupIndex(':memory:')
+        self.addCleanup(index.close)
+        with patch.object(dedup, '_index', index), patch.object(config, 'DEDUP_ACTION', 'skip'):
+            report = sweep_directory(self.test_dir)
+
+        self.assertEqual((report.files, report.bytes, report.skipped, report.errors), (1, 4, 1, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, 'b.txt')))
+
+    def test_empty_directory(self):
+        report = sweep_directory(self.test_dir)
+
+        self.assertEqual(report.files, 0)
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from autosorter.transfer import transfer_file, PARTIAL_SUFFIX
+
+class TestTransfer(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.test_dir, 'movie.mkv')
+        self.dest = os.path.join(self.test_dir, 'Videos', 'movie.mkv')
+        os.makedirs(os.path.dirname(self.dest))
+        self.data = os.urandom(100 * 1024 + 7)
+        with open(self.source, 'wb') as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def read_dest(self):
+        with open(self.dest, 'rb') as f:
+            return f.read()
+
+    def test_copies_in_chunks_with_progress(self):
+        calls = []
+        transfer_file(self.source, self.dest, lambda done, total: calls.append((done, total)), chunk_size=32 * 1024)
+
+        self.assertEqual(self.read_dest(), self.data)
+        self.assertFalse(os.path.exists(self.source))
+        self.assertFalse(os.path.exists(self.dest + PARTIAL_SUFFIX))
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(calls[-1], (len(self.data), len(self.data)))
+
+    def test_plain_read_write_fallback(self):
+        with patch('autosorter.transfer.os.copy_file_range', side_effect=OSError, create=True), \
+             patch('autosorter.transfer.os.sendfile', side_effect=OSError, create=True):
+            transfer_file(self.source, self.dest, chunk_size=32 * 1024)
+
+        self.assertEqual(self.read_dest(), self.data)
+
+    def test_resumes_from_journal(self):
+        st = os.stat(self.source)
+        temp = self.dest + PARTIAL_SUFFIX
+        with open(temp, 'wb') as f:
+            f.write(self.data[:50 * 1024])
+        with open(temp + '.json', 'w') as f:
+            json.dump({'source': os.path.abspath(self.source), 'size': st.st_size,
+                       'mtime_ns': st.st_mtime_ns, 'offset': 40 * 1024}, f)
+
+        calls = []
+        transfer_file(self.source, self.dest, lambda done, total: calls.append(done), chunk_size=32 * 1024)
+
+        self.assertEqual(self.read_dest(), self.data)
+        self.assertEqual(calls[0], 72 * 1024)
+        self.assertFalse(os.path.exists(temp + '.json'))
+
+    def test_stale_journal_restarts(self):
+        temp = self.dest + PARTIAL_SUFFIX
+        with open(temp, 'wb') as f:
+            f.write(b'x' * 50 * 1024)
+        with open(temp + '.json', 'w') as f:
+            json.dump({'source': os.path.abspath(self.source), 'size': 1,
+                       'mtime_ns': 0, 'offset': 40 * 1024}, f)
+
+        transfer_file(self.source, self.dest, chunk_size=32 * 1024)
+
+        self.assertEqual(self.read_dest(), self.data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import json
+import shutil
+import logging
+import logging.handlers
+import tempfile
+import unittest
+from autosorter.utils import setup_logging, stop_logging
+
+class TestSetupLogging(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.saved_handlers = logging.root.handlers[:]
+        self.saved_level = logging.root.level
+
+    def tearDown(self):
+        stop_logging()
+        for handler in logging.root.handlers[:]:
+            logging.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            logging.root.addHandler(handler)
+        logging.root.setLevel(self.saved_level)
+        shutil.rmtree(self.log_dir)
+
+    def test_records_written_through_queue(self):
+        setup_logging(self.log_dir)
+        self.assertIsInstance(logging.root.handlers[0], logging.handlers.QueueHandler)
+
+        logging.info("Moved 'a.png'", extra={"path": "a.png", "category": "Images", "bytes": 3, "latency_ms": 1.5})
+        logging.warning("plain")
+        stop_logging()
+
+        with open(os.path.join(self.log_dir, "auto_sorter.log"), encoding="utf-8") as f:
+            text = f.read()
+        self.assertIn("[INFO] Moved 'a.png'", text)
+        with open(os.path.join(self.log_dir, "auto_sorter.jsonl"), encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[0]["category"], "Images")
+        self.assertEqual(lines[0]["bytes"], 3)
+        self.assertEqual(lines[0]["latency_ms"], 1.5)
+        self.assertEqual(lines[1]["level"], "WARNING")
+        self.assertNotIn("path", lines[1])
+
+if __name__ == '__main__':
+    unittest.main()
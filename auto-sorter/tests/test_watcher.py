@@ -1,7 +1,13 @@
 import os
+import time
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
-from autosorter.watcher import Handler
+from autosorter.journal import MoveJournal
+from autosorter.snapshot import DirectorySnapshot
+from autosorter.history import MoveHistory
+from autosorter.watcher import Handler, WatchRoot, WatchManager
 
 class TestHandler(unittest.TestCase):
     def setUp(self):
@@ -9,23 +15,119 @@ class TestHandler(unittest.TestCase):
         self.handler = Handler(self.source)
 
     @patch('autosorter.watcher.move_file')
-    @patch('autosorter.watcher.logging')
-    @patch('autosorter.watcher.notification')
-    def test_on_created_file(self, mock_notification, mock_logging, mock_move_file):
+    def test_on_created_file(self, mock_move_file):
         event = MagicMock()
         event.is_directory = False
         event.src_path = os.path.join(self.source, "test_file.txt")
 
-        self.handler.on_created(event)
+        with patch.object(self.handler.coalescer, 'touched') as mock_touched:
+            self.handler.on_created(event)
+
+        mock_touched.assert_called_once_with(event.src_path)
+        mock_move_file.assert_not_called()
+
+    def test_on_moved_follows_rename(self):
+        event = MagicMock()
+        event.is_directory = False
+        event.src_path = os.path.join(self.source, "video.mp4.crdownload")
+        event.dest_path = os.path.join(self.source, "video.mp4")
+
+        with patch.object(self.handler.coalescer, 'moved') as mock_moved:
+            self.handler.on_moved(event)
+
+        mock_moved.assert_called_once_with(event.src_path, event.dest_path)
+
+    def test_on_finished_watches_file(self):
+        file_path = os.path.join(self.source, "test_file.txt")
+
+        with patch.object(self.handler.detector, 'watch') as mock_watch:
+            self.handler.on_finished(file_path)
+
+        mock_watch.assert_called_once_with(file_path)
 
-        mock_logging.info.assert_called_once_with("New file detection: test_file.txt")
-        mock_notification.notify.assert_called_once_with(
-            title="AutoSorter",
-            message="New file detection: test_file.txt",
-            app_name="AutoSorter",
-            timeout=3
+    def test_on_ready_submits_to_pool(self):
+        file_path = os.path.join(self.source, "test_file.txt")
+
+        with patch.object(self.handler.pool, 'submit') as mock_submit:
+            self.handler.on_ready(file_path)
+
+        mock_submit.assert_called_once_with(
+            os.path.join(self.source, "Docs"), self.handler.sort, file_path, "Docs"
+        )
+
+    @patch('autosorter.watcher.move_file')
+    @patch('autosorter.watcher.logging')
+    def test_sort(self, mock_logging, mock_move_file):
+        file_path = os.path.join(self.source, "test_file.txt")
+        mock_move_file.return_value = "File 'test_file.txt' moved to 'Docs'"
+
+        with patch.object(self.handler.notifier, 'file_sorted') as mock_sorted:
+            self.handler.sort(file_path)
+
+        mock_logging.info.assert_called_once_with("New file detected: test_file.txt")
+        mock_move_file.assert_called_once_with(
+            file_path, self.source, self.handler.root.ext_to_type, on_placed=self.handler.placed, folder="Docs"
         )
-        mock_move_file.assert_called_once_with(event.src_path, self.source)
+        mock_sorted.assert_called_once_with("Docs")
+
+    @patch('autosorter.watcher.move_file')
+    @patch('autosorter.watcher.get_folder', return_value="Docs")
+    def test_file_is_routed_once(self, mock_get_folder, mock_move_file):
+        file_path = os.path.join(self.source, "test_file.txt")
+        mock_move_file.return_value = "File 'test_file.txt' moved to 'Docs'"
+
+        with patch.object(self.handler.pool, 'submit', side_effect=lambda key, func, *args: func(*args)):
+            self.handler.on_ready(file_path)
+
+        mock_get_folder.assert_called_once_with(file_path, self.source, self.handler.root.ext_to_type)
+        self.assertEqual(mock_move_file.call_args.kwargs['folder'], "Docs")
+
+    @patch('autosorter.watcher.move_file')
+    def test_sort_error_not_notified(self, mock_move_file):
+        mock_move_file.return_value = "Error moving file test_file.txt: denied"
+
+        with patch.object(self.handler.notifier, 'file_sorted') as mock_sorted:
+            self.handler.sort(os.path.join(self.source, "test_file.txt"))
+
+        mock_sorted.assert_not_called()
+
+    def test_placed_archive_is_unpacked(self):
+        extractor = MagicMock()
+        handler = Handler(self.source, extractor=extractor)
+
+        handler.placed(os.path.join(self.source, "Others", "photos.zip"))
+        handler.placed(os.path.join(self.source, "Images", "a.png"))
+
+        extractor.submit.assert_called_once_with(os.path.join(self.source, "Others", "photos.zip"), handler.sort_unpacked)
+
+    @patch('autosorter.watcher.move_file')
+    def test_skipped_duplicate_not_notified(self, mock_move_file):
+        mock_move_file.return_value = "Skipped 'test_file.txt', already sorted"
+
+        with patch.object(self.handler.notifier, 'file_sorted') as mock_sorted:
+            self.handler.sort(os.path.join(self.source, "test_file.txt"))
+
+        mock_sorted.assert_not_called()
+
+    @patch('autosorter.watcher.move_file')
+    def test_failed_move_is_replayed(self, mock_move_file):
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        journal = MoveJournal(os.path.join(test_dir, 'journal.jsonl'))
+        self.addCleanup(journal.close)
+        handler = Handler(self.source, journal=journal)
+        failed = os.path.join(self.source, "failed.txt")
+        moved = os.path.join(self.source, "moved.txt")
+
+        handler.on_finished(failed)
+        handler.on_finished(moved)
+        mock_move_file.side_effect = ["Error moving file failed.txt: denied", "File 'moved.txt' moved to 'Docs'"]
+        handler.sort(failed)
+        handler.sort(moved)
+
+        with patch.object(handler.detector, 'watch') as mock_watch:
+            handler.replay()
+        mock_watch.assert_called_once_with(failed)
 
     @patch('autosorter.watcher.move_file')
     def test_on_created_directory(self, mock_move_file):
@@ -37,5 +139,63 @@ class TestHandler(unittest.TestCase):
 
         mock_move_file.assert_not_called()
 
+class TestWatchRoot(unittest.TestCase):
+    def test_depth_and_destinations(self):
+        root = WatchRoot(os.path.join('data', 'inbox'), max_depth=1)
+
+        self.assertTrue(root.accepts(os.path.join('data', 'inbox', 'a.png')))
+        self.assertTrue(root.accepts(os.path.join('data', 'inbox', 'sub', 'a.png')))
+        self.assertFalse(root.accepts(os.path.join('data', 'inbox', 'sub', 'deeper', 'a.png')))
+        self.assertFalse(root.accepts(os.path.join('data', 'inbox', 'Images', 'a.png')))
+        self.assertFalse(root.accepts(os.path.join('data', 'other', 'a.png')))
+
+    def test_exclude_globs(self):
+        root = WatchRoot('inbox', max_depth=2, exclude=['*.ini', 'keep/*'])
+
+        self.assertFalse(root.accepts(os.path.join('inbox', 'desktop.ini')))
+        self.assertFalse(root.accepts(os.path.join('inbox', 'keep', 'a.png')))
+        self.assertTrue(root.accepts(os.path.join('inbox', 'a.png')))
+
+class TestWatchManager(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.photos = os.path.join(self.test_dir, 'photos')
+        self.downloads = os.path.join(self.test_dir, 'downloads')
+        os.makedirs(os.path.join(self.downloads, 'nested'))
+        os.makedirs(self.photos)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_roots_share_observer_and_pool(self):
+        manager = WatchManager([
+            WatchRoot(self.photos, {'jpg': 'Camera'}),
+            {'path': self.downloads, 'max_depth': 1},
+        ], journal=MoveJournal(os.path.join(self.test_dir, 'journal.jsonl')), snapshot=DirectorySnapshot(':memory:'),
+           history=MoveHistory(':memory:'))
+        self.assertIs(manager.handlers[0].pool, manager.handlers[1].pool)
+        self.assertIs(manager.handlers[0].notifier, manager.handlers[1].notifier)
+        manager.notifier.send = MagicMock()
+        observer = manager.start()
+        try:
+            for path in (os.path.join(self.photos, 'a.jpg'), os.path.join(self.downloads, 'nested', 'b.pdf')):
+                with open(path, 'w') as f:
+                    f.write('test')
+            expected = [os.path.join(self.photos, 'Camera', 'a.jpg'), os.path.join(self.downloads, 'Docs', 'b.pdf')]
+            deadline = time.monotonic() + 10
+            while not all(map(os.path.exists, expected)) and time.monotonic() < deadline:
+                time.sleep(0.1)
+        finally:
+            observer.stop()
+            observer.join()
+
+        for path in expected:
+            self.assertTrue(os.path.exists(path), path)
+        # Files moved into Docs/ were not picked up and sorted a second time
+        self.assertEqual(os.listdir(os.path.join(self.downloads, 'Docs')), ['b.pdf'])
+        shown = "\n".join(call.args[0] for call in manager.notifier.send.call_args_list)
+        self.assertIn("Camera (1)", shown)
+        self.assertIn("Docs (1)", shown)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file